@@ -1,11 +1,15 @@
 """
 Complete API endpoints for Medicure application
 """
-from fastapi import APIRouter, HTTPException, Depends, status, Header
+from fastapi import APIRouter, HTTPException, Depends, status, Header, Query
+from fastapi.responses import Response
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from database import get_pool
+from json_response import FastJSONResponse
+from query_stats import QUERY_STATS
+import profiler
 import json
 import jwt
 import os
@@ -67,6 +71,15 @@ async def get_current_user(authorization: str = Header(None)) -> Dict:
             detail=f"Invalid token: {str(e)}"
         )
 
+async def require_admin(current_user: Dict = Depends(get_current_user)) -> Dict:
+    """Only super admins may use /api/admin endpoints"""
+    if current_user.get('role') != 'super_admin':
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return current_user
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -125,27 +138,19 @@ async def book_appointment(
     appointment: AppointmentCreate,
     current_user: Dict = Depends(get_current_user)
 ):
-    """Book a new appointment"""
+    """Book a new appointment (scheduled appointments must get a free slot)"""
+    from appointment_slots import book_appointment_slot
+
     try:
         pool = await get_pool()
         async with pool.acquire() as conn:
-            query = """
-                INSERT INTO appointments (
-                    patient_id, doctor_id, appointment_type, appointment_date,
-                    symptom, notes, latitude, longitude, status
-                )
-                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 'pending')
-                RETURNING id, patient_id, doctor_id, appointment_type, 
-                          appointment_date, status, created_at
-            """
-            
             # Remove timezone info if present
             appt_date = appointment.appointment_date
             if hasattr(appt_date, 'replace') and appt_date.tzinfo is not None:
                 appt_date = appt_date.replace(tzinfo=None)
             
-            row = await conn.fetchrow(
-                query,
+            row = await book_appointment_slot(
+                conn,
                 current_user['id'],
                 appointment.doctor_id,
                 appointment.appointment_type,
@@ -160,6 +165,8 @@ async def book_appointment(
                 "success": True,
                 "appointment": dict(row)
             }
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error booking appointment: {e}")
         raise HTTPException(
@@ -219,11 +226,11 @@ async def get_user_appointments(
             
             appointments = [dict(row) for row in rows]
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "appointments": appointments,
                 "count": len(appointments)
-            }
+            })
     except Exception as e:
         print(f"Error fetching appointments: {e}")
         raise HTTPException(
@@ -394,11 +401,11 @@ async def get_user_prescriptions(
             rows = await conn.fetch(query, user_id)
             prescriptions = [dict(row) for row in rows]
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "prescriptions": prescriptions,
                 "count": len(prescriptions)
-            }
+            })
     except Exception as e:
         print(f"Error fetching prescriptions: {e}")
         raise HTTPException(
@@ -487,11 +494,11 @@ async def get_user_lab_results(
             rows = await conn.fetch(query, user_id)
             results = [dict(row) for row in rows]
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "results": results,
                 "count": len(results)
-            }
+            })
     except Exception as e:
         print(f"Error fetching lab results: {e}")
         raise HTTPException(
@@ -526,11 +533,11 @@ async def get_chat_messages(
             rows = await conn.fetch(query, appointment_id)
             messages = [dict(row) for row in rows]
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "messages": messages,
                 "count": len(messages)
-            }
+            })
     except Exception as e:
         print(f"Error fetching messages: {e}")
         raise HTTPException(
@@ -580,6 +587,31 @@ async def send_chat_message(
 # DOCTOR ENDPOINTS
 # ============================================================================
 
+@router.get("/api/doctors/availability")
+async def get_doctors_current_availability(
+    doctor_ids: List[int] = Query(...),
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get current availability for several doctors at once (?doctor_ids=1&doctor_ids=2)"""
+    from doctor_search import get_current_availability
+
+    try:
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            availability = await get_current_availability(conn, doctor_ids)
+
+            return FastJSONResponse({
+                "success": True,
+                "data": availability,
+                "count": len(availability)
+            })
+    except Exception as e:
+        print(f"Error fetching availability: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch availability: {str(e)}"
+        )
+
 @router.get("/api/doctors/{doctor_id}/availability")
 async def get_doctor_availability(
     doctor_id: str,
@@ -604,12 +636,11 @@ async def get_doctor_availability(
         
         pool = await get_pool()
         async with pool.acquire() as conn:
+            # Maintained from doctor_availability_updates by trigger
             query = """
-                SELECT available_now, accepts_emergencies, notes, created_at
-                FROM doctor_availability_updates
+                SELECT available_now, accepts_emergencies, notes, updated_at as created_at
+                FROM doctor_availability_current
                 WHERE doctor_id = $1
-                ORDER BY created_at DESC
-                LIMIT 1
             """
             
             row = await conn.fetchrow(query, doctor_id_int)
@@ -688,6 +719,43 @@ async def update_doctor_availability(
             detail=f"Failed to update availability: {str(e)}"
         )
 
+@router.get("/api/doctors/{doctor_id}/slots")
+async def get_doctor_free_slots(
+    doctor_id: str,
+    days: int = 7,
+    current_user: Dict = Depends(get_current_user)
+):
+    """Get the doctor's free bookable slots over the next `days` days"""
+    from appointment_slots import get_free_slots, SLOT_MINUTES
+
+    try:
+        # Handle UUID doctor_ids - doctor_schedules uses INTEGER doctor_id
+        try:
+            doctor_id_int = int(doctor_id)
+        except ValueError:
+            return {
+                "success": True,
+                "slots": [],
+                "count": 0
+            }
+
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            slots = await get_free_slots(conn, doctor_id_int, min(max(days, 1), 31))
+
+            return FastJSONResponse({
+                "success": True,
+                "slot_minutes": SLOT_MINUTES,
+                "slots": slots,
+                "count": len(slots)
+            })
+    except Exception as e:
+        print(f"Error fetching free slots: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch free slots: {str(e)}"
+        )
+
 @router.get("/api/doctors/{doctor_id}/patients")
 async def get_doctor_patients(
     doctor_id: str,
@@ -743,15 +811,75 @@ async def get_doctor_patients(
             detail=f"Failed to fetch patients: {str(e)}"
         )
 
+# Builds the whole patient history response inside Postgres so the endpoint
+# can hand the JSON text straight to the client without per-row dicts
+PATIENT_HISTORY_JSON_QUERY = """
+    SELECT json_build_object(
+        'success', TRUE,
+        'history', json_build_object(
+            'appointments', (
+                SELECT COALESCE(json_agg(t ORDER BY t.appointment_date DESC), '[]'::json)
+                FROM (
+                    SELECT 
+                        a.*,
+                        d.full_name as doctor_name,
+                        d.specialty
+                    FROM appointments a
+                    LEFT JOIN doctors d ON a.doctor_id = d.id
+                    WHERE a.patient_id = $1
+                    ORDER BY a.appointment_date DESC
+                    LIMIT 10
+                ) t
+            ),
+            'prescriptions', (
+                SELECT COALESCE(json_agg(t ORDER BY t.issued_date DESC), '[]'::json)
+                FROM (
+                    SELECT 
+                        p.*,
+                        d.full_name as doctor_name
+                    FROM prescriptions p
+                    LEFT JOIN doctors d ON p.doctor_id = d.id
+                    WHERE p.patient_id = $1
+                    ORDER BY p.issued_date DESC
+                    LIMIT 10
+                ) t
+            ),
+            'lab_tests', (
+                SELECT COALESCE(json_agg(t ORDER BY t.ordered_date DESC), '[]'::json)
+                FROM (
+                    SELECT 
+                        lt.*,
+                        d.full_name as doctor_name
+                    FROM lab_tests lt
+                    LEFT JOIN doctors d ON lt.doctor_id = d.id
+                    WHERE lt.patient_id = $1
+                    ORDER BY lt.ordered_date DESC
+                    LIMIT 10
+                ) t
+            )
+        )
+    )
+"""
+
 @router.get("/api/patients/{patient_id}/history")
 async def get_patient_history(
     patient_id: str,
+    aggregate: bool = False,
     current_user: Dict = Depends(get_current_user)
 ):
-    """Get patient's medical history"""
+    """
+    Get patient's medical history
+
+    With aggregate=true the response is built by Postgres (json_agg) and
+    returned as-is, skipping Python-side row conversion and re-serialization.
+    """
     try:
         pool = await get_pool()
         async with pool.acquire() as conn:
+            if aggregate:
+                payload = await conn.fetchval(PATIENT_HISTORY_JSON_QUERY, patient_id)
+                return Response(content=payload, media_type="application/json")
+
             # Get appointments
             appointments_query = """
                 SELECT 
@@ -893,29 +1021,92 @@ async def decline_emergency_request(
 # CALENDAR & SCHEDULING ENDPOINTS
 # ============================================================================
 
+CALENDAR_VIEWS = ("day", "week", "month")
+CALENDAR_MAX_DAYS = 92
+
+
+def calendar_window(anchor: date, view: str) -> tuple:
+    """First and last day of the day/week/month containing anchor (weeks start on Sunday)"""
+    if view == "day":
+        return anchor, anchor
+    if view == "week":
+        start = anchor - timedelta(days=(anchor.weekday() + 1) % 7)
+        return start, start + timedelta(days=6)
+    start = anchor.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return start, next_month - timedelta(days=1)
+
+
+def bucket_appointments_by_day(appointments: List[Dict]) -> Dict[str, List[Dict]]:
+    """Group date-ordered calendar entries under their "YYYY-MM-DD" day"""
+    days: Dict[str, List[Dict]] = {}
+    for appointment in appointments:
+        days.setdefault(appointment["date"], []).append(appointment)
+    return days
+
+
 @router.get("/api/doctors/{doctor_id}/calendar")
 async def get_doctor_calendar(
     doctor_id: str,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    view: str = "week",
     current_user: Dict = Depends(get_current_user)
 ):
-    """Get doctor's calendar with appointments and availability"""
+    """
+    Get doctor's calendar with appointments and availability.
+
+    Without `to`, the window is the day/week/month (`view`) containing `from`
+    (default today); with `to`, it is exactly [from, to].
+    """
+    if view not in CALENDAR_VIEWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"view must be one of: {', '.join(CALENDAR_VIEWS)}"
+        )
+
+    if to_date is None:
+        window_start, window_end = calendar_window(from_date or date.today(), view)
+    else:
+        window_start, window_end = from_date or to_date, to_date
+
+    if window_end < window_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="'to' must not be before 'from'"
+        )
+    if (window_end - window_start).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Calendar window cannot exceed {CALENDAR_MAX_DAYS} days"
+        )
+
+    window = {
+        "from": window_start.isoformat(),
+        "to": window_end.isoformat(),
+        "view": view if to_date is None else None
+    }
+
     try:
         # Handle UUID doctor_ids
         try:
             doctor_id_int = int(doctor_id)
         except ValueError:
             # UUID format - return mock data
+            appointments = [
+                {"id": "1", "time": "09:00", "patientName": "Maria G.", "type": "scheduled", "location": "clinic1", "status": "confirmed", "date": "2025-12-11"},
+                {"id": "2", "time": "09:30", "patientName": "Carlos R.", "type": "scheduled", "location": "clinic1", "status": "confirmed", "date": "2025-12-11"},
+                {"id": "3", "time": "10:00", "patientName": "Ana M.", "type": "emergency", "location": "clinic2", "status": "pending", "date": "2025-12-11"},
+                {"id": "4", "time": "11:00", "patientName": "Luis F.", "type": "scheduled", "location": "clinic1", "status": "confirmed", "date": "2025-12-11"},
+                {"id": "5", "time": "14:00", "patientName": "Sofia R.", "type": "walkin", "location": "clinic3", "status": "pending", "date": "2025-12-11"},
+                {"id": "6", "time": "15:30", "patientName": "Pedro G.", "type": "scheduled", "location": "clinic2", "status": "confirmed", "date": "2025-12-11"},
+            ]
             return {
                 "success": True,
                 "data": {
-                    "appointments": [
-                        {"id": "1", "time": "09:00", "patientName": "Maria G.", "type": "scheduled", "location": "clinic1", "status": "confirmed", "date": "2025-12-11"},
-                        {"id": "2", "time": "09:30", "patientName": "Carlos R.", "type": "scheduled", "location": "clinic1", "status": "confirmed", "date": "2025-12-11"},
-                        {"id": "3", "time": "10:00", "patientName": "Ana M.", "type": "emergency", "location": "clinic2", "status": "pending", "date": "2025-12-11"},
-                        {"id": "4", "time": "11:00", "patientName": "Luis F.", "type": "scheduled", "location": "clinic1", "status": "confirmed", "date": "2025-12-11"},
-                        {"id": "5", "time": "14:00", "patientName": "Sofia R.", "type": "walkin", "location": "clinic3", "status": "pending", "date": "2025-12-11"},
-                        {"id": "6", "time": "15:30", "patientName": "Pedro G.", "type": "scheduled", "location": "clinic2", "status": "confirmed", "date": "2025-12-11"},
-                    ],
+                    "window": window,
+                    "appointments": appointments,
+                    "days": bucket_appointments_by_day(appointments),
                     "availability": {
                         "early": False,
                         "morning": True,
@@ -929,35 +1120,37 @@ async def get_doctor_calendar(
         
         pool = await get_pool()
         async with pool.acquire() as conn:
-            # Get appointments
+            # Range scan on (doctor_id, appointment_date); strings are formatted by Postgres
             appointments_query = """
                 SELECT 
-                    a.id, a.appointment_date, a.status, a.appointment_type,
-                    u.name as patient_name
+                    a.id::text AS id,
+                    to_char(a.appointment_date, 'HH24:MI') AS time,
+                    COALESCE(u.name, 'Patient') AS "patientName",
+                    COALESCE(a.appointment_type, 'scheduled') AS type,
+                    'clinic1' AS location,
+                    COALESCE(a.status, 'confirmed') AS status,
+                    to_char(a.appointment_date, 'YYYY-MM-DD') AS date
                 FROM appointments a
                 LEFT JOIN users u ON a.patient_id = u.id
                 WHERE a.doctor_id = $1
+                AND a.appointment_date >= $2
+                AND a.appointment_date < $3
                 ORDER BY a.appointment_date
             """
-            rows = await conn.fetch(appointments_query, doctor_id_int)
-            
-            appointments = []
-            for row in rows:
-                apt_date = row['appointment_date']
-                appointments.append({
-                    "id": str(row['id']),
-                    "time": apt_date.strftime('%H:%M') if apt_date else "09:00",
-                    "patientName": row['patient_name'] or "Patient",
-                    "type": row['appointment_type'] or "scheduled",
-                    "location": "clinic1",
-                    "status": row['status'] or "confirmed",
-                    "date": apt_date.strftime('%Y-%m-%d') if apt_date else ""
-                })
+            rows = await conn.fetch(
+                appointments_query,
+                doctor_id_int,
+                datetime.combine(window_start, datetime.min.time()),
+                datetime.combine(window_end + timedelta(days=1), datetime.min.time())
+            )
+            appointments = [dict(row) for row in rows]
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "data": {
+                    "window": window,
                     "appointments": appointments,
+                    "days": bucket_appointments_by_day(appointments),
                     "availability": {
                         "early": False,
                         "morning": True,
@@ -967,7 +1160,7 @@ async def get_doctor_calendar(
                         "night": False
                     }
                 }
-            }
+            })
     except Exception as e:
         print(f"Error fetching calendar: {e}")
         raise HTTPException(
@@ -976,13 +1169,25 @@ async def get_doctor_calendar(
         )
 
 
+# Named status filters understood by the emergency alert queue
+ALERT_STATUS_GROUPS = {
+    "active": ["accepted", "in_progress"],
+}
+
+
 @router.get("/api/doctors/{doctor_id}/emergency-alerts")
 async def get_doctor_emergency_alerts(
     doctor_id: str,
-    status: str = "pending",
+    alert_status: str = Query("pending", alias="status"),
+    limit: int = Query(50, ge=1, le=200),
     current_user: Dict = Depends(get_current_user)
 ):
-    """Get emergency alerts for a doctor"""
+    """
+    Get a doctor's emergency alerts, highest severity first then newest.
+    status is a single status, "active" (accepted or in progress) or "all".
+    """
+    statuses = None if alert_status == "all" else ALERT_STATUS_GROUPS.get(alert_status, [alert_status])
+
     try:
         # Handle UUID doctor_ids
         try:
@@ -1033,48 +1238,86 @@ async def get_doctor_emergency_alerts(
         async with pool.acquire() as conn:
             query = """
                 SELECT 
-                    ea.id, ea.symptom, ea.severity, ea.status,
-                    ea.patient_location_address, ea.ambulance_requested,
-                    ea.created_at, ea.patient_phone, ea.patient_name
+                    ea.id::text AS id,
+                    COALESCE(ea.patient_name, 'Unknown') AS "patientName",
+                    COALESCE(ea.patient_phone, '') AS "patientPhone",
+                    COALESCE(ea.symptom, '') AS symptom,
+                    COALESCE(ea.severity, 'medium') AS severity,
+                    COALESCE(ea.status, 'pending') AS status,
+                    COALESCE(ea.patient_location_address, '') AS location,
+                    CASE
+                        WHEN age.minutes < 60 THEN age.minutes || 'm ago'
+                        ELSE age.minutes / 60 || 'h ago'
+                    END AS "timeAgo",
+                    COALESCE(ea.ambulance_requested, FALSE) AS "hasAmbulance"
                 FROM emergency_alerts ea
+                CROSS JOIN LATERAL (
+                    SELECT COALESCE(
+                        EXTRACT(EPOCH FROM (LOCALTIMESTAMP - ea.created_at))::INTEGER / 60, 0
+                    ) AS minutes
+                ) age
                 WHERE ea.doctor_id = $1
-                ORDER BY 
-                    CASE ea.severity 
-                        WHEN 'critical' THEN 1 
-                        WHEN 'high' THEN 2 
-                        WHEN 'medium' THEN 3 
-                        ELSE 4 
-                    END,
-                    ea.created_at DESC
+                AND ($2::text[] IS NULL OR ea.status = ANY($2::text[]))
+                ORDER BY ea.severity_rank, ea.created_at DESC
+                LIMIT $3
             """
-            rows = await conn.fetch(query, doctor_id_int)
+            rows = await conn.fetch(query, doctor_id_int, statuses, limit)
+            alerts = [dict(row) for row in rows]
             
-            alerts = []
-            for row in rows:
-                created = row['created_at']
-                minutes_ago = int((datetime.now() - created).total_seconds() / 60) if created else 0
-                time_ago = f"{minutes_ago}m ago" if minutes_ago < 60 else f"{minutes_ago // 60}h ago"
-                
-                alerts.append({
-                    "id": str(row['id']),
-                    "patientName": row['patient_name'] or "Unknown",
-                    "patientPhone": row['patient_phone'] or "",
-                    "symptom": row['symptom'] or "",
-                    "severity": row['severity'] or "medium",
-                    "status": row['status'] or "pending",
-                    "location": row['patient_location_address'] or "",
-                    "timeAgo": time_ago,
-                    "hasAmbulance": row['ambulance_requested'] or False
-                })
-            
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "alerts": alerts,
                 "count": len(alerts)
-            }
+            })
     except Exception as e:
         print(f"Error fetching emergency alerts: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch emergency alerts: {str(e)}"
         )
+
+# ============================================================================
+# ADMIN ENDPOINTS
+# ============================================================================
+
+QUERY_STATS_ORDER = ("total", "mean", "max", "calls")
+
+@router.get("/api/admin/query-stats")
+async def get_query_stats(
+    limit: int = Query(20, ge=1, le=500),
+    order_by: str = "total",
+    current_user: Dict = Depends(require_admin)
+):
+    """Most expensive SQL statements in this worker since start-up, by fingerprint"""
+    if order_by not in QUERY_STATS_ORDER:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"order_by must be one of: {', '.join(QUERY_STATS_ORDER)}"
+        )
+    return FastJSONResponse({
+        "success": True,
+        "slow_query_ms": QUERY_STATS.slow_query_ms,
+        "statements": QUERY_STATS.top(limit, order_by)
+    })
+
+@router.post("/api/admin/profile")
+async def profile_worker(
+    seconds: float = Query(10.0, gt=0, le=profiler.PROFILE_MAX_SECONDS),
+    interval_ms: float = Query(5.0, ge=1, le=1000),
+    all_threads: bool = False,
+    current_user: Dict = Depends(require_admin)
+):
+    """
+    Sample this worker's event loop (or every thread) for `seconds` and return
+    the stacks in collapsed format for flamegraph tools. Requires PROFILER_ENABLED.
+    """
+    if not profiler.PROFILER_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiler is disabled; set PROFILER_ENABLED=1"
+        )
+    try:
+        stacks = await profiler.profile_event_loop(seconds, interval_ms / 1000, all_threads)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return Response(content=stacks, media_type="text/plain; charset=utf-8")
@@ -0,0 +1,153 @@
+"""
+Slot-based appointment booking
+
+doctor_schedules.time_slots holds the bookable hours of each weekday as
+[{"hour": 9, "available": true}, ...]. This module expands those into
+concrete slots, answers "free slots for doctor X" in one query, and books
+a slot under a per-slot advisory lock so concurrent requests for the same
+slot cannot both succeed.
+"""
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+
+SLOT_MINUTES = 60
+
+# Expands the weekly schedule over [from, to] and removes slots that already
+# have a live appointment (anti-join on the (doctor_id, appointment_date) index)
+FREE_SLOTS_QUERY = """
+    SELECT DISTINCT ON (slots.slot_start)
+        slots.slot_start,
+        slots.location_id
+    FROM (
+        SELECT
+            day::date + make_time((slot->>'hour')::INTEGER, 0, 0) AS slot_start,
+            ds.location_id
+        FROM generate_series($2::date, $3::date, INTERVAL '1 day') AS day
+        JOIN doctor_schedules ds
+            ON ds.doctor_id = $1
+            AND ds.day_of_week = EXTRACT(DOW FROM day)::INTEGER
+        CROSS JOIN LATERAL jsonb_array_elements(ds.time_slots) AS slot
+        WHERE COALESCE((slot->>'available')::BOOLEAN, TRUE)
+    ) slots
+    WHERE slots.slot_start > LOCALTIMESTAMP
+    AND NOT EXISTS (
+        SELECT 1
+        FROM appointments a
+        WHERE a.doctor_id = $1
+        AND a.status <> 'cancelled'
+        AND a.appointment_date >= slots.slot_start
+        AND a.appointment_date < slots.slot_start + make_interval(mins => $4)
+    )
+    ORDER BY slots.slot_start, slots.location_id
+"""
+
+
+def slot_start_for(appointment_date: datetime) -> datetime:
+    """Align a requested time to the start of the slot that contains it"""
+    minutes = (appointment_date.hour * 60 + appointment_date.minute) // SLOT_MINUTES * SLOT_MINUTES
+    return appointment_date.replace(hour=minutes // 60, minute=minutes % 60, second=0, microsecond=0)
+
+
+def slot_lock_key(slot_start: datetime) -> int:
+    """Number of slots since the epoch; fits the int4 half of the advisory lock key"""
+    return int((slot_start - datetime(1970, 1, 1)).total_seconds()) // (SLOT_MINUTES * 60)
+
+
+async def get_free_slots(conn, doctor_id: int, days: int = 7, start: Optional[date] = None) -> List[Dict]:
+    """Free, future slots for a doctor over the next `days` days"""
+    start = start or date.today()
+    end = start + timedelta(days=max(days, 1) - 1)
+    rows = await conn.fetch(FREE_SLOTS_QUERY, doctor_id, start, end, SLOT_MINUTES)
+    return [
+        {"start": row['slot_start'], "location_id": row['location_id']}
+        for row in rows
+    ]
+
+
+async def book_appointment_slot(
+    conn,
+    patient_id: str,
+    doctor_id: int,
+    appointment_type: str,
+    appointment_date: datetime,
+    symptom: Optional[str] = None,
+    notes: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None
+):
+    """
+    Insert an appointment, refusing double bookings.
+
+    Scheduled appointments are checked against the slot under a transaction
+    scoped advisory lock on (doctor_id, slot), so of N concurrent requests
+    for one slot exactly one gets in. If the doctor publishes a weekly
+    schedule, the slot must also be one of its available hours. Emergency
+    appointments are immediate and skip the slot checks.
+    """
+    insert_query = """
+        INSERT INTO appointments (
+            patient_id, doctor_id, appointment_type, appointment_date,
+            symptom, notes, latitude, longitude, status
+        )
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, 'pending')
+        RETURNING id, patient_id, doctor_id, appointment_type,
+                  appointment_date, status, created_at
+    """
+    insert_args = (
+        patient_id, doctor_id, appointment_type, appointment_date,
+        symptom, notes, latitude, longitude
+    )
+
+    if appointment_type == 'emergency':
+        return await conn.fetchrow(insert_query, *insert_args)
+
+    slot_start = slot_start_for(appointment_date)
+    slot_end = slot_start + timedelta(minutes=SLOT_MINUTES)
+
+    async with conn.transaction():
+        await conn.execute(
+            'SELECT pg_advisory_xact_lock($1, $2)',
+            doctor_id, slot_lock_key(slot_start)
+        )
+
+        schedule = await conn.fetchval("""
+            SELECT bool_or(
+                ds.day_of_week = EXTRACT(DOW FROM $2::timestamp)::INTEGER
+                AND EXISTS (
+                    SELECT 1
+                    FROM jsonb_array_elements(ds.time_slots) AS slot
+                    WHERE (slot->>'hour')::INTEGER = EXTRACT(HOUR FROM $2::timestamp)::INTEGER
+                    AND COALESCE((slot->>'available')::BOOLEAN, TRUE)
+                )
+            )
+            FROM doctor_schedules ds
+            WHERE ds.doctor_id = $1
+        """, doctor_id, slot_start)
+
+        # NULL: the doctor has no published schedule, any time may be requested
+        if schedule is False:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Requested time is not one of the doctor's bookable slots"
+            )
+
+        taken = await conn.fetchval("""
+            SELECT EXISTS (
+                SELECT 1
+                FROM appointments
+                WHERE doctor_id = $1
+                AND status <> 'cancelled'
+                AND appointment_date >= $2
+                AND appointment_date < $3
+            )
+        """, doctor_id, slot_start, slot_end)
+
+        if taken:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="This slot is already booked"
+            )
+
+        return await conn.fetchrow(insert_query, *insert_args)
@@ -3,12 +3,13 @@ from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import HTTPException, status
 from pydantic import BaseModel
-from jose import jwt
 from passlib.context import CryptContext
+import jwt
 import uuid
 import os
 from dotenv import load_dotenv
 from database import get_pool
+from tracing import start_span
 
 load_dotenv()
 
@@ -46,11 +47,13 @@ class Token(BaseModel):
 # Password utilities
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against argon2 hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    with start_span("argon2.verify"):
+        return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     """Hash a password using argon2"""
-    return pwd_context.hash(password)
+    with start_span("argon2.hash"):
+        return pwd_context.hash(password)
 
 # JWT utilities
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
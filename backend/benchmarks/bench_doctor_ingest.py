@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark doctor ingestion: one round trip per row vs COPY + set-based merge
+
+Run from the backend directory against a migrated database. Everything is
+rolled back afterwards unless --keep is given:
+    python -m benchmarks.bench_doctor_ingest --doctors 100000 --row-by-row 1000
+"""
+
+import argparse
+import asyncio
+import time
+
+import asyncpg
+
+from database import DATABASE_URL
+from doctor_ingest import SCRAPED_DOCTOR_PASSWORD_HASH, ingest_doctors, normalize_doctor
+from synthetic_data import synthetic_doctors
+
+async def row_by_row(conn, doctors):
+    """The previous scraper path: 3 + N statements per doctor"""
+    for doctor in doctors:
+        doctor_row, slots = normalize_doctor(0, doctor)
+        _, email, full_name, specialty, sub_specialty, phone, location_type, clinic, address, city, lat, lng = doctor_row
+        user_id = await conn.fetchval('''
+            INSERT INTO users (email, hashed_password, role, name)
+            VALUES ($1, $2, 'doctor', $3)
+            ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id
+        ''', email, SCRAPED_DOCTOR_PASSWORD_HASH, full_name)
+        doctor_id = await conn.fetchval('SELECT id FROM doctors WHERE user_id = $1', user_id)
+        if not doctor_id:
+            doctor_id = await conn.fetchval('''
+                INSERT INTO doctors (user_id, full_name, specialty, sub_specialty, phone, email)
+                VALUES ($1, $2, $3, $4, $5, $6)
+                RETURNING id
+            ''', user_id, full_name, specialty, sub_specialty, phone, email)
+        location_id = await conn.fetchval('''
+            INSERT INTO doctor_service_locations (
+                doctor_id, location_type, name, address, city, country, latitude, longitude
+            ) VALUES ($1, $2, $3, $4, $5, 'Ecuador', $6, $7)
+            RETURNING id
+        ''', doctor_id, location_type, clinic, address, city, lat, lng)
+        for _, day_of_week, start_time, end_time, is_24_hours in slots:
+            await conn.execute('''
+                INSERT INTO doctor_availability (
+                    doctor_id, location_id, day_of_week, start_time, end_time, is_24_hours, is_available
+                ) VALUES ($1, $2, $3, $4, $5, $6, TRUE)
+            ''', doctor_id, location_id, day_of_week, start_time, end_time, is_24_hours)
+
+
+def report(name, count, seconds):
+    print(f"{name:<12} {count:>8,} doctors in {seconds:8.2f} s  "
+          f"({count / seconds:,.0f} doctors/s, {seconds / count * 1e6:,.0f} µs/doctor)")
+
+
+async def main(doctors: int, row_by_row_count: int, batch_size: int, seed: int, keep: bool):
+    conn = await asyncpg.connect(DATABASE_URL)
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        if row_by_row_count:
+            # Another seed, so the two passes load different doctors
+            records = list(synthetic_doctors(row_by_row_count, seed + 1))
+            start = time.perf_counter()
+            await row_by_row(conn, records)
+            report("row-by-row", len(records), time.perf_counter() - start)
+
+        records = list(synthetic_doctors(doctors, seed))
+        start = time.perf_counter()
+        result = await ingest_doctors(conn, records, batch_size=batch_size)
+        report("copy+merge", len(records), time.perf_counter() - start)
+        print(f"             {result.doctors:,} doctors, {result.locations:,} locations, "
+              f"{result.availability_slots:,} availability slots, {len(result.rejected)} rejected")
+
+        # Same records again: natural-key upserts should write nothing
+        start = time.perf_counter()
+        result = await ingest_doctors(conn, records, batch_size=batch_size)
+        report("reload", len(records), time.perf_counter() - start)
+        print(f"             {result.users:,} users, {result.locations:,} locations, "
+              f"{result.availability_slots:,} slots rewritten, {result.retired_slots:,} retired")
+    finally:
+        if keep:
+            await transaction.commit()
+        else:
+            await transaction.rollback()
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--doctors", type=int, default=100_000)
+    parser.add_argument("--row-by-row", type=int, default=1_000,
+                        help="doctors to load with the per-row path for comparison (0 to skip)")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="commit instead of rolling back")
+    args = parser.parse_args()
+    asyncio.run(main(args.doctors, args.row_by_row, args.batch_size, args.seed, args.keep))
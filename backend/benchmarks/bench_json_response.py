@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization: jsonable_encoder + json vs orjson
+
+Uses synthetic payloads shaped like /api/doctors/search and
+/api/appointments/user/{id} responses, so no database is needed, and fails
+if the two renderers don't produce identical bytes:
+    python -m benchmarks.bench_json_response --rows 500 --iterations 200
+"""
+
+import argparse
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from doctor_search import DoctorSearchHit
+from json_response import FastJSONResponse
+
+
+def search_payload(rows: int) -> dict:
+    """Mirror the hits returned by doctor_search.search_doctors"""
+    doctors = [
+        DoctorSearchHit(
+            doctor_id=i,
+            full_name=f"Dr. Doctor {i}",
+            specialty="General Practitioner",
+            sub_specialty="Family Medicine",
+            phone="+593-2-1234567",
+            email=f"doctor{i}@medicure.ec",
+            location_id=i,
+            location_type="private_clinic",
+            clinic_name=f"Clinica {i}",
+            address="Av. Amazonas y Naciones Unidas",
+            city="Quito",
+            latitude=-0.1807 + i * 1e-4,
+            longitude=-78.4678 - i * 1e-4,
+            distance_km=round(i * 0.05, 2),
+            is_24_hours=i % 3 == 0,
+            is_available=True,
+            available_now=True,
+            accepts_emergencies=True
+        )
+        for i in range(rows)
+    ]
+    return {
+        "success": True,
+        "count": len(doctors),
+        "doctors": doctors,
+        "search_params": {"symptom": "chest pain", "radius_km": 50}
+    }
+
+
+def appointments_payload(rows: int) -> dict:
+    """Mirror dict(row) for SELECT a.*, d.full_name ... FROM appointments a"""
+    start = datetime(2025, 1, 1, 9, 0)
+    appointments = [
+        {
+            'id': str(uuid.uuid4()),
+            'patient_id': str(uuid.uuid4()),
+            'doctor_id': i % 50,
+            'appointment_type': "scheduled",
+            'appointment_date': start + timedelta(hours=i),
+            'status': "confirmed",
+            'symptom': "headache",
+            'notes': None,
+            'latitude': Decimal("-0.18070000"),
+            'longitude': Decimal("-78.46780000"),
+            'created_at': start,
+            'updated_at': start,
+            'doctor_name': "Dr. María González",
+            'specialty': "Cardiologist",
+            'sub_specialty': "Interventional Cardiology",
+            'doctor_phone': "+593-2-2345678"
+        }
+        for i in range(rows)
+    ]
+    return {"success": True, "appointments": appointments, "count": len(appointments)}
+
+
+def stdlib_render(payload: dict) -> bytes:
+    """What FastAPI does for a returned dict with the default JSONResponse"""
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+def orjson_render(payload: dict) -> bytes:
+    """Hot endpoints return FastJSONResponse directly, skipping jsonable_encoder"""
+    return FastJSONResponse(content=payload).body
+
+
+def check_identical(name: str, payload: dict) -> None:
+    """Both renderers are compact (no spaces after separators), so the bytes must match exactly"""
+    if stdlib_render(payload) != orjson_render(payload):
+        raise SystemExit(f"{name}: orjson output differs from jsonable_encoder + json")
+
+
+def measure(fn, payload, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        body = fn(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(body)
+
+
+def main(rows: int, iterations: int):
+    print(f"rows per payload: {rows}, iterations: {iterations}")
+    for name, payload in (
+        ("search", search_payload(rows)),
+        ("appointments", appointments_payload(rows)),
+    ):
+        check_identical(name, payload)
+        baseline, baseline_size = measure(stdlib_render, payload, iterations)
+        fast, fast_size = measure(orjson_render, payload, iterations)
+        print(f"{name:<13} stdlib {baseline:8.3f} ms ({baseline_size:,} B)  "
+              f"orjson {fast:8.3f} ms ({fast_size:,} B)  "
+              f"speedup {baseline / fast:5.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rows, args.iterations)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark patient history: Python row conversion vs Postgres json_agg
+
+Run from the backend directory against a populated database:
+    python -m benchmarks.bench_patient_history --patients 20 --iterations 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from api_endpoints import get_patient_history
+from database import get_pool, close_pool
+
+
+async def legacy_path(patient_id: str) -> bytes:
+    """Current path: three result sets -> dict(row) -> jsonable_encoder -> json"""
+    content = await get_patient_history(patient_id, aggregate=False, current_user={})
+    return JSONResponse(content=jsonable_encoder(content)).body
+
+
+async def aggregate_path(patient_id: str) -> bytes:
+    """Postgres builds the JSON document, endpoint returns the bytes as-is"""
+    response = await get_patient_history(patient_id, aggregate=True, current_user={})
+    return response.body
+
+
+async def measure(fn, patient_ids, iterations):
+    """Return per-call latencies in milliseconds and the average payload size"""
+    timings = []
+    sizes = []
+    for _ in range(iterations):
+        for patient_id in patient_ids:
+            start = time.perf_counter()
+            body = await fn(patient_id)
+            timings.append((time.perf_counter() - start) * 1000)
+            sizes.append(len(body))
+    return timings, statistics.mean(sizes)
+
+
+def report(name, timings, avg_size):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{name:<12} mean {statistics.mean(timings):7.3f} ms  "
+          f"p50 {statistics.median(timings):7.3f} ms  p95 {p95:7.3f} ms  "
+          f"payload {avg_size:,.0f} bytes")
+
+
+async def main(patients: int, iterations: int):
+    pool = await get_pool()
+    try:
+        # Patients with the longest histories exercise the conversion cost the most
+        rows = await pool.fetch("""
+            SELECT patient_id, COUNT(*) AS total
+            FROM appointments
+            GROUP BY patient_id
+            ORDER BY total DESC
+            LIMIT $1
+        """, patients)
+        patient_ids = [row['patient_id'] for row in rows]
+        if not patient_ids:
+            print("No appointments found - load data first")
+            return
+
+        print(f"Patients: {len(patient_ids)} (top history size {rows[0]['total']}), "
+              f"iterations: {iterations}")
+
+        # Warm up prepared statements on both paths
+        await legacy_path(patient_ids[0])
+        await aggregate_path(patient_ids[0])
+
+        report("legacy", *await measure(legacy_path, patient_ids, iterations))
+        report("json_agg", *await measure(aggregate_path, patient_ids, iterations))
+    finally:
+        await close_pool()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.patients, args.iterations))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Cold start: per-module import time of main.py and time until the app can serve
+
+Each run is a fresh interpreter, so nothing is cached in sys.modules:
+  imports     python -X importtime -c "import main", parsed into main's
+              direct imports and the heaviest modules overall (cumulative
+              time, i.e. including everything they import)
+  cold start  import main + the app's startup handlers (pool with its first
+              connection, cache listener, ...) - what a new worker costs
+              before it answers its first request. The rest of the pool
+              warms in the background and isn't counted.
+
+Run from the backend directory; startup needs a reachable DATABASE_URL,
+--no-startup measures the import alone:
+    python -m benchmarks.cold_start --runs 5
+    python -m benchmarks.cold_start --no-startup --budget 1500
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Prints {"import_ms": ..., "startup_ms": ...} as its last line
+_COLD_START_SCRIPT = """
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+startup_ms = None
+if {startup}:
+    async def serve():
+        async with main.app.router.lifespan_context(main.app):
+            return (time.perf_counter() - imported) * 1000
+    startup_ms = asyncio.run(serve())
+print(json.dumps({{"import_ms": (imported - start) * 1000, "startup_ms": startup_ms}}))
+"""
+
+
+@dataclass
+class ImportTime:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int          # 0 for modules imported by the -c statement itself
+
+
+def parse_importtime(stderr: str) -> List[ImportTime]:
+    """Entries of -X importtime output, in the order the interpreter reported them"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header
+        indent = len(name) - len(name.lstrip())
+        entries.append(ImportTime(name.strip(), int(self_us), int(cumulative_us), (indent - 1) // 2))
+    return entries
+
+
+def direct_imports(entries: List[ImportTime], module: str) -> List[ImportTime]:
+    """Modules first imported by `module` itself, heaviest first"""
+    children: List[ImportTime] = []
+    for i, entry in enumerate(entries):
+        if entry.module != module:
+            continue
+        # Children are reported before their parent, one level deeper
+        for child in reversed(entries[:i]):
+            if child.depth <= entry.depth:
+                break
+            if child.depth == entry.depth + 1:
+                children.append(child)
+        break
+    return sorted(children, key=lambda e: e.cumulative_us, reverse=True)
+
+
+def measure_imports(module: str = "main") -> List[ImportTime]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_cold_start(startup: bool = True) -> Dict[str, float]:
+    """One fresh interpreter: {"import_ms", "startup_ms" (None without startup), "total_ms"}"""
+    result = subprocess.run(
+        [sys.executable, "-c", _COLD_START_SCRIPT.format(startup=startup)],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    )
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings["total_ms"] = timings["import_ms"] + (timings["startup_ms"] or 0.0)
+    return timings
+
+
+def format_imports(entries: List[ImportTime], top: int) -> str:
+    lines = ["direct imports of main (cumulative ms):"]
+    for entry in direct_imports(entries, "main")[:top]:
+        lines.append(f"  {entry.cumulative_us / 1000:8.1f}  {entry.module}")
+    lines.append("heaviest modules (cumulative ms / self ms):")
+    for entry in sorted(entries, key=lambda e: e.cumulative_us, reverse=True)[:top]:
+        lines.append(f"  {entry.cumulative_us / 1000:8.1f}  {entry.self_us / 1000:7.1f}  {entry.module}")
+    return "\n".join(lines)
+
+
+def main(args) -> int:
+    print(format_imports(measure_imports(), args.top))
+
+    runs = [measure_cold_start(startup=args.startup) for _ in range(args.runs)]
+    print(f"\ncold start over {args.runs} fresh interpreters (median ms):")
+    for key in ("import_ms", "startup_ms", "total_ms"):
+        values = [run[key] for run in runs if run[key] is not None]
+        if values:
+            print(f"  {key[:-3]:8} {statistics.median(values):8.1f}  (min {min(values):.1f}, max {max(values):.1f})")
+
+    total = statistics.median(run["total_ms"] for run in runs)
+    if args.budget is not None and total > args.budget:
+        print(f"\nFAIL: cold start {total:.0f} ms is over the {args.budget:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=15, help="modules listed per table")
+    parser.add_argument("--no-startup", dest="startup", action="store_false",
+                        help="time the import only (no database needed)")
+    parser.add_argument("--budget", type=float, help="exit non-zero if the median cold start exceeds this (ms)")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+End-to-end API load test: scripted scenarios with per-endpoint latency percentiles
+
+Drives the FastAPI app either in-process (httpx ASGI transport, no network
+or server overhead) or through a real uvicorn server, runs each scenario
+with N concurrent virtual users for a fixed time, and reports throughput
+and p50/p95/p99 per endpoint. Results are written as JSON; pass a previous
+result with --compare to flag regressions.
+
+Scenarios:
+  emergency_search  bursts of /emergency/find-doctors and /api/doctors/search
+  login_storm       concurrent /auth/login (password hashing under load)
+  chat_polling      patients re-fetching busy chat threads
+  calendar_load     doctors paging week/month calendars and their alert queue
+
+Run from the backend directory against a populated database (see
+synthetic_data.py):
+    python -m benchmarks.load_test --target asgi --duration 10 --concurrency 20
+    python -m benchmarks.load_test --target uvicorn --workers 4 --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+LOAD_TEST_PASSWORD = "LoadTest123!"
+LOAD_TEST_EMAIL = "loadtest.{}@medicure.test"
+
+# A run is a regression if p95 grew by more than this fraction
+DEFAULT_MAX_REGRESSION = 0.2
+
+
+@dataclass
+class Fixtures:
+    """Real ids from the database so requests hit populated rows"""
+    doctors: List[tuple]                 # (doctor_id, token)
+    chat_appointments: List[tuple]       # (appointment_id, token of its patient)
+    logins: List[str]                    # emails with LOAD_TEST_PASSWORD
+    locations: List[tuple]               # (latitude, longitude) to search around
+
+
+@dataclass
+class Recorder:
+    """Latencies (ms) and error counts per endpoint label"""
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    enabled: bool = True
+
+    def record(self, label: str, elapsed_ms: float, ok: bool) -> None:
+        if not self.enabled:
+            return
+        if ok:
+            self.latencies[label].append(elapsed_ms)
+        else:
+            self.errors[label] += 1
+
+
+class VirtualUser:
+    """One closed-loop client: issues a request, waits for it, issues the next"""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, fixtures: Fixtures, rng: random.Random):
+        self.client = client
+        self.recorder = recorder
+        self.fixtures = fixtures
+        self.rng = rng
+
+    async def request(self, label: str, method: str, url: str, token: Optional[str] = None, **kwargs) -> None:
+        headers = {"Authorization": f"Bearer {token}"} if token else None
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, headers=headers, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        self.recorder.record(label, (time.perf_counter() - start) * 1000, ok)
+
+
+async def emergency_search(user: VirtualUser) -> None:
+    latitude, longitude = user.rng.choice(user.fixtures.locations)
+    latitude += user.rng.gauss(0, 0.02)
+    longitude += user.rng.gauss(0, 0.02)
+    await user.request("POST /emergency/find-doctors", "POST", "/emergency/find-doctors", json={
+        "symptom": "chest pain",
+        "patient_latitude": latitude,
+        "patient_longitude": longitude,
+        "radius_km": 10,
+    })
+    await user.request("POST /api/doctors/search", "POST", "/api/doctors/search", json={
+        "symptom": user.rng.choice(["chest pain", "fever", "headache", "cough", "rash"]),
+        "latitude": latitude,
+        "longitude": longitude,
+        "radius_km": 10,
+    })
+
+
+async def login_storm(user: VirtualUser) -> None:
+    await user.request("POST /auth/login", "POST", "/auth/login", json={
+        "email": user.rng.choice(user.fixtures.logins),
+        "password": LOAD_TEST_PASSWORD,
+    })
+
+
+async def chat_polling(user: VirtualUser) -> None:
+    appointment_id, token = user.rng.choice(user.fixtures.chat_appointments)
+    await user.request(
+        "GET /api/chat/messages/{appointment_id}", "GET", f"/api/chat/messages/{appointment_id}", token
+    )
+
+
+async def calendar_load(user: VirtualUser) -> None:
+    doctor_id, token = user.rng.choice(user.fixtures.doctors)
+    view = user.rng.choice(["week", "week", "month"])
+    anchor = date.today() - timedelta(weeks=user.rng.randint(0, 12))
+    await user.request(
+        f"GET /api/doctors/{{doctor_id}}/calendar?view={view}", "GET",
+        f"/api/doctors/{doctor_id}/calendar", token, params={"from": anchor.isoformat(), "view": view}
+    )
+    await user.request(
+        "GET /api/doctors/{doctor_id}/emergency-alerts", "GET",
+        f"/api/doctors/{doctor_id}/emergency-alerts", token, params={"status": "all"}
+    )
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "emergency_search": emergency_search,
+    "login_storm": login_storm,
+    "chat_polling": chat_polling,
+    "calendar_load": calendar_load,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, seconds: float) -> Dict[str, Dict]:
+    """Per-endpoint count, error count, throughput and latency percentiles"""
+    summary = {}
+    for label in sorted(set(recorder.latencies) | set(recorder.errors)):
+        values = sorted(recorder.latencies.get(label, []))
+        summary[label] = {
+            "requests": len(values),
+            "errors": recorder.errors.get(label, 0),
+            "throughput_rps": round(len(values) / seconds, 2) if seconds else 0.0,
+            "mean_ms": round(statistics.fmean(values), 3) if values else 0.0,
+            "p50_ms": round(percentile(values, 0.50), 3),
+            "p95_ms": round(percentile(values, 0.95), 3),
+            "p99_ms": round(percentile(values, 0.99), 3),
+            "max_ms": round(values[-1], 3) if values else 0.0,
+        }
+    return summary
+
+
+def compare(current: Dict, baseline: Dict, max_regression: float = DEFAULT_MAX_REGRESSION) -> List[str]:
+    """Endpoints whose p95 grew by more than max_regression (or that started failing)"""
+    regressions = []
+    for scenario, result in current["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        for label, stats in result["endpoints"].items():
+            before = previous["endpoints"].get(label)
+            if not before:
+                continue
+            if stats["errors"] > before["errors"]:
+                regressions.append(f"{scenario} {label}: errors {before['errors']} -> {stats['errors']}")
+            if before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + max_regression):
+                regressions.append(
+                    f"{scenario} {label}: p95 {before['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms"
+                )
+    return regressions
+
+
+async def run_scenario(client: httpx.AsyncClient, fixtures: Fixtures, scenario: str,
+                       concurrency: int, duration: float, warmup: float, seed: int) -> Dict:
+    """Run one scenario with `concurrency` users; the first `warmup` seconds aren't recorded"""
+    step = SCENARIOS[scenario]
+    recorder = Recorder(enabled=False)
+    deadline = time.perf_counter() + warmup + duration
+
+    async def virtual_user(n: int) -> None:
+        user = VirtualUser(client, recorder, fixtures, random.Random(f"{seed}:{scenario}:{n}"))
+        while time.perf_counter() < deadline:
+            await step(user)
+
+    async def start_recording() -> float:
+        await asyncio.sleep(warmup)
+        recorder.enabled = True
+        return time.perf_counter()
+
+    async with asyncio.TaskGroup() as group:
+        started = group.create_task(start_recording())
+        for n in range(concurrency):
+            group.create_task(virtual_user(n))
+    elapsed = time.perf_counter() - started.result()
+
+    endpoints = summarize(recorder, elapsed)
+    total_requests = sum(stats["requests"] for stats in endpoints.values())
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "throughput_rps": round(total_requests / elapsed, 2),
+        "endpoints": endpoints,
+    }
+
+
+async def load_fixtures(logins: int = 20) -> Fixtures:
+    """Pick the busiest doctors and chat threads; create the login accounts once"""
+    import asyncpg
+
+    from auth_pg import create_access_token, get_password_hash
+    from database import DATABASE_URL
+    from synthetic_data import CITIES
+
+    def token(user_id: str, email: str, role: str) -> str:
+        return create_access_token(
+            {"sub": email, "role": role, "user_id": user_id}, expires_delta=timedelta(hours=2)
+        )
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        doctors = await conn.fetch('''
+            SELECT d.id, u.id AS user_id, u.email FROM doctors d
+            JOIN users u ON u.id = d.user_id
+            JOIN (
+                SELECT doctor_id FROM appointments
+                GROUP BY doctor_id ORDER BY COUNT(*) DESC LIMIT 50
+            ) busiest ON busiest.doctor_id = d.id
+        ''')
+        threads = await conn.fetch('''
+            SELECT a.id, u.id AS user_id, u.email FROM appointments a
+            JOIN users u ON u.id = a.patient_id
+            JOIN (
+                SELECT appointment_id FROM chat_messages
+                GROUP BY appointment_id ORDER BY COUNT(*) DESC LIMIT 200
+            ) busiest ON busiest.appointment_id = a.id
+        ''')
+        if not (doctors and threads):
+            raise SystemExit("Not enough data to load test - run synthetic_data.py first")
+
+        emails = [LOAD_TEST_EMAIL.format(i) for i in range(logins)]
+        hashed = get_password_hash(LOAD_TEST_PASSWORD)
+        await conn.executemany('''
+            INSERT INTO users (email, hashed_password, role, name)
+            VALUES ($1, $2, 'patient', 'Load Test')
+            ON CONFLICT (email) DO NOTHING
+        ''', [(email, hashed) for email in emails])
+    finally:
+        await conn.close()
+
+    return Fixtures(
+        doctors=[(row['id'], token(row['user_id'], row['email'], 'doctor')) for row in doctors],
+        chat_appointments=[(row['id'], token(row['user_id'], row['email'], 'patient')) for row in threads],
+        logins=emails,
+        locations=[(lat, lng) for _, lat, lng, _ in CITIES],
+    )
+
+
+class AsgiTarget:
+    """The app in this process; lifespan (pool, listeners) is run around the test"""
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        from main import app
+
+        self._lifespan = app.router.lifespan_context(app)
+        await self._lifespan.__aenter__()
+        self._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://asgi")
+        return self._client
+
+    async def __aexit__(self, *exc) -> None:
+        await self._client.aclose()
+        await self._lifespan.__aexit__(*exc)
+
+
+class UvicornTarget:
+    """A uvicorn server in a subprocess (or an already running one when url is given)"""
+
+    def __init__(self, port: int, workers: int, url: Optional[str] = None):
+        self.port = port
+        self.workers = workers
+        self.url = url or f"http://127.0.0.1:{port}"
+        self._process = None if url else subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=os.environ.copy(),
+        )
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        self._client = httpx.AsyncClient(base_url=self.url, limits=limits, timeout=30)
+        for _ in range(150):
+            try:
+                if (await self._client.get("/health")).status_code == 200:
+                    return self._client
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+        await self.__aexit__()
+        raise SystemExit(f"Server at {self.url} did not become healthy")
+
+    async def __aexit__(self, *exc) -> None:
+        await self._client.aclose()
+        if self._process:
+            self._process.terminate()
+            self._process.wait(timeout=10)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def report(scenario: str, result: Dict) -> None:
+    print(f"\n{scenario}: {result['throughput_rps']:,.1f} req/s "
+          f"({result['concurrency']} users, {result['duration_s']} s)")
+    for label, stats in result["endpoints"].items():
+        print(f"  {label:<52} {stats['throughput_rps']:>8.1f}/s  p50 {stats['p50_ms']:7.1f}  "
+              f"p95 {stats['p95_ms']:7.1f}  p99 {stats['p99_ms']:7.1f} ms  errors {stats['errors']}")
+
+
+async def main(args) -> int:
+    fixtures = await load_fixtures()
+    if args.target == "asgi":
+        target = AsgiTarget()
+    else:
+        target = UvicornTarget(args.port, args.workers, args.url)
+
+    results = {
+        "meta": {
+            "target": args.target,
+            "workers": args.workers if args.target == "uvicorn" else None,
+            "revision": git_revision(),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    async with target as client:
+        for scenario in args.scenarios:
+            result = await run_scenario(
+                client, fixtures, scenario, args.concurrency, args.duration, args.warmup, args.seed
+            )
+            results["scenarios"][scenario] = result
+            report(scenario, result)
+
+    output = args.output or RESULTS_DIR / f"load-{args.target}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        if baseline["meta"]["target"] != args.target:
+            print(f"⚠️  Baseline was measured against {baseline['meta']['target']}, not {args.target}")
+        regressions = compare(results, baseline, args.max_regression)
+        for line in regressions:
+            print(f"✗ {line}")
+        if regressions:
+            return 1
+        print(f"✓ No regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=20, help="virtual users per scenario")
+    parser.add_argument("--duration", type=float, default=10.0, help="recorded seconds per scenario")
+    parser.add_argument("--warmup", type=float, default=2.0, help="unrecorded seconds before each scenario")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="load test an already running server instead of starting uvicorn")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="result file (default: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="baseline result to check for regressions")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="allowed p95 growth as a fraction (default 0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.url:
+        args.target = "uvicorn"
+    sys.exit(asyncio.run(main(args)))
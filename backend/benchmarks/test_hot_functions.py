@@ -0,0 +1,110 @@
+"""
+Micro-benchmarks for the pure-Python hot paths of search and auth
+
+Inputs are fixed so runs are comparable. The baseline lives in
+benchmarks/baseline/ (one directory per platform, as pytest-benchmark stores
+it). Check for regressions against it with:
+
+    uv run python -m pytest benchmarks/test_hot_functions.py --benchmark-storage=benchmarks/baseline --benchmark-compare --benchmark-compare-fail=min:25%
+
+The minimum is compared rather than the median because it is the least
+sensitive to a busy machine. Record a new baseline after an intended change
+(or on a new machine) with --benchmark-save=baseline in place of the two
+compare options.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+import jwt
+import pytest
+
+from api_endpoints import ALGORITHM, SECRET_KEY
+from auth_pg import create_access_token, get_password_hash, verify_password
+from doctor_search import calculate_distance, match_symptom_to_specialties, rank_by_distance
+
+SYMPTOMS = [
+    "chest pain",
+    "My child has had a fever and a rash since yesterday",
+    "shortness of breath after climbing stairs, some dizziness and nausea",
+    "routine check-up",
+    "I fell off my bike and think I have a fracture in my wrist, there is some bleeding",
+]
+
+QUITO = (-0.1807, -78.4678)
+
+
+def search_rows(count: int, seed: int = 0):
+    """Rows shaped like SEARCH_DOCTORS_QUERY results (DECIMAL coordinates, as asyncpg returns them)"""
+    rng = random.Random(seed)
+    return [
+        {
+            "doctor_id": i,
+            "full_name": f"Dr. Doctor {i}",
+            "specialty": "General Practitioner",
+            "sub_specialty": None,
+            "phone": "+593-2-1234567",
+            "email": f"doctor{i}@medicure.ec",
+            "location_id": i,
+            "location_type": "clinic",
+            "clinic_name": f"Clinica {i}",
+            "address": "Av. Amazonas y Naciones Unidas",
+            "city": "Quito",
+            "latitude": Decimal(f"{QUITO[0] + rng.uniform(-0.3, 0.3):.8f}"),
+            "longitude": Decimal(f"{QUITO[1] + rng.uniform(-0.3, 0.3):.8f}"),
+            "is_24_hours": i % 10 == 0,
+            "is_available": True,
+            "available_now": True,
+            "accepts_emergencies": True,
+        }
+        for i in range(count)
+    ]
+
+
+def test_match_symptom_to_specialties(benchmark):
+    def match_all():
+        return [match_symptom_to_specialties(symptom) for symptom in SYMPTOMS]
+
+    matches = benchmark(match_all)
+    assert "Cardiologist" in matches[0]
+    assert matches[3] == []
+
+
+def test_calculate_distance(benchmark):
+    rng = random.Random(0)
+    points = [(QUITO[0] + rng.uniform(-0.3, 0.3), QUITO[1] + rng.uniform(-0.3, 0.3)) for _ in range(100)]
+
+    def distances():
+        return [calculate_distance(*QUITO, lat, lng) for lat, lng in points]
+
+    assert max(benchmark(distances)) < 60
+
+
+def test_rank_by_distance(benchmark):
+    rows = search_rows(500)
+    hits = benchmark(rank_by_distance, rows, *QUITO, 15.0, 20)
+    assert len(hits) == 20
+    assert hits == sorted(hits, key=lambda hit: hit.distance_km)
+
+
+def test_jwt_encode(benchmark):
+    claims = {"sub": "patient@test.com", "role": "patient", "user_id": "3f0e6b1c-0000-4000-8000-000000000001"}
+    token = benchmark(create_access_token, claims, timedelta(minutes=30))
+    assert token.count(".") == 2
+
+
+def test_jwt_decode(benchmark):
+    # Decoded the way get_current_user does it
+    token = create_access_token({"sub": "patient@test.com", "role": "patient"}, timedelta(minutes=30))
+    payload = benchmark(jwt.decode, token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["sub"] == "patient@test.com"
+
+
+@pytest.fixture(scope="module")
+def password_hash():
+    return get_password_hash("Test123!")
+
+
+def test_argon2_verify(benchmark, password_hash):
+    # ~tens of ms per call, so a fixed number of rounds instead of calibration
+    assert benchmark.pedantic(verify_password, args=("Test123!", password_hash), rounds=20, warmup_rounds=1)
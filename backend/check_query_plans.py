@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN the hot query shapes and check each one uses its index
+
+Sequential scans are disabled for the check, so the result says whether a
+matching index path exists at all, independent of how much data the local
+database happens to have. Exits non-zero if any query misses its index.
+
+    uv run python check_query_plans.py
+"""
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, Iterator
+
+import asyncpg
+
+from database import DATABASE_URL
+
+# (name, query, sample args, index the plan must use)
+HOT_QUERIES = [
+    (
+        "chat messages of an appointment",
+        """
+        SELECT cm.* FROM chat_messages cm
+        WHERE cm.appointment_id = $1
+        ORDER BY cm.created_at ASC
+        """,
+        ("appointment",),
+        "idx_chat_messages_appointment_created",
+    ),
+    (
+        "appointments of a patient",
+        """
+        SELECT a.* FROM appointments a
+        WHERE a.patient_id = $1
+        ORDER BY a.appointment_date DESC
+        """,
+        ("patient",),
+        "idx_appointments_patient_date",
+    ),
+    (
+        "appointments of a doctor",
+        """
+        SELECT a.* FROM appointments a
+        WHERE a.doctor_id = $1
+        ORDER BY a.appointment_date DESC
+        """,
+        (1,),
+        "idx_appointments_doctor_date",
+    ),
+    (
+        "doctor calendar window",
+        """
+        SELECT a.id FROM appointments a
+        WHERE a.doctor_id = $1
+        AND a.appointment_date >= $2
+        AND a.appointment_date < $3
+        ORDER BY a.appointment_date
+        """,
+        (1, datetime(2025, 1, 5), datetime(2025, 1, 5) + timedelta(days=7)),
+        "idx_appointments_doctor_date",
+    ),
+    (
+        "prescriptions of a patient",
+        """
+        SELECT p.* FROM prescriptions p
+        WHERE p.patient_id = $1
+        ORDER BY p.issued_date DESC
+        """,
+        ("patient",),
+        "idx_prescriptions_patient_issued",
+    ),
+    (
+        "lab tests of a patient",
+        """
+        SELECT lt.* FROM lab_tests lt
+        WHERE lt.patient_id = $1
+        ORDER BY lt.ordered_date DESC
+        """,
+        ("patient",),
+        "idx_lab_tests_patient_ordered",
+    ),
+    (
+        "availability history of a doctor",
+        """
+        SELECT * FROM doctor_availability_updates
+        WHERE doctor_id = $1
+        ORDER BY created_at DESC
+        LIMIT 1
+        """,
+        (1,),
+        "idx_doctor_availability_updates_doctor_created",
+    ),
+    (
+        "emergency alert queue",
+        """
+        SELECT ea.id FROM emergency_alerts ea
+        WHERE ea.doctor_id = $1
+        AND ea.status = ANY($2::text[])
+        ORDER BY ea.severity_rank, ea.created_at DESC
+        LIMIT 50
+        """,
+        (1, ["pending"]),
+        "idx_emergency_alerts_doctor_status_priority",
+    ),
+]
+
+
+def plan_nodes(node: Dict) -> Iterator[Dict]:
+    """Every node of an EXPLAIN (FORMAT JSON) plan tree"""
+    yield node
+    for child in node.get('Plans', []):
+        yield from plan_nodes(child)
+
+
+async def explain(conn, query: str, args) -> Dict:
+    async with conn.transaction():
+        await conn.execute('SET LOCAL enable_seqscan = off')
+        plan = await conn.fetchval(f'EXPLAIN (FORMAT JSON) {query}', *args)
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]['Plan']
+
+
+async def check_query_plans() -> bool:
+    conn = await asyncpg.connect(DATABASE_URL)
+    ok = True
+    try:
+        for name, query, args, index in HOT_QUERIES:
+            nodes = list(plan_nodes(await explain(conn, query, args)))
+            used = {node['Index Name'] for node in nodes if 'Index Name' in node}
+            sorted_in_memory = any(node['Node Type'] == 'Sort' for node in nodes)
+
+            if index in used:
+                note = " (+ sort)" if sorted_in_memory else ""
+                print(f"✓ {name}: {index}{note}")
+            else:
+                ok = False
+                print(f"✗ {name}: expected {index}, plan uses {sorted(used) or 'no index'}")
+    finally:
+        await conn.close()
+    return ok
+
+
+if __name__ == '__main__':
+    sys.exit(0 if asyncio.run(check_query_plans()) else 1)
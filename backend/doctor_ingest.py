@@ -0,0 +1,317 @@
+"""
+Bulk doctor ingestion
+
+A batch of scraped doctor records is normalized in Python, streamed into two
+temp tables with COPY (copy_records_to_table), and merged into users,
+doctors, doctor_service_locations and doctor_availability with one
+set-based statement per table. A batch costs a fixed handful of round trips
+however many doctors and availability slots it holds.
+
+Locations and availability slots are upserted on their natural keys (see
+migration 0013), so repeated or incremental loads only write what changed.
+A loaded doctor's slots that are missing from the new schedule are marked
+unavailable.
+
+Record shape (as in scrape_quito_doctors.QUITO_DOCTORS_SEED):
+    full_name, specialty, sub_specialty, phone, clinic_name, address, city,
+    latitude, longitude, is_24_hours,
+    availability_schedule = {"monday": ["08:00-17:00"], ...}
+"""
+from dataclasses import dataclass, field
+from datetime import time
+from typing import Dict, Iterable, List, Tuple
+
+# Placeholder password for accounts created for scraped doctors
+SCRAPED_DOCTOR_PASSWORD_HASH = "$2b$12$dummy_hash_for_scraped_doctors"
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# doctor_availability.day_of_week: 0=Sunday, 1=Monday, ...
+DAY_OF_WEEK = {
+    'sunday': 0,
+    'monday': 1,
+    'tuesday': 2,
+    'wednesday': 3,
+    'thursday': 4,
+    'friday': 5,
+    'saturday': 6
+}
+
+DOCTOR_STAGE_COLUMNS = (
+    'row_no', 'email', 'full_name', 'specialty', 'sub_specialty', 'phone',
+    'location_type', 'clinic_name', 'address', 'city', 'latitude', 'longitude'
+)
+SLOT_STAGE_COLUMNS = ('row_no', 'day_of_week', 'start_time', 'end_time', 'is_24_hours')
+
+CREATE_STAGE_TABLES = """
+    CREATE TEMP TABLE doctor_ingest_stage (
+        row_no INTEGER PRIMARY KEY,
+        email TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        specialty TEXT NOT NULL,
+        sub_specialty TEXT,
+        phone TEXT,
+        location_type TEXT NOT NULL,
+        clinic_name TEXT NOT NULL,
+        address TEXT NOT NULL,
+        city TEXT,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION
+    ) ON COMMIT DROP;
+
+    CREATE TEMP TABLE doctor_ingest_slot_stage (
+        row_no INTEGER NOT NULL,
+        day_of_week INTEGER NOT NULL,
+        start_time TIME NOT NULL,
+        end_time TIME NOT NULL,
+        is_24_hours BOOLEAN NOT NULL
+    ) ON COMMIT DROP;
+"""
+
+MERGE_USERS = """
+    INSERT INTO users (email, hashed_password, role, name)
+    SELECT DISTINCT ON (email) email, $1, 'doctor', full_name
+    FROM doctor_ingest_stage
+    ORDER BY email, row_no DESC
+    ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name
+    WHERE users.name IS DISTINCT FROM EXCLUDED.name
+"""
+
+MERGE_DOCTORS = """
+    INSERT INTO doctors (user_id, full_name, specialty, sub_specialty, phone, email)
+    SELECT DISTINCT ON (u.id)
+        u.id, s.full_name, s.specialty, s.sub_specialty, s.phone, s.email
+    FROM doctor_ingest_stage s
+    JOIN users u ON u.email = s.email
+    WHERE NOT EXISTS (SELECT 1 FROM doctors d WHERE d.user_id = u.id)
+    ORDER BY u.id, s.row_no
+"""
+
+# Stage row -> doctor (the oldest doctor row if a user somehow has several)
+MAP_DOCTORS = """
+    CREATE TEMP TABLE doctor_ingest_doctor_map ON COMMIT DROP AS
+    SELECT DISTINCT ON (s.row_no) s.row_no, d.id AS doctor_id
+    FROM doctor_ingest_stage s
+    JOIN users u ON u.email = s.email
+    JOIN doctors d ON d.user_id = u.id
+    ORDER BY s.row_no, d.id
+"""
+
+# Upserts on the natural keys only write rows that are new or changed, so
+# re-loading an unchanged batch touches nothing
+MERGE_LOCATIONS = """
+    INSERT INTO doctor_service_locations (
+        doctor_id, location_type, name, address, city, country, latitude, longitude
+    )
+    SELECT DISTINCT ON (m.doctor_id, s.clinic_name, s.address)
+        m.doctor_id, s.location_type, s.clinic_name, s.address,
+        s.city, 'Ecuador', s.latitude, s.longitude
+    FROM doctor_ingest_doctor_map m
+    JOIN doctor_ingest_stage s USING (row_no)
+    ORDER BY m.doctor_id, s.clinic_name, s.address, s.row_no DESC
+    ON CONFLICT (doctor_id, name, address) DO UPDATE SET
+        location_type = EXCLUDED.location_type,
+        city = EXCLUDED.city,
+        latitude = EXCLUDED.latitude,
+        longitude = EXCLUDED.longitude
+    WHERE (
+        doctor_service_locations.location_type, doctor_service_locations.city,
+        doctor_service_locations.latitude, doctor_service_locations.longitude
+    ) IS DISTINCT FROM (
+        EXCLUDED.location_type, EXCLUDED.city, EXCLUDED.latitude, EXCLUDED.longitude
+    )
+"""
+
+MAP_LOCATIONS = """
+    CREATE TEMP TABLE doctor_ingest_location_map ON COMMIT DROP AS
+    SELECT m.row_no, m.doctor_id, l.id AS location_id
+    FROM doctor_ingest_doctor_map m
+    JOIN doctor_ingest_stage s USING (row_no)
+    JOIN doctor_service_locations l
+        ON l.doctor_id = m.doctor_id
+        AND l.name = s.clinic_name
+        AND l.address = s.address
+"""
+
+MERGE_AVAILABILITY = """
+    INSERT INTO doctor_availability (
+        doctor_id, location_id, day_of_week, start_time, end_time, is_24_hours, is_available
+    )
+    SELECT DISTINCT ON (m.location_id, sl.day_of_week, sl.start_time)
+        m.doctor_id, m.location_id, sl.day_of_week, sl.start_time, sl.end_time, sl.is_24_hours, TRUE
+    FROM doctor_ingest_slot_stage sl
+    JOIN doctor_ingest_location_map m USING (row_no)
+    ORDER BY m.location_id, sl.day_of_week, sl.start_time, sl.row_no DESC
+    ON CONFLICT (
+        doctor_id, location_id, (COALESCE(day_of_week, -1)), (COALESCE(start_time, TIME '00:00'))
+    ) DO UPDATE SET
+        end_time = EXCLUDED.end_time,
+        is_24_hours = EXCLUDED.is_24_hours,
+        is_available = TRUE
+    WHERE (
+        doctor_availability.end_time, doctor_availability.is_24_hours, doctor_availability.is_available
+    ) IS DISTINCT FROM (
+        EXCLUDED.end_time, EXCLUDED.is_24_hours, TRUE
+    )
+"""
+
+# Slots a loaded doctor no longer has at a loaded location stay in place
+# (the upsert above revives them if they come back) but stop being offered
+RETIRE_AVAILABILITY = """
+    UPDATE doctor_availability da
+    SET is_available = FALSE
+    FROM (SELECT DISTINCT doctor_id, location_id FROM doctor_ingest_location_map) m
+    WHERE da.doctor_id = m.doctor_id
+        AND da.location_id = m.location_id
+        AND da.is_available
+        AND NOT EXISTS (
+            SELECT 1
+            FROM doctor_ingest_slot_stage sl
+            JOIN doctor_ingest_location_map sm USING (row_no)
+            WHERE sm.location_id = da.location_id
+                AND sl.day_of_week = COALESCE(da.day_of_week, -1)
+                AND sl.start_time = COALESCE(da.start_time, TIME '00:00')
+        )
+"""
+
+DROP_STAGE_TABLES = """
+    DROP TABLE
+        doctor_ingest_stage, doctor_ingest_slot_stage,
+        doctor_ingest_doctor_map, doctor_ingest_location_map
+"""
+
+
+@dataclass
+class IngestResult:
+    """Rows written per table (inserted, or updated because they changed)"""
+    users: int = 0
+    doctors: int = 0
+    locations: int = 0
+    availability_slots: int = 0
+    retired_slots: int = 0
+    rejected: List[Tuple[Dict, str]] = field(default_factory=list)
+
+    def add(self, other: "IngestResult") -> None:
+        self.users += other.users
+        self.doctors += other.doctors
+        self.locations += other.locations
+        self.availability_slots += other.availability_slots
+        self.retired_slots += other.retired_slots
+        self.rejected.extend(other.rejected)
+
+
+def doctor_email(doctor: Dict) -> str:
+    """Synthetic login email for a scraped doctor, unique per doctor and clinic"""
+    name = doctor['full_name'].lower().replace(' ', '.')
+    clinic = doctor['clinic_name'].lower().replace(' ', '')
+    return f"{name}@{clinic}.com"
+
+
+def _parse_time(value: str) -> time:
+    hour, minute = map(int, value.split(':'))
+    return time(hour, minute)
+
+
+def normalize_doctor(row_no: int, doctor: Dict) -> Tuple[tuple, List[tuple]]:
+    """Stage row and availability slot rows for one record (raises on bad input)"""
+    doctor_row = (
+        row_no,
+        doctor_email(doctor),
+        doctor['full_name'],
+        doctor['specialty'],
+        doctor.get('sub_specialty'),
+        doctor.get('phone'),
+        'hospital' if doctor.get('is_24_hours') else 'clinic',
+        doctor['clinic_name'],
+        doctor['address'],
+        doctor.get('city'),
+        doctor.get('latitude'),
+        doctor.get('longitude'),
+    )
+
+    slot_rows = []
+    for day, time_slots in (doctor.get('availability_schedule') or {}).items():
+        day_of_week = DAY_OF_WEEK.get(day.lower())
+        if day_of_week is None:
+            continue
+        for time_slot in time_slots:
+            start_str, end_str = time_slot.split('-')
+            slot_rows.append((
+                row_no,
+                day_of_week,
+                _parse_time(start_str),
+                _parse_time(end_str),
+                start_str == "00:00" and end_str == "23:59",
+            ))
+
+    return doctor_row, slot_rows
+
+
+def normalize_doctors(doctors: Iterable[Dict]) -> Tuple[List[tuple], List[tuple], List[Tuple[Dict, str]]]:
+    """Normalize a batch; records that can't be parsed are returned as rejected"""
+    doctor_rows, slot_rows, rejected = [], [], []
+    for row_no, doctor in enumerate(doctors):
+        try:
+            doctor_row, slots = normalize_doctor(row_no, doctor)
+        except (KeyError, ValueError, AttributeError) as e:
+            rejected.append((doctor, f"{type(e).__name__}: {e}"))
+            continue
+        doctor_rows.append(doctor_row)
+        slot_rows.extend(slots)
+    return doctor_rows, slot_rows, rejected
+
+
+def _row_count(status: str) -> int:
+    """Rows affected from a command tag such as 'INSERT 0 42'"""
+    return int(status.split()[-1])
+
+
+async def ingest_batch(conn, doctors: List[Dict]) -> IngestResult:
+    """Stage and merge one batch in a single transaction"""
+    doctor_rows, slot_rows, rejected = normalize_doctors(doctors)
+    result = IngestResult(rejected=rejected)
+    if not doctor_rows:
+        return result
+
+    async with conn.transaction():
+        await conn.execute(CREATE_STAGE_TABLES)
+        await conn.copy_records_to_table(
+            'doctor_ingest_stage', records=doctor_rows, columns=DOCTOR_STAGE_COLUMNS
+        )
+        if slot_rows:
+            await conn.copy_records_to_table(
+                'doctor_ingest_slot_stage', records=slot_rows, columns=SLOT_STAGE_COLUMNS
+            )
+        await conn.execute('ANALYZE doctor_ingest_stage')
+
+        result.users = _row_count(await conn.execute(MERGE_USERS, SCRAPED_DOCTOR_PASSWORD_HASH))
+        result.doctors = _row_count(await conn.execute(MERGE_DOCTORS))
+        await conn.execute(MAP_DOCTORS)
+        result.locations = _row_count(await conn.execute(MERGE_LOCATIONS))
+        await conn.execute(MAP_LOCATIONS)
+        result.availability_slots = _row_count(await conn.execute(MERGE_AVAILABILITY))
+        result.retired_slots = _row_count(await conn.execute(RETIRE_AVAILABILITY))
+        # ON COMMIT DROP doesn't fire when the caller's transaction is still open
+        await conn.execute(DROP_STAGE_TABLES)
+
+    return result
+
+
+async def ingest_doctors(conn, doctors: Iterable[Dict], batch_size: int = DEFAULT_BATCH_SIZE) -> IngestResult:
+    """
+    Load doctor records in batches of batch_size, one transaction per batch.
+    Users are upserted by email and locations/slots by natural key, so
+    re-running over the same records is safe and cheap. Refresh
+    doctor_open_now afterwards to make new schedules visible to emergency
+    search.
+    """
+    total = IngestResult()
+    batch: List[Dict] = []
+    for doctor in doctors:
+        batch.append(doctor)
+        if len(batch) >= batch_size:
+            total.add(await ingest_batch(conn, batch))
+            batch = []
+    if batch:
+        total.add(await ingest_batch(conn, batch))
+    return total
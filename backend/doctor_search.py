@@ -2,8 +2,12 @@
 Doctor search and matching logic
 """
 import math
-from typing import List, Dict, Optional
-from datetime import datetime
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, time
+
+from asyncpg import Range
 
 # Symptom to specialty mapping
 SYMPTOM_SPECIALTY_MAP = {
@@ -73,6 +77,57 @@ SYMPTOM_SPECIALTY_MAP = {
     "nose": ["ENT Specialist", "General Practitioner"],
 }
 
+@dataclass(slots=True)
+class DoctorSearchHit:
+    """
+    One doctor at one service location, shared by the doctor search and
+    emergency search endpoints. Slotted so a page of hits doesn't allocate a
+    dict per result; json_response serializes it natively via orjson.
+    """
+    doctor_id: int
+    full_name: str
+    specialty: str
+    sub_specialty: Optional[str]
+    phone: Optional[str]
+    email: Optional[str]
+    location_id: int
+    location_type: str
+    clinic_name: str
+    address: str
+    city: Optional[str]
+    latitude: float
+    longitude: float
+    distance_km: float
+    is_24_hours: bool
+    is_available: bool
+    # Doctor's own toggle from doctor_availability_current (default TRUE)
+    available_now: bool
+    accepts_emergencies: bool
+
+    @classmethod
+    def from_row(cls, row, latitude: float, longitude: float, distance_km: float) -> "DoctorSearchHit":
+        """Build a hit from a search row; coordinates are passed already converted"""
+        return cls(
+            row['doctor_id'],
+            row['full_name'],
+            row['specialty'],
+            row['sub_specialty'],
+            row['phone'],
+            row['email'],
+            row['location_id'],
+            row['location_type'],
+            row['clinic_name'],
+            row['address'],
+            row['city'],
+            latitude,
+            longitude,
+            distance_km,
+            row['is_24_hours'],
+            row['is_available'],
+            row['available_now'],
+            row['accepts_emergencies']
+        )
+
 def match_symptom_to_specialties(symptom: str) -> List[str]:
     """
     Match a symptom description to relevant medical specialties
@@ -114,114 +169,144 @@ def calculate_distance(lat1: float, lon1: float, lat2: float, lon2: float) -> fl
     distance = R * c
     return round(distance, 2)
 
+# One row per (doctor, location): a doctor with several schedule rows at a
+# location is still a single hit. 24-hour rows win so is_24_hours is accurate.
+SEARCH_DOCTORS_QUERY = """
+    SELECT DISTINCT ON (d.id, dsl.id)
+        d.id as doctor_id,
+        d.full_name,
+        d.specialty,
+        d.sub_specialty,
+        d.phone,
+        d.email,
+        dsl.id as location_id,
+        dsl.location_type,
+        dsl.name as clinic_name,
+        dsl.address,
+        dsl.city,
+        dsl.latitude,
+        dsl.longitude,
+        da.is_24_hours,
+        da.is_available,
+        COALESCE(dac.available_now, TRUE) AS available_now,
+        COALESCE(dac.accepts_emergencies, TRUE) AS accepts_emergencies
+    FROM doctors d
+    JOIN doctor_service_locations dsl ON d.id = dsl.doctor_id
+    JOIN doctor_availability da ON d.id = da.doctor_id AND dsl.id = da.location_id
+    LEFT JOIN doctor_availability_current dac ON dac.doctor_id = d.id
+    WHERE da.is_available = TRUE
+    AND dsl.latitude IS NOT NULL
+    AND dsl.longitude IS NOT NULL
+    {conditions}
+    ORDER BY d.id, dsl.id, da.is_24_hours DESC
+"""
+
+def minutes_since_midnight(value: time) -> int:
+    """Convert a time of day to the minute offsets stored in doctor_availability.minute_range"""
+    return value.hour * 60 + value.minute
+
 async def search_doctors(
     conn,
     symptom: str,
     patient_latitude: float,
     patient_longitude: float,
     radius_km: float = 50,
-    limit: int = 20
-) -> List[Dict]:
+    limit: int = 20,
+    day_of_week: Optional[int] = None,
+    time_window: Optional[Tuple[time, time]] = None
+) -> List[DoctorSearchHit]:
     """
     Search for available doctors based on symptom and location
+
+    day_of_week (0=Sunday) and time_window (start, end) restrict results to
+    doctors whose schedule overlaps that window, answered from the GiST
+    index on (day_of_week, minute_range) instead of scanning schedules.
     """
     # Match symptom to specialties
     specialties = match_symptom_to_specialties(symptom)
     
-    # Query doctors with matching specialties
+    conditions = []
+    args = []
+
+    # Specific specialty match; no match shows all available doctors
     if specialties:
-        # Specific specialty match
-        query = """
-            SELECT 
-                d.id as doctor_id,
-                d.full_name,
-                d.specialty,
-                d.sub_specialty,
-                d.phone,
-                d.email,
-                dsl.id as location_id,
-                dsl.location_type,
-                dsl.name as clinic_name,
-                dsl.address,
-                dsl.city,
-                dsl.latitude,
-                dsl.longitude,
-                da.is_24_hours,
-                da.is_available
-            FROM doctors d
-            JOIN doctor_service_locations dsl ON d.id = dsl.doctor_id
-            JOIN doctor_availability da ON d.id = da.doctor_id AND dsl.id = da.location_id
-            WHERE d.specialty = ANY($1)
-            AND da.is_available = TRUE
-            AND dsl.latitude IS NOT NULL
-            AND dsl.longitude IS NOT NULL
-        """
-        rows = await conn.fetch(query, specialties)
-    else:
-        # No specific match - show all available doctors
-        query = """
-            SELECT 
-                d.id as doctor_id,
-                d.full_name,
-                d.specialty,
-                d.sub_specialty,
-                d.phone,
-                d.email,
-                dsl.id as location_id,
-                dsl.location_type,
-                dsl.name as clinic_name,
-                dsl.address,
-                dsl.city,
-                dsl.latitude,
-                dsl.longitude,
-                da.is_24_hours,
-                da.is_available
-            FROM doctors d
-            JOIN doctor_service_locations dsl ON d.id = dsl.doctor_id
-            JOIN doctor_availability da ON d.id = da.doctor_id AND dsl.id = da.location_id
-            WHERE da.is_available = TRUE
-            AND dsl.latitude IS NOT NULL
-            AND dsl.longitude IS NOT NULL
-        """
-        rows = await conn.fetch(query)
-    
-    # Calculate distances and sort
+        args.append(specialties)
+        conditions.append(f"AND d.specialty = ANY(${len(args)})")
+
+    if day_of_week is not None:
+        # NULL day_of_week means the schedule applies to every day
+        args.append(day_of_week)
+        conditions.append(f"AND (da.day_of_week = ${len(args)} OR da.day_of_week IS NULL)")
+
+    if time_window is not None:
+        window_start, window_end = time_window
+        args.append(Range(minutes_since_midnight(window_start), minutes_since_midnight(window_end)))
+        conditions.append(f"AND da.minute_range && ${len(args)}::int4range")
+
+    query = SEARCH_DOCTORS_QUERY.format(conditions="\n    ".join(conditions))
+    rows = await conn.fetch(query, *args)
+    return rank_by_distance(rows, patient_latitude, patient_longitude, radius_km, limit)
+
+def rank_by_distance(
+    rows,
+    patient_latitude: float,
+    patient_longitude: float,
+    radius_km: float,
+    limit: int
+) -> List[DoctorSearchHit]:
+    """Hits within radius_km of the patient, nearest first"""
     doctors_with_distance = []
     for row in rows:
+        latitude = float(row['latitude'])
+        longitude = float(row['longitude'])
         distance = calculate_distance(
             patient_latitude,
             patient_longitude,
-            float(row['latitude']),
-            float(row['longitude'])
+            latitude,
+            longitude
         )
         
         # Only include doctors within radius
         if distance <= radius_km:
-            doctors_with_distance.append({
-                'doctor_id': row['doctor_id'],
-                'full_name': row['full_name'],
-                'specialty': row['specialty'],
-                'sub_specialty': row['sub_specialty'],
-                'phone': row['phone'],
-                'email': row['email'],
-                'location_id': row['location_id'],
-                'location_type': row['location_type'],
-                'clinic_name': row['clinic_name'],
-                'address': row['address'],
-                'city': row['city'],
-                'latitude': float(row['latitude']),
-                'longitude': float(row['longitude']),
-                'distance_km': distance,
-                'is_24_hours': row['is_24_hours'],
-                'is_available': row['is_available']
-            })
+            doctors_with_distance.append(
+                DoctorSearchHit.from_row(row, latitude, longitude, distance)
+            )
     
     # Sort by distance (nearest first)
-    doctors_with_distance.sort(key=lambda x: x['distance_km'])
+    doctors_with_distance.sort(key=attrgetter('distance_km'))
     
     # Limit results
     return doctors_with_distance[:limit]
 
+async def get_current_availability(conn, doctor_ids: List[int]) -> Dict[int, Dict]:
+    """
+    Current availability for many doctors in one query.
+    Doctors that never posted an update get the defaults (available).
+    """
+    rows = await conn.fetch("""
+        SELECT doctor_id, available_now, accepts_emergencies, notes, updated_at
+        FROM doctor_availability_current
+        WHERE doctor_id = ANY($1::int[])
+    """, doctor_ids)
+
+    availability = {
+        doctor_id: {
+            'available_now': True,
+            'accepts_emergencies': True,
+            'notes': None,
+            'updated_at': None
+        }
+        for doctor_id in doctor_ids
+    }
+    for row in rows:
+        availability[row['doctor_id']] = {
+            'available_now': row['available_now'],
+            'accepts_emergencies': row['accepts_emergencies'],
+            'notes': row['notes'],
+            'updated_at': row['updated_at']
+        }
+    return availability
+
 async def create_emergency_request(
     conn,
     patient_id: int,
@@ -9,3 +9,4 @@ DROP TABLE IF EXISTS users CASCADE;
 DROP TABLE IF EXISTS cities CASCADE;
 DROP TABLE IF EXISTS states CASCADE;
 DROP TABLE IF EXISTS countries CASCADE;
+DROP TABLE IF EXISTS schema_migrations CASCADE;
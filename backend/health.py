@@ -0,0 +1,228 @@
+"""
+Liveness and readiness checks
+
+/health (liveness) only proves the worker can answer: restart it if this fails.
+/health/ready (readiness) checks what the worker depends on, so a load
+balancer can stop routing to it while it is saturated:
+
+    database      SELECT 1 round trip through the pool; cached for
+                  PING_CACHE_SECONDS so frequent probes cost one query per
+                  interval, and concurrent probes share one ping
+    pool          connections in use / max size
+    event_loop    worst heartbeat lag recently seen by profiler's monitor
+    outbound      consecutive failures per external service (Twilio,
+                  WhatsApp, Google), recorded by the call sites through
+                  outbound_call()
+
+Each check is ok, degraded or unhealthy; the report takes the worst. Only
+unhealthy answers 503: a degraded worker is slow but still better than no
+worker, and outbound failures never go past degraded since every worker
+shares the same Twilio/Google.
+"""
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from database import get_pool
+from profiler import recent_loop_lag
+
+OK, DEGRADED, UNHEALTHY = "ok", "degraded", "unhealthy"
+_SEVERITY = {OK: 0, DEGRADED: 1, UNHEALTHY: 2}
+
+PING_CACHE_SECONDS = float(os.getenv("HEALTH_PING_CACHE_SECONDS", "2"))
+PING_TIMEOUT = 1.0
+PING_DEGRADED_MS = 100.0
+POOL_DEGRADED_SATURATION = 0.8
+LOOP_LAG_DEGRADED_MS = 200.0
+LOOP_LAG_UNHEALTHY_MS = 1000.0
+OUTBOUND_DEGRADED_FAILURES = 3
+
+STARTED_AT = time.monotonic()
+
+
+def _worst(*statuses: str) -> str:
+    return max(statuses, key=_SEVERITY.__getitem__, default=OK)
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+# ============================================================================
+# OUTBOUND SERVICES
+# ============================================================================
+
+@dataclass
+class OutboundStatus:
+    configured: bool = True
+    consecutive_failures: int = 0
+    last_success: Optional[float] = None
+    last_failure: Optional[float] = None
+    last_error: Optional[str] = None
+
+
+_outbound: Dict[str, OutboundStatus] = {}
+
+
+def register_outbound(service: str, configured: bool = True) -> None:
+    """Declare a dependency up front so readiness lists it before its first call"""
+    _outbound.setdefault(service, OutboundStatus()).configured = configured
+
+
+def record_outbound(service: str, ok: bool, error: Optional[str] = None) -> None:
+    status = _outbound.setdefault(service, OutboundStatus())
+    if ok:
+        status.consecutive_failures = 0
+        status.last_success = time.time()
+    else:
+        status.consecutive_failures += 1
+        status.last_failure = time.time()
+        status.last_error = error
+
+
+class _OutboundCall:
+    __slots__ = ("ok", "error")
+
+    def __init__(self):
+        self.ok = True
+        self.error = None
+
+    def fail(self, error: str) -> None:
+        """The service answered, but with a server-side error"""
+        self.ok = False
+        self.error = error
+
+
+@contextmanager
+def outbound_call(service: str, answered: Tuple[type, ...] = ()):
+    """
+    Record whether a call to `service` succeeded. Exceptions listed in
+    `answered` mean the service responded (e.g. rejected a bad token) and
+    don't count against it; call .fail() for 5xx-style responses.
+    """
+    call = _OutboundCall()
+    try:
+        yield call
+    except answered:
+        record_outbound(service, True)
+        raise
+    except Exception as e:
+        record_outbound(service, False, f"{type(e).__name__}: {e}"[:200])
+        raise
+    else:
+        record_outbound(service, call.ok, call.error)
+
+
+def check_outbound() -> Tuple[str, Dict]:
+    services = {}
+    for service, status in sorted(_outbound.items()):
+        if not status.configured:
+            state = "unconfigured"
+        elif status.consecutive_failures >= OUTBOUND_DEGRADED_FAILURES:
+            state = DEGRADED
+        else:
+            state = OK
+        services[service] = {
+            "status": state,
+            "consecutive_failures": status.consecutive_failures,
+            "last_success": _iso(status.last_success),
+            "last_failure": _iso(status.last_failure),
+            "last_error": status.last_error,
+        }
+    return _worst(*(s["status"] for s in services.values() if s["status"] != "unconfigured")), services
+
+
+# ============================================================================
+# DATABASE, POOL, EVENT LOOP
+# ============================================================================
+
+_ping_result: Optional[Dict] = None
+_ping_checked_at = 0.0
+_ping_lock = asyncio.Lock()
+
+
+async def _ping() -> Dict:
+    pool = await get_pool()
+    start = time.perf_counter()
+    try:
+        async with pool.acquire(timeout=PING_TIMEOUT) as conn:
+            await conn.fetchval("SELECT 1", timeout=PING_TIMEOUT)
+    except (asyncio.TimeoutError, TimeoutError):
+        return {"status": UNHEALTHY, "error": f"no answer within {PING_TIMEOUT:g}s (pool exhausted or database down)"}
+    except Exception as e:
+        return {"status": UNHEALTHY, "error": f"{type(e).__name__}: {e}"}
+    latency_ms = (time.perf_counter() - start) * 1000
+    return {
+        "status": DEGRADED if latency_ms > PING_DEGRADED_MS else OK,
+        "latency_ms": round(latency_ms, 2),
+    }
+
+
+async def check_database() -> Dict:
+    global _ping_result, _ping_checked_at
+    async with _ping_lock:
+        if _ping_result is None or time.monotonic() - _ping_checked_at >= PING_CACHE_SECONDS:
+            _ping_result = await _ping()
+            _ping_checked_at = time.monotonic()
+    return {**_ping_result, "age_seconds": round(time.monotonic() - _ping_checked_at, 2)}
+
+
+async def check_pool() -> Dict:
+    pool = await get_pool()
+    size, idle, max_size = pool.get_size(), pool.get_idle_size(), pool.get_max_size()
+    in_use = size - idle
+    saturation = in_use / max_size if max_size else 1.0
+    if saturation >= 1.0:
+        status = UNHEALTHY
+    elif saturation >= POOL_DEGRADED_SATURATION:
+        status = DEGRADED
+    else:
+        status = OK
+    return {"status": status, "in_use": in_use, "idle": idle, "size": size, "max_size": max_size,
+            "saturation": round(saturation, 3)}
+
+
+def check_event_loop() -> Dict:
+    lag = recent_loop_lag()
+    if lag is None:
+        return {"status": OK, "monitored": False}
+    lag_ms = lag * 1000
+    if lag_ms >= LOOP_LAG_UNHEALTHY_MS:
+        status = UNHEALTHY
+    elif lag_ms >= LOOP_LAG_DEGRADED_MS:
+        status = DEGRADED
+    else:
+        status = OK
+    return {"status": status, "monitored": True, "max_lag_ms": round(lag_ms, 2)}
+
+
+def liveness() -> Dict:
+    return {
+        "status": "healthy",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 1),
+    }
+
+
+async def readiness() -> Tuple[int, Dict]:
+    """(HTTP status, report); 503 only when some check is unhealthy"""
+    # Pool first: the ping itself briefly takes a connection
+    pool = await check_pool()
+    database = await check_database()
+    event_loop = check_event_loop()
+    outbound_status, outbound = check_outbound()
+    status = _worst(database["status"], pool["status"], event_loop["status"], outbound_status)
+    return (503 if status == UNHEALTHY else 200), {
+        "status": status,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "checks": {
+            "database": database,
+            "pool": pool,
+            "event_loop": event_loop,
+            "outbound": {"status": outbound_status, "services": outbound},
+        },
+    }
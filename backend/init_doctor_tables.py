@@ -6,6 +6,8 @@ import asyncpg
 from dotenv import load_dotenv
 import os
 
+from migrate import apply_migrations
+
 load_dotenv()
 
 async def init_tables():
@@ -28,29 +30,9 @@ async def init_tables():
         )
     
     try:
-        print("Creating base tables...")
-
-        # Read and execute base table creation SQL
-        with open('create_base_tables.sql', 'r') as f:
-            base_sql = f.read()
-        await conn.execute(base_sql)
-        print("✓ Base tables created successfully")
-
-        print("\nCreating geo-structure tables...")
-
-        # Read and execute geo-structure SQL
-        with open('create_geo_structure.sql', 'r') as f:
-            geo_sql = f.read()
-        await conn.execute(geo_sql)
-        print("✓ Geo-structure tables created successfully")
-
-        print("\nCreating doctor tables...")
-
-        # Read and execute table creation SQL
-        with open('create_doctor_tables.sql', 'r') as f:
-            create_sql = f.read()
-        await conn.execute(create_sql)
-        print("✓ Doctor tables created successfully")
+        print("Applying schema migrations...")
+        applied = await apply_migrations(conn)
+        print(f"✓ Schema up to date ({len(applied)} migration(s) applied)")
         
         # Read and execute seed data SQL
         print("\nSeeding doctor data...")
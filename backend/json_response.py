@@ -0,0 +1,37 @@
+"""Fast JSON responses backed by orjson"""
+from decimal import Decimal
+from typing import Any
+
+import asyncpg
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(obj: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    # DECIMAL columns (latitude/longitude) come back from asyncpg as Decimal
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, asyncpg.Record):
+        return dict(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize content to JSON bytes (datetime, date, time and UUID are native)"""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    App-wide JSON response class.
+
+    Endpoints that return this class directly also skip FastAPI's
+    jsonable_encoder pass, which is the expensive part for large row lists.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
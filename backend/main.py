@@ -1,4 +1,4 @@
-from fastapi import FastAPI, HTTPException, status, Depends, Request
+from fastapi import FastAPI, HTTPException, status, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from auth_pg import (
@@ -6,15 +6,34 @@ from auth_pg import (
     create_user, authenticate_user, create_access_token,
     get_user_by_email, ACCESS_TOKEN_EXPIRE_MINUTES, log_audit_event
 )
-from database import get_pool, close_pool
-from datetime import timedelta
+from database import get_pool, close_pool, start_pool_warmup
+from json_response import FastJSONResponse
+from doctor_search import DoctorSearchHit
+from profile_cache import (
+    fetch_profile, get_profile, get_profile_complete, invalidate_profile,
+    start_invalidation_listener, stop_invalidation_listener
+)
+from open_now import start_open_now_refresher, stop_open_now_refresher
+from profiler import start_loop_monitor, stop_loop_monitor
+from health import liveness, outbound_call, readiness, register_outbound
+from metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, render_metrics
+from structured_logging import get_logger
+from tracing import CLIENT, TracingMiddleware, start_span
+from datetime import timedelta, time
 from typing import Optional, Dict
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 from twilio_otp import twilio_otp_service
 import json
+import orjson
+
+log = get_logger(__name__)
 
-app = FastAPI(title="Medicure API", version="1.0.0")
+register_outbound("google")
+
+app = FastAPI(
+    title="Medicure API",
+    version="1.0.0",
+    default_response_class=FastJSONResponse
+)
 
 # CORS middleware
 app.add_middleware(
@@ -25,16 +44,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route latency, DB queries/time and pool wait, served on /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Request spans (no-op unless TRACING_EXPORTER is set)
+app.add_middleware(TracingMiddleware)
+
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup():
     """Initialize database connection pool on startup"""
     await get_pool()
+    start_pool_warmup()
     print("✓ Database connection pool initialized")
+    await start_invalidation_listener()
+    print("✓ Profile cache invalidation listener started")
+    start_open_now_refresher()
+    start_loop_monitor()
 
 @app.on_event("shutdown")
 async def shutdown():
     """Close database connection pool on shutdown"""
+    await stop_loop_monitor()
+    await stop_open_now_refresher()
+    await stop_invalidation_listener()
     await close_pool()
     print("✓ Database connection pool closed")
 
@@ -157,13 +190,15 @@ async def login(user_data: UserLogin):
 async def google_auth(google_request: GoogleAuthRequest):
     """Authenticate user with Google OAuth ID token, access token, or authorization code"""
     try:
-        print(f"\n=== Google Auth Request ===")
-        print(f"Role: {google_request.role}")
-        print(f"Has id_token: {bool(google_request.id_token)}")
-        print(f"Has access_token: {bool(google_request.access_token)}")
-        print(f"Has code: {bool(google_request.code)}")
-        print(f"Has email: {bool(google_request.email)}")
-        
+        log.debug(
+            "google_auth_requested",
+            role=google_request.role,
+            has_id_token=bool(google_request.id_token),
+            has_access_token=bool(google_request.access_token),
+            has_code=bool(google_request.code),
+            has_email=bool(google_request.email),
+        )
+
         # List of valid client IDs (must match frontend .env client IDs)
         valid_client_ids = [
             '920375448724-pdnedfikt5kh3cphc1n89i270n4hasps.apps.googleusercontent.com',  # Web Client ID
@@ -192,7 +227,13 @@ async def google_auth(google_request: GoogleAuthRequest):
 
             async with httpx.AsyncClient(timeout=10.0) as client:
                 try:
-                    response = await client.post(token_endpoint, data=token_data)
+                    with (
+                        start_span("google.oauth2.token", CLIENT, {"server.address": "oauth2.googleapis.com"}),
+                        outbound_call("google") as call,
+                    ):
+                        response = await client.post(token_endpoint, data=token_data)
+                        if response.status_code >= 500:
+                            call.fail(f"HTTP {response.status_code}")
                 except httpx.TimeoutException:
                     raise HTTPException(
                         status_code=status.HTTP_408_REQUEST_TIMEOUT,
@@ -221,7 +262,7 @@ async def google_auth(google_request: GoogleAuthRequest):
 
         # Handle access_token from expo-auth-session (user info already fetched by frontend)
         if google_request.access_token and google_request.email:
-            print(f"Using access_token flow with email: {google_request.email}")
+            log.debug("google_auth_access_token_flow", email=google_request.email)
             # User info was already fetched by frontend, use it directly
             idinfo = {
                 'email': google_request.email,
@@ -234,6 +275,10 @@ async def google_auth(google_request: GoogleAuthRequest):
                 detail="Either id_token, access_token with email, or code must be provided"
             )
         else:
+            # Imported on first use: google-auth (and requests) cost ~150 ms at startup
+            from google.oauth2 import id_token
+            from google.auth.transport import requests as google_requests
+
             # Verify the ID token - try without audience first, then with specific client IDs
             idinfo = None
             verification_errors = []
@@ -242,32 +287,37 @@ async def google_auth(google_request: GoogleAuthRequest):
             for client_id in [None] + valid_client_ids:
                 try:
                     if client_id is None:
-                        print("Attempting verification without audience...")
-                        idinfo = id_token.verify_oauth2_token(
-                            id_token_str,
-                            google_requests.Request()
-                        )
-                        print(f"✓ Token verified without audience check")
-                        print(f"  Token audience: {idinfo.get('aud')}")
+                        # ValueError is a rejected token, not a Google outage
+                        with (
+                            start_span("google.id_token.verify", CLIENT),
+                            outbound_call("google", answered=(ValueError,)),
+                        ):
+                            idinfo = id_token.verify_oauth2_token(
+                                id_token_str,
+                                google_requests.Request()
+                            )
+                        log.debug("google_token_verified", audience=idinfo.get('aud'))
                     else:
-                        idinfo = id_token.verify_oauth2_token(
-                            id_token_str,
-                            google_requests.Request(),
-                            audience=client_id
-                        )
-                        print(f"✓ Token verified with client_id: {client_id[:20]}...")
+                        with (
+                            start_span("google.id_token.verify", CLIENT, {"audience": client_id}),
+                            outbound_call("google", answered=(ValueError,)),
+                        ):
+                            idinfo = id_token.verify_oauth2_token(
+                                id_token_str,
+                                google_requests.Request(),
+                                audience=client_id
+                            )
+                        log.debug("google_token_verified", audience=client_id)
                     break
                 except ValueError as e:
                     error_msg = str(e)
                     if client_id:
                         verification_errors.append(f"{client_id[:20]}...: {error_msg}")
-                        print(f"✗ Verification failed for {client_id[:20]}...: {error_msg}")
-                    else:
-                        print(f"✗ Verification without audience failed: {error_msg}")
-                    
+                    log.debug("google_token_rejected", audience=client_id, error=error_msg)
+
                     # If it's a clock skew error, try to work around it
                     if "Token used too early" in error_msg or "Token used too late" in error_msg:
-                        print("⚠️  Clock skew detected - attempting workaround...")
+                        log.warning("google_token_clock_skew", error=error_msg)
                         try:
                             # Decode without verification to get claims
                             import json
@@ -282,19 +332,18 @@ async def google_auth(google_request: GoogleAuthRequest):
                                 # Check if token is from Google and has required fields
                                 if decoded.get('iss') in ['accounts.google.com', 'https://accounts.google.com']:
                                     if decoded.get('email') and decoded.get('email_verified'):
-                                        print(f"✓ Token manually validated (clock skew workaround)")
-                                        print(f"  Email: {decoded.get('email')}")
-                                        print(f"  Audience: {decoded.get('aud')}")
+                                        log.warning(
+                                            "google_token_accepted_despite_clock_skew",
+                                            email=decoded.get('email'), audience=decoded.get('aud')
+                                        )
                                         idinfo = decoded
                                         break
                         except Exception as decode_error:
-                            print(f"✗ Manual decode failed: {decode_error}")
+                            log.warning("google_token_decode_failed", error=str(decode_error))
                     continue
 
             if not idinfo:
-                print(f"All verification attempts failed:")
-                for err in verification_errors:
-                    print(f"  - {err}")
+                log.warning("google_auth_failed", errors=verification_errors)
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail=f"Invalid Google ID token. Tried {len(valid_client_ids)} client IDs."
@@ -349,6 +398,8 @@ async def google_auth(google_request: GoogleAuthRequest):
                 success=True
             )
 
+        log.info("google_auth_verified", user_id=user.id, role=user.role, is_new_user=is_new_user)
+
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
@@ -356,15 +407,8 @@ async def google_auth(google_request: GoogleAuthRequest):
             expires_delta=access_token_expires
         )
 
-        # Check if user has completed their profile
-        pool = await get_pool()
-        async with pool.acquire() as conn:
-            profile_result = await conn.fetchrow(
-                'SELECT profile_complete FROM user_profiles WHERE user_id = $1',
-                user.id
-            )
-
-        profile_complete = profile_result['profile_complete'] if profile_result else False
+        # Check if user has completed their profile (cached, warms the profile screen too)
+        profile_complete = await get_profile_complete(user.id)
 
         # Return response with profile completion status
         response_data = {
@@ -380,6 +424,7 @@ async def google_auth(google_request: GoogleAuthRequest):
     except HTTPException:
         raise
     except Exception as e:
+        log.exception("google_auth_error")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Google authentication failed: {str(e)}"
@@ -398,42 +443,47 @@ async def forgot_password(request: ForgotPasswordRequest):
     return {"message": "Password reset instructions sent to email"}
 
 @app.get("/users/{user_id}/profile")
-async def get_user_profile(user_id: str):
-    """Get user profile information"""
+async def get_user_profile(user_id: str, fields: Optional[str] = None):
+    """
+    Get user profile information
+
+    fields: optional comma-separated list of profile_data keys to return
+    (e.g. ?fields=specialty,licenseNumber); Postgres extracts them from the
+    JSONB column so the rest of the blob never leaves the database.
+    Full profiles are served from the read-through profile cache.
+    """
     try:
-        pool = await get_pool()
-        async with pool.acquire() as conn:
-            # Get user basic info
-            user = await conn.fetchrow('SELECT id, email, role, full_name FROM users WHERE id = $1', user_id)
+        requested_keys = [key.strip() for key in fields.split(',') if key.strip()] if fields else None
 
-            if not user:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="User not found"
-                )
+        if requested_keys:
+            pool = await get_pool()
+            async with pool.acquire() as conn:
+                user = await fetch_profile(conn, user_id, requested_keys)
+        else:
+            user = await get_profile(user_id)
 
-            # Get profile data
-            profile_result = await conn.fetchrow(
-                'SELECT profile_data, profile_complete FROM user_profiles WHERE user_id = $1',
-                user_id
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
             )
 
-            profile_complete = profile_result['profile_complete'] if profile_result else False
-            profile_data = json.loads(profile_result['profile_data']) if profile_result and profile_result['profile_data'] else {}
+        # profile_data arrives as JSON text; embed it without decoding
+        profile_data = user['profile_data']
 
-            return {
-                "user_id": user['id'],
-                "email": user['email'],
-                "role": user['role'],
-                "full_name": user['full_name'],
-                "profile_complete": profile_complete,
-                "profile_data": profile_data
-            }
+        return FastJSONResponse({
+            "user_id": user['id'],
+            "email": user['email'],
+            "role": user['role'],
+            "full_name": user['full_name'],
+            "profile_complete": user['profile_complete'],
+            "profile_data": orjson.Fragment(profile_data) if profile_data else {}
+        })
 
     except HTTPException:
         raise
     except Exception as e:
-        print(f"✗ Get profile error: {str(e)}")
+        log.exception("profile_fetch_error", user_id=user_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get profile: {str(e)}"
@@ -460,14 +510,16 @@ async def update_user_profile(user_id: str, profile_data: ProfileUpdateRequest):
             # Insert or update profile
             await conn.execute('''
                 INSERT INTO user_profiles (user_id, profile_data, profile_complete)
-                VALUES ($1, $2, $3)
+                VALUES ($1, $2::jsonb, $3)
                 ON CONFLICT(user_id) DO UPDATE SET
                     profile_data = EXCLUDED.profile_data,
                     profile_complete = EXCLUDED.profile_complete,
                     updated_at = CURRENT_TIMESTAMP
             ''', user_id, profile_json, profile_data.profile_complete)
 
-        print(f"✓ Profile updated for user {user_id}")
+            await invalidate_profile(conn, user_id)
+
+        log.info("profile_updated", user_id=user_id)
 
         return {
             "message": "Profile updated successfully",
@@ -478,7 +530,60 @@ async def update_user_profile(user_id: str, profile_data: ProfileUpdateRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"✗ Profile update error: {str(e)}")
+        log.exception("profile_update_error", user_id=user_id)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update profile: {str(e)}"
+        )
+
+@app.patch("/users/{user_id}/profile")
+async def patch_user_profile(user_id: str, profile_data: ProfileUpdateRequest):
+    """
+    Partially update user profile
+
+    Only the fields present in the request body are merged into the stored
+    JSONB (profile_data || patch); everything else is left untouched.
+    """
+    try:
+        patch = profile_data.dict(exclude_unset=True)
+        profile_complete = patch.get('profile_complete')
+
+        pool = await get_pool()
+        async with pool.acquire() as conn:
+            # Check if user exists
+            user = await conn.fetchrow('SELECT id, email FROM users WHERE id = $1', user_id)
+
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+
+            profile_complete = await conn.fetchval('''
+                INSERT INTO user_profiles (user_id, profile_data, profile_complete)
+                VALUES ($1, $2::jsonb, COALESCE($3, FALSE))
+                ON CONFLICT(user_id) DO UPDATE SET
+                    profile_data = user_profiles.profile_data || EXCLUDED.profile_data,
+                    profile_complete = COALESCE($3, user_profiles.profile_complete),
+                    updated_at = CURRENT_TIMESTAMP
+                RETURNING profile_complete
+            ''', user_id, json.dumps(patch), profile_complete)
+
+            await invalidate_profile(conn, user_id)
+
+        log.info("profile_patched", user_id=user_id, fields=sorted(patch))
+
+        return {
+            "message": "Profile updated successfully",
+            "user_id": user_id,
+            "profile_complete": profile_complete,
+            "updated_fields": sorted(patch)
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception("profile_patch_error", user_id=user_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to update profile: {str(e)}"
@@ -488,22 +593,15 @@ async def update_user_profile(user_id: str, profile_data: ProfileUpdateRequest):
 async def send_whatsapp_otp(request: WhatsAppOTPRequest):
     """Send OTP via Twilio WhatsApp"""
     try:
-        print(f"📱 WhatsApp OTP Request:")
-        print(f"   Phone: {request.phone_number}")
-        print(f"   Role: {request.role}")
-        
         # Check if user exists
         existing_user = await get_user_by_email(request.phone_number)
         is_new_user = existing_user is None
-        print(f"   Is new user: {is_new_user}")
-        
+
         # Send OTP via Twilio
-        print(f"   Calling Twilio service...")
         result = twilio_otp_service.send_otp(phone_number=request.phone_number)
-        print(f"   Twilio result: {result}")
-        
+
         if result.get("success"):
-            print(f"   ✅ OTP sent successfully!")
+            log.info("otp_sent", phone=request.phone_number, role=request.role, is_new_user=is_new_user)
             return {
                 "success": True,
                 "message": "OTP sent successfully",
@@ -511,7 +609,7 @@ async def send_whatsapp_otp(request: WhatsAppOTPRequest):
             }
         else:
             error_msg = result.get("error", "Failed to send OTP")
-            print(f"   ❌ Failed: {error_msg}")
+            log.warning("otp_send_failed", phone=request.phone_number, role=request.role, error=error_msg)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=error_msg
@@ -520,9 +618,7 @@ async def send_whatsapp_otp(request: WhatsAppOTPRequest):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"   ❌ Exception: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        log.exception("otp_send_error", phone=request.phone_number)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"WhatsApp OTP error: {str(e)}"
@@ -532,20 +628,12 @@ async def send_whatsapp_otp(request: WhatsAppOTPRequest):
 async def verify_whatsapp_otp(request: WhatsAppOTPVerifyRequest):
     """Verify Twilio WhatsApp OTP and create/login user"""
     try:
-        print(f"🔐 WhatsApp OTP Verification:")
-        print(f"   Phone: {request.phone_number}")
-        print(f"   OTP: {request.otp}")
-        print(f"   Name: {request.name}")
-        print(f"   Role: {request.role}")
-        
         # Validate OTP
-        print(f"   Validating OTP...")
         validation = twilio_otp_service.validate_otp(request.phone_number, request.otp)
-        print(f"   Validation result: {validation}")
-        
+
         if not validation.get("valid"):
             error = validation.get("error", "Invalid OTP")
-            print(f"   ❌ Validation failed: {error}")
+            log.warning("otp_verification_failed", phone=request.phone_number, role=request.role, error=error)
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail=error
@@ -581,7 +669,7 @@ async def verify_whatsapp_otp(request: WhatsAppOTPVerifyRequest):
             # Existing user - check if role matches
             if request.role and request.role != user.role:
                 # User trying to login with different role
-                print(f"   ⚠️ Role mismatch: User is {user.role}, trying to login as {request.role}")
+                log.warning("otp_role_mismatch", user_id=user.id, role=user.role, requested_role=request.role)
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail=f"This phone number is registered as {user.role}. Please use the correct login page."
@@ -603,15 +691,10 @@ async def verify_whatsapp_otp(request: WhatsAppOTPVerifyRequest):
             expires_delta=access_token_expires
         )
 
-        # Check profile completion
-        pool = await get_pool()
-        async with pool.acquire() as conn:
-            profile_result = await conn.fetchrow(
-                'SELECT profile_complete FROM user_profiles WHERE user_id = $1',
-                user.id
-            )
+        log.info("otp_verified", user_id=user.id, role=user.role, is_new_user=is_new_user)
 
-        profile_complete = profile_result['profile_complete'] if profile_result else False
+        # Check profile completion (cached)
+        profile_complete = await get_profile_complete(user.id)
         
         return {
             "access_token": access_token,
@@ -626,6 +709,7 @@ async def verify_whatsapp_otp(request: WhatsAppOTPVerifyRequest):
     except HTTPException:
         raise
     except Exception as e:
+        log.exception("otp_verification_error", phone=request.phone_number)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Verification error: {str(e)}"
@@ -647,19 +731,23 @@ async def find_emergency_doctors(request: EmergencyDoctorRequest):
             # Get doctors with their locations, sorted by distance
             query = """
                 SELECT
-                    d.id,
+                    d.id as doctor_id,
                     d.full_name,
                     d.specialty,
                     d.sub_specialty,
                     d.phone,
                     d.email,
+                    dsl.id as location_id,
+                    dsl.location_type,
                     dsl.name as clinic_name,
                     dsl.address,
                     dsl.city,
                     dsl.latitude,
                     dsl.longitude,
-                    da.is_24_hours,
-                    da.is_available,
+                    o.is_24_hours,
+                    o.is_available,
+                    COALESCE(dac.available_now, TRUE) AS available_now,
+                    COALESCE(dac.accepts_emergencies, TRUE) AS accepts_emergencies,
                     -- Haversine distance formula
                     (
                         6371 * acos(
@@ -670,15 +758,12 @@ async def find_emergency_doctors(request: EmergencyDoctorRequest):
                     ) AS distance_km
                 FROM doctors d
                 JOIN doctor_service_locations dsl ON d.id = dsl.doctor_id
-                JOIN doctor_availability da ON d.id = da.doctor_id AND dsl.id = da.location_id
-                WHERE da.is_available = TRUE
-                AND (
-                    da.is_24_hours = TRUE
-                    OR (
-                        da.day_of_week = EXTRACT(DOW FROM CURRENT_TIMESTAMP)::INTEGER
-                        AND CURRENT_TIME BETWEEN da.start_time AND da.end_time
-                    )
-                )
+                -- Precomputed open-now set, refreshed at schedule boundaries (open_now.py)
+                JOIN doctor_open_now o ON d.id = o.doctor_id AND dsl.id = o.location_id
+                -- Skip doctors who switched themselves off for emergencies
+                LEFT JOIN doctor_availability_current dac ON dac.doctor_id = d.id
+                WHERE COALESCE(dac.available_now, TRUE)
+                AND COALESCE(dac.accepts_emergencies, TRUE)
                 AND (
                     6371 * acos(
                         cos(radians($1)) * cos(radians(dsl.latitude)) *
@@ -697,28 +782,18 @@ async def find_emergency_doctors(request: EmergencyDoctorRequest):
                 request.radius_km
             )
 
-            # Convert to list of dicts
-            doctors_list = []
-            for doctor in doctors:
-                doctors_list.append({
-                    "id": doctor['id'],
-                    "full_name": doctor['full_name'],
-                    "specialty": doctor['specialty'],
-                    "sub_specialty": doctor['sub_specialty'],
-                    "phone": doctor['phone'],
-                    "email": doctor['email'],
-                    "clinic_name": doctor['clinic_name'],
-                    "address": doctor['address'],
-                    "city": doctor['city'],
-                    "latitude": float(doctor['latitude']) if doctor['latitude'] else None,
-                    "longitude": float(doctor['longitude']) if doctor['longitude'] else None,
-                    "distance_km": round(float(doctor['distance_km']), 2),
-                    "distance_mi": round(float(doctor['distance_km']) * 0.621371, 2),
-                    "is_24_hours": doctor['is_24_hours'],
-                    "is_available": doctor['is_available']
-                })
+            # Same slotted hit type as /api/doctors/search
+            doctors_list = [
+                DoctorSearchHit.from_row(
+                    doctor,
+                    float(doctor['latitude']),
+                    float(doctor['longitude']),
+                    round(float(doctor['distance_km']), 2)
+                )
+                for doctor in doctors
+            ]
 
-            return {
+            return FastJSONResponse({
                 "symptom": request.symptom,
                 "patient_location": {
                     "latitude": request.patient_latitude,
@@ -727,7 +802,7 @@ async def find_emergency_doctors(request: EmergencyDoctorRequest):
                 "radius_km": request.radius_km,
                 "doctors_found": len(doctors_list),
                 "doctors": doctors_list
-            }
+            })
 
     except Exception as e:
         print(f"Error finding emergency doctors: {str(e)}")
@@ -737,9 +812,27 @@ async def find_emergency_doctors(request: EmergencyDoctorRequest):
         )
 
 @app.get("/health")
+@app.get("/health/live")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "timestamp": "2025-01-01T00:00:00Z"}
+    """Liveness: the worker is up and its event loop answers"""
+    return liveness()
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: database, pool saturation, event-loop lag and outbound services"""
+    status_code, report = await readiness()
+    return FastJSONResponse(report, status_code=status_code)
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics for this worker process"""
+    pool = await get_pool()
+    gauges = [
+        ("db_pool_size", "Open connections in the pool", pool.get_size()),
+        ("db_pool_idle", "Idle connections in the pool", pool.get_idle_size()),
+        ("db_pool_max_size", "Maximum pool size", pool.get_max_size()),
+    ]
+    return Response(render_metrics(gauges), media_type=PROMETHEUS_CONTENT_TYPE)
 
 @app.get("/")
 async def root():
@@ -757,6 +850,10 @@ class DoctorSearchRequest(BaseModel):
     latitude: float
     longitude: float
     radius_km: Optional[float] = 50
+    # Optional scheduled-appointment window, e.g. Saturday 18:00-22:00
+    day_of_week: Optional[int] = None  # 0=Sunday, 1=Monday, ... 6=Saturday
+    window_start: Optional[time] = None
+    window_end: Optional[time] = None
 
 class EmergencyRequestCreate(BaseModel):
     doctor_id: int
@@ -768,9 +865,25 @@ class EmergencyRequestCreate(BaseModel):
 @app.post("/api/doctors/search")
 async def search_doctors_endpoint(request: DoctorSearchRequest):
     """
-    Search for available doctors based on symptom and location
+    Search for available doctors based on symptom and location,
+    optionally only those open during a day/time window
     """
     from doctor_search import search_doctors
+
+    if request.day_of_week is not None and not 0 <= request.day_of_week <= 6:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="day_of_week must be between 0 (Sunday) and 6 (Saturday)"
+        )
+
+    time_window = None
+    if request.window_start or request.window_end:
+        if not (request.window_start and request.window_end) or request.window_end <= request.window_start:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="window_start and window_end are both required and window_end must be after window_start"
+            )
+        time_window = (request.window_start, request.window_end)
     
     try:
         pool = await get_pool()
@@ -780,18 +893,23 @@ async def search_doctors_endpoint(request: DoctorSearchRequest):
                 request.symptom,
                 request.latitude,
                 request.longitude,
-                request.radius_km
+                request.radius_km,
+                day_of_week=request.day_of_week,
+                time_window=time_window
             )
             
-            return {
+            return FastJSONResponse({
                 "success": True,
                 "count": len(doctors),
                 "doctors": doctors,
                 "search_params": {
                     "symptom": request.symptom,
-                    "radius_km": request.radius_km
+                    "radius_km": request.radius_km,
+                    "day_of_week": request.day_of_week,
+                    "window_start": request.window_start,
+                    "window_end": request.window_end
                 }
-            }
+            })
     except Exception as e:
         print(f"Error searching doctors: {e}")
         raise HTTPException(
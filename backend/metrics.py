@@ -0,0 +1,215 @@
+"""
+Request metrics in Prometheus text format
+
+MetricsMiddleware times every request and labels it with the route template
+(/api/doctors/{doctor_id}/calendar, not the concrete path). The database
+layer (database.InstrumentedConnection / InstrumentedPool) reports each
+query and each pool acquire into the current request's RequestStats, so
+per route we get:
+
+    http_request_duration_seconds     latency histogram
+    http_request_db_queries           queries issued per request
+    http_request_db_seconds           time spent waiting on queries
+    http_request_pool_wait_seconds    time spent waiting for a pooled connection
+    http_response_size_bytes          response body size
+
+An endpoint whose db_seconds sum is close to its duration sum is DB-bound;
+a large pool_wait share means the pool is too small for the load.
+
+Metrics live in process memory: with several uvicorn workers each worker
+reports its own numbers, so scrape them individually.
+"""
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@dataclass
+class RequestStats:
+    """Database work done on behalf of one request"""
+    queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self._values.items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {value:g}'
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket (+Inf last), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        state = self._values.get(labels)
+        if state is None:
+            state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, state in sorted(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                yield f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {state[-1]:g}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+ROUTE_LABELS = ('method', 'route')
+
+REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route and status', ('method', 'route', 'status')
+)
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency', ROUTE_LABELS
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request', ROUTE_LABELS, QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    'http_request_db_seconds', 'Time spent in database queries per request', ROUTE_LABELS
+)
+REQUEST_POOL_WAIT = Histogram(
+    'http_request_pool_wait_seconds', 'Time spent waiting for a pooled connection per request', ROUTE_LABELS
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size', ROUTE_LABELS, SIZE_BUCKETS
+)
+# Every query, including background tasks outside any request
+DB_QUERY_DURATION = Histogram(
+    'db_query_duration_seconds', 'Database query latency'
+)
+# Observed by profiler.LoopLagMonitor
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds', 'How late event loop heartbeats run', buckets=LAG_BUCKETS
+)
+
+REGISTRY = (
+    REQUESTS, REQUEST_DURATION, REQUEST_DB_QUERIES, REQUEST_DB_SECONDS,
+    REQUEST_POOL_WAIT, RESPONSE_SIZE, DB_QUERY_DURATION, EVENT_LOOP_LAG,
+)
+
+
+def record_query(elapsed: float) -> None:
+    """Called by the database layer after every query"""
+    DB_QUERY_DURATION.observe((), elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+
+def record_pool_wait(elapsed: float) -> None:
+    """Called by the database layer after every pool acquire"""
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.pool_wait_seconds += elapsed
+
+
+@contextmanager
+def untracked():
+    """Don't attribute queries in this block to the request (e.g. pool resets)"""
+    token = _request_stats.set(None)
+    try:
+        yield
+    finally:
+        _request_stats.reset(token)
+
+
+def render_metrics(gauges: Iterable[Tuple[str, str, float]] = ()) -> str:
+    """Everything in the registry plus (name, help, value) gauges sampled at scrape time"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for name, documentation, value in gauges:
+        lines.extend((f'# HELP {name} {documentation}', f'# TYPE {name} gauge', f'{name} {value:g}'))
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streaming responses and background tasks are unaffected"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+        response_size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, response_size
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body':
+                response_size += len(message.get('body', b''))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_stats.reset(token)
+            # Set by the router on match; unmatched paths share one label to keep cardinality bounded
+            route = scope.get('route')
+            labels = (scope['method'], getattr(route, 'path', 'unmatched'))
+            REQUESTS.inc(labels + (str(status_code),))
+            REQUEST_DURATION.observe(labels, elapsed)
+            REQUEST_DB_QUERIES.observe(labels, stats.queries)
+            REQUEST_DB_SECONDS.observe(labels, stats.db_seconds)
+            REQUEST_POOL_WAIT.observe(labels, stats.pool_wait_seconds)
+            RESPONSE_SIZE.observe(labels, response_size)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Versioned schema migrations
+
+Migrations are the numbered files in migrations/ (0001_base_tables.sql, ...),
+applied in version order. Each applied version is recorded in
+schema_migrations, so running this again only applies new files.
+
+A migration runs in a single transaction unless its first line is
+`-- migrate: no-transaction`; those (CREATE INDEX CONCURRENTLY, ...) are run
+statement by statement outside a transaction and should be idempotent
+(IF NOT EXISTS), since a failure part way leaves the earlier statements applied.
+
+    uv run python migrate.py           # apply pending migrations
+    uv run python migrate.py status    # list applied / pending versions
+"""
+import asyncio
+import hashlib
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+import asyncpg
+
+MIGRATIONS_DIR = Path(__file__).parent / 'migrations'
+NO_TRANSACTION_MARKER = '-- migrate: no-transaction'
+
+# Serializes runners (e.g. several containers starting at once)
+MIGRATION_LOCK = 731_002
+
+_FILENAME = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+SCHEMA_MIGRATIONS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        checksum TEXT NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+@dataclass
+class Migration:
+    version: int
+    name: str
+    sql: str
+
+    @property
+    def transactional(self) -> bool:
+        return not self.sql.lstrip().startswith(NO_TRANSACTION_MARKER)
+
+    @property
+    def checksum(self) -> str:
+        return hashlib.sha256(self.sql.encode()).hexdigest()
+
+    def statements(self) -> List[str]:
+        """Split into single statements (only for the plain DDL of no-transaction files)"""
+        statements = []
+        for chunk in re.split(r';\s*$', self.sql, flags=re.MULTILINE):
+            code = '\n'.join(
+                line for line in chunk.splitlines()
+                if not line.strip().startswith('--')
+            ).strip()
+            if code:
+                statements.append(code)
+        return statements
+
+
+def load_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Read migrations from disk, ordered by version"""
+    migrations = {}
+    for path in sorted(directory.glob('*.sql')):
+        match = _FILENAME.match(path.name)
+        if not match:
+            raise ValueError(f"Migration file name must look like 0001_name.sql: {path.name}")
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f"Duplicate migration version {version}: {path.name}")
+        migrations[version] = Migration(version, match.group(2), path.read_text())
+    return [migrations[version] for version in sorted(migrations)]
+
+
+async def applied_versions(conn) -> dict:
+    """version -> checksum of every migration already applied"""
+    await conn.execute(SCHEMA_MIGRATIONS_TABLE)
+    rows = await conn.fetch('SELECT version, checksum FROM schema_migrations')
+    return {row['version']: row['checksum'] for row in rows}
+
+
+async def apply_migrations(conn, migrations: Optional[List[Migration]] = None) -> List[Migration]:
+    """Apply pending migrations in order; returns the ones applied"""
+    migrations = load_migrations() if migrations is None else migrations
+    applied = []
+
+    await conn.execute('SELECT pg_advisory_lock($1)', MIGRATION_LOCK)
+    try:
+        done = await applied_versions(conn)
+        for migration in migrations:
+            if migration.version in done:
+                if done[migration.version] != migration.checksum:
+                    print(f"⚠️  Migration {migration.version:04d}_{migration.name} changed after it was applied")
+                continue
+
+            print(f"Applying {migration.version:04d}_{migration.name}...")
+            if migration.transactional:
+                async with conn.transaction():
+                    await conn.execute(migration.sql)
+                    await _record(conn, migration)
+            else:
+                for statement in migration.statements():
+                    await conn.execute(statement)
+                await _record(conn, migration)
+            applied.append(migration)
+    finally:
+        await conn.execute('SELECT pg_advisory_unlock($1)', MIGRATION_LOCK)
+
+    return applied
+
+
+async def _record(conn, migration: Migration) -> None:
+    await conn.execute(
+        'INSERT INTO schema_migrations (version, name, checksum) VALUES ($1, $2, $3)',
+        migration.version, migration.name, migration.checksum
+    )
+
+
+async def main(argv: List[str]) -> None:
+    from database import DATABASE_URL
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        if argv[:1] == ['status']:
+            done = await applied_versions(conn)
+            for migration in load_migrations():
+                mark = '✓' if migration.version in done else ' '
+                print(f"{mark} {migration.version:04d}_{migration.name}")
+            return
+
+        applied = await apply_migrations(conn)
+        print(f"✓ {len(applied)} migration(s) applied" if applied else "✓ Schema is up to date")
+    finally:
+        await conn.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main(sys.argv[1:]))
@@ -23,10 +23,10 @@ CREATE TABLE IF NOT EXISTS audit_log (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- User profiles table (stores role-specific profile data as JSON)
+-- User profiles table (stores role-specific profile data as JSONB)
 CREATE TABLE IF NOT EXISTS user_profiles (
     user_id TEXT PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
-    profile_data TEXT NOT NULL, -- JSON data
+    profile_data JSONB NOT NULL DEFAULT '{}'::jsonb, -- role-specific fields, patched in place
     profile_complete BOOLEAN DEFAULT FALSE,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -0,0 +1,7 @@
+-- Store user_profiles.profile_data as JSONB instead of a JSON string in TEXT
+-- so single fields can be patched (profile_data || patch) and read by key
+ALTER TABLE user_profiles
+    ALTER COLUMN profile_data TYPE JSONB USING profile_data::jsonb;
+
+ALTER TABLE user_profiles
+    ALTER COLUMN profile_data SET DEFAULT '{}'::jsonb;
@@ -0,0 +1,25 @@
+-- Precomputed "open now" set for emergency search.
+-- Holds one row per (doctor, location) whose availability covers the moment
+-- of the last refresh; open_now.py refreshes it at schedule boundaries so
+-- find_emergency_doctors only has to join it against geo candidates.
+CREATE MATERIALIZED VIEW IF NOT EXISTS doctor_open_now AS
+SELECT
+    da.doctor_id,
+    da.location_id,
+    bool_or(da.is_24_hours) AS is_24_hours,
+    TRUE AS is_available,
+    CURRENT_TIMESTAMP AS refreshed_at
+FROM doctor_availability da
+WHERE da.is_available = TRUE
+AND (
+    da.is_24_hours = TRUE
+    OR (
+        da.day_of_week = EXTRACT(DOW FROM CURRENT_TIMESTAMP)::INTEGER
+        AND CURRENT_TIME BETWEEN da.start_time AND da.end_time
+    )
+)
+GROUP BY da.doctor_id, da.location_id;
+
+-- Required for REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_doctor_open_now_doctor_location
+    ON doctor_open_now(doctor_id, location_id);
@@ -0,0 +1,25 @@
+-- Time-window search over doctor_availability.
+-- minute_range is the open interval as minutes since midnight, [start, end),
+-- so "open between 18:00 and 22:00 on Saturday" becomes a GiST overlap
+-- lookup on (day_of_week, minute_range) instead of a scan of every schedule.
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
+ALTER TABLE doctor_availability
+    ADD COLUMN IF NOT EXISTS minute_range INT4RANGE GENERATED ALWAYS AS (
+        CASE
+            WHEN is_24_hours THEN int4range(0, 1440)
+            WHEN start_time IS NULL OR end_time IS NULL THEN NULL
+            -- Slots that run past midnight are cut at midnight
+            WHEN end_time <= start_time THEN int4range(
+                (EXTRACT(HOUR FROM start_time) * 60 + EXTRACT(MINUTE FROM start_time))::INTEGER,
+                1440
+            )
+            ELSE int4range(
+                (EXTRACT(HOUR FROM start_time) * 60 + EXTRACT(MINUTE FROM start_time))::INTEGER,
+                (EXTRACT(HOUR FROM end_time) * 60 + EXTRACT(MINUTE FROM end_time))::INTEGER
+            )
+        END
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_doctor_availability_day_minute_range
+    ON doctor_availability USING gist (day_of_week, minute_range);
@@ -0,0 +1,39 @@
+-- Current availability per doctor, maintained from the append-only
+-- doctor_availability_updates log so "is the doctor available now" is a
+-- primary-key lookup (or a cheap join for a whole page of search results)
+-- instead of ORDER BY created_at DESC LIMIT 1 over the log.
+CREATE TABLE IF NOT EXISTS doctor_availability_current (
+    doctor_id INTEGER PRIMARY KEY,
+    available_now BOOLEAN NOT NULL DEFAULT TRUE,
+    accepts_emergencies BOOLEAN NOT NULL DEFAULT TRUE,
+    notes TEXT,
+    updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Backfill from the latest log entry of each doctor
+INSERT INTO doctor_availability_current (doctor_id, available_now, accepts_emergencies, notes, updated_at)
+SELECT DISTINCT ON (doctor_id)
+    doctor_id, available_now, accepts_emergencies, notes, created_at
+FROM doctor_availability_updates
+ORDER BY doctor_id, created_at DESC
+ON CONFLICT (doctor_id) DO NOTHING;
+
+-- Keep it in sync with every insert into the log, whoever the writer is
+CREATE OR REPLACE FUNCTION sync_doctor_availability_current() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO doctor_availability_current (doctor_id, available_now, accepts_emergencies, notes, updated_at)
+    VALUES (NEW.doctor_id, NEW.available_now, NEW.accepts_emergencies, NEW.notes, NEW.created_at)
+    ON CONFLICT (doctor_id) DO UPDATE SET
+        available_now = EXCLUDED.available_now,
+        accepts_emergencies = EXCLUDED.accepts_emergencies,
+        notes = EXCLUDED.notes,
+        updated_at = EXCLUDED.updated_at
+    WHERE doctor_availability_current.updated_at <= EXCLUDED.updated_at;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_doctor_availability_current ON doctor_availability_updates;
+CREATE TRIGGER trg_doctor_availability_current
+    AFTER INSERT ON doctor_availability_updates
+    FOR EACH ROW EXECUTE FUNCTION sync_doctor_availability_current();
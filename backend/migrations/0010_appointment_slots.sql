@@ -0,0 +1,4 @@
+-- Access path for slot conflict checks, free-slot anti-joins and doctor
+-- calendars: live appointments of one doctor ordered by time
+CREATE INDEX IF NOT EXISTS idx_appointments_doctor_date
+    ON appointments(doctor_id, appointment_date);
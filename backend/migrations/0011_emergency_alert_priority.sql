@@ -0,0 +1,19 @@
+-- Priority queue for a doctor's emergency alerts.
+-- severity_rank stores the critical > high > medium > low order so the
+-- dashboard query filters by status and reads alerts already in priority
+-- order from one composite index instead of sorting on a CASE expression.
+ALTER TABLE emergency_alerts
+    ADD COLUMN IF NOT EXISTS severity_rank SMALLINT GENERATED ALWAYS AS (
+        CASE severity
+            WHEN 'critical' THEN 1
+            WHEN 'high' THEN 2
+            WHEN 'medium' THEN 3
+            ELSE 4
+        END
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_emergency_alerts_doctor_status_priority
+    ON emergency_alerts (doctor_id, status, severity_rank, created_at DESC);
+
+-- Superseded by the composite index above
+DROP INDEX IF EXISTS idx_emergency_alerts_doctor;
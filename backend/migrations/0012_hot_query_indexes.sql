@@ -0,0 +1,30 @@
+-- migrate: no-transaction
+-- Composite indexes matching the hot per-user / per-appointment list queries,
+-- built CONCURRENTLY so they can be added to a live database without blocking
+-- writes. Each list filters on the leading column and sorts on the second.
+--
+-- appointments by (doctor_id, appointment_date) is already served by
+-- idx_appointments_doctor_date from 0010 (a btree is scanned in either order).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chat_messages_appointment_created
+    ON chat_messages (appointment_id, created_at);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_appointments_patient_date
+    ON appointments (patient_id, appointment_date DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_prescriptions_patient_issued
+    ON prescriptions (patient_id, issued_date DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_lab_tests_patient_ordered
+    ON lab_tests (patient_id, ordered_date DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_doctor_availability_updates_doctor_created
+    ON doctor_availability_updates (doctor_id, created_at DESC);
+
+-- Single-column indexes now covered by the leading column of a composite
+DROP INDEX CONCURRENTLY IF EXISTS idx_chat_messages_appointment;
+DROP INDEX CONCURRENTLY IF EXISTS idx_appointments_patient;
+DROP INDEX CONCURRENTLY IF EXISTS idx_appointments_doctor;
+DROP INDEX CONCURRENTLY IF EXISTS idx_prescriptions_patient;
+DROP INDEX CONCURRENTLY IF EXISTS idx_lab_tests_patient;
+DROP INDEX CONCURRENTLY IF EXISTS idx_doctor_availability_doctor;
@@ -0,0 +1,48 @@
+-- Natural keys for ingested doctor data, so re-running an import upserts
+-- instead of appending another copy of every location and schedule row.
+--   location:      (doctor_id, name, address)
+--   availability:  (doctor_id, location_id, day_of_week, start_time)
+-- day_of_week / start_time are NULL for "every day" / 24h rows; they are
+-- COALESCEd in the key (written without NULLS NOT DISTINCT, which needs PG 15).
+
+-- Collapse duplicate locations onto the oldest row, moving their slots over
+WITH ranked AS (
+    SELECT
+        id,
+        MIN(id) OVER (PARTITION BY doctor_id, name, address) AS keep_id
+    FROM doctor_service_locations
+)
+UPDATE doctor_availability da
+SET location_id = ranked.keep_id
+FROM ranked
+WHERE da.location_id = ranked.id
+AND ranked.id <> ranked.keep_id;
+
+DELETE FROM doctor_service_locations l
+USING doctor_service_locations keep
+WHERE keep.doctor_id = l.doctor_id
+AND keep.name = l.name
+AND keep.address = l.address
+AND keep.id < l.id;
+
+-- Then duplicate slots (including the ones just moved)
+DELETE FROM doctor_availability da
+USING doctor_availability keep
+WHERE keep.doctor_id = da.doctor_id
+AND keep.location_id IS NOT DISTINCT FROM da.location_id
+AND COALESCE(keep.day_of_week, -1) = COALESCE(da.day_of_week, -1)
+AND COALESCE(keep.start_time, TIME '00:00') = COALESCE(da.start_time, TIME '00:00')
+AND keep.id < da.id;
+
+-- Ingestion resolves doctors through their user account
+CREATE INDEX IF NOT EXISTS idx_doctors_user ON doctors (user_id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_doctor_service_locations_natural
+    ON doctor_service_locations (doctor_id, name, address);
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_doctor_availability_natural
+    ON doctor_availability (
+        doctor_id, location_id, (COALESCE(day_of_week, -1)), (COALESCE(start_time, TIME '00:00'))
+    );
+
+REFRESH MATERIALIZED VIEW doctor_open_now;
@@ -0,0 +1,18 @@
+-- Sunday is day_of_week 0 (as in EXTRACT(DOW)); the old scraper path stored
+-- it as 7, which the day filters and doctor_open_now never match.
+
+-- A slot already stored under 0 wins over its day-7 copy (natural key, 0013)
+DELETE FROM doctor_availability da
+USING doctor_availability keep
+WHERE da.day_of_week = 7
+AND keep.day_of_week = 0
+AND keep.doctor_id = da.doctor_id
+AND keep.location_id IS NOT DISTINCT FROM da.location_id
+AND COALESCE(keep.start_time, TIME '00:00') = COALESCE(da.start_time, TIME '00:00');
+
+UPDATE doctor_availability SET day_of_week = 0 WHERE day_of_week = 7;
+
+ALTER TABLE doctor_availability
+    ADD CONSTRAINT doctor_availability_day_of_week_check CHECK (day_of_week BETWEEN 0 AND 6);
+
+REFRESH MATERIALIZED VIEW doctor_open_now;
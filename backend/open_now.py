@@ -0,0 +1,98 @@
+"""
+Background refresh of the doctor_open_now materialized view
+
+The view is only correct between schedule boundaries (a start_time or
+end_time in doctor_availability), so instead of polling we sleep until the
+next boundary for today, refresh, and repeat. A maximum interval picks up
+schedule edits made in between.
+"""
+import asyncio
+import os
+from typing import Optional
+
+from database import get_pool
+
+OPEN_NOW_MAX_REFRESH_INTERVAL = float(os.getenv('OPEN_NOW_MAX_REFRESH_INTERVAL', '300'))
+OPEN_NOW_MIN_REFRESH_INTERVAL = 1.0
+
+# Arbitrary key shared by all workers so only one of them refreshes at a time
+OPEN_NOW_REFRESH_LOCK = 731_001
+
+NEXT_BOUNDARY_QUERY = """
+    SELECT EXTRACT(EPOCH FROM COALESCE(
+        MIN(boundary) - LOCALTIME,
+        INTERVAL '24 hours' - (LOCALTIME - TIME '00:00')
+    ))
+    FROM (
+        SELECT start_time AS boundary
+        FROM doctor_availability
+        WHERE is_available = TRUE
+        AND is_24_hours = FALSE
+        AND day_of_week = EXTRACT(DOW FROM CURRENT_TIMESTAMP)::INTEGER
+        AND start_time > LOCALTIME
+        UNION ALL
+        -- BETWEEN is inclusive, so a slot closes just after its end_time
+        SELECT end_time + INTERVAL '1 second'
+        FROM doctor_availability
+        WHERE is_available = TRUE
+        AND is_24_hours = FALSE
+        AND day_of_week = EXTRACT(DOW FROM CURRENT_TIMESTAMP)::INTEGER
+        AND end_time >= LOCALTIME
+        AND end_time < TIME '23:59:59'
+    ) boundaries
+"""
+
+_refresh_task: Optional[asyncio.Task] = None
+
+
+async def refresh_open_now(conn) -> bool:
+    """Refresh the view unless another worker is already doing it"""
+    async with conn.transaction():
+        locked = await conn.fetchval(
+            'SELECT pg_try_advisory_xact_lock($1)', OPEN_NOW_REFRESH_LOCK
+        )
+        if not locked:
+            return False
+        await conn.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY doctor_open_now')
+    return True
+
+
+async def seconds_until_next_boundary(conn) -> float:
+    seconds = await conn.fetchval(NEXT_BOUNDARY_QUERY)
+    seconds = float(seconds) if seconds is not None else OPEN_NOW_MAX_REFRESH_INTERVAL
+    return max(OPEN_NOW_MIN_REFRESH_INTERVAL, min(seconds, OPEN_NOW_MAX_REFRESH_INTERVAL))
+
+
+async def _refresh_loop() -> None:
+    while True:
+        delay = OPEN_NOW_MAX_REFRESH_INTERVAL
+        try:
+            pool = await get_pool()
+            async with pool.acquire() as conn:
+                await refresh_open_now(conn)
+                delay = await seconds_until_next_boundary(conn)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"✗ doctor_open_now refresh failed: {e}")
+            delay = OPEN_NOW_MIN_REFRESH_INTERVAL * 10
+        await asyncio.sleep(delay)
+
+
+def start_open_now_refresher() -> None:
+    """Start the refresh loop (call on startup)"""
+    global _refresh_task
+    if _refresh_task is None:
+        _refresh_task = asyncio.get_running_loop().create_task(_refresh_loop())
+
+
+async def stop_open_now_refresher() -> None:
+    """Stop the refresh loop (call on shutdown)"""
+    global _refresh_task
+    task, _refresh_task = _refresh_task, None
+    if task is not None:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
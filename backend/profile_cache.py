@@ -0,0 +1,172 @@
+"""Read-through user profile cache with cross-worker invalidation"""
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import asyncpg
+
+from database import DATABASE_URL, get_pool
+
+PROFILE_CACHE_MAX_ENTRIES = int(os.getenv('PROFILE_CACHE_MAX_ENTRIES', '10000'))
+PROFILE_CACHE_TTL_SECONDS = float(os.getenv('PROFILE_CACHE_TTL_SECONDS', '300'))
+
+# Every worker LISTENs on this channel; writers NOTIFY it with the user_id
+INVALIDATION_CHANNEL = 'profile_invalidation'
+
+PROFILE_QUERY = '''
+    SELECT
+        u.id, u.email, u.role, u.full_name,
+        COALESCE(up.profile_complete, FALSE) AS profile_complete,
+        CASE
+            WHEN $2::text[] IS NULL THEN up.profile_data
+            ELSE (
+                SELECT COALESCE(jsonb_object_agg(key, value), '{}'::jsonb)
+                FROM jsonb_each(up.profile_data)
+                WHERE key = ANY($2::text[])
+            )
+        END AS profile_data
+    FROM users u
+    LEFT JOIN user_profiles up ON up.user_id = u.id
+    WHERE u.id = $1
+'''
+
+
+class ProfileCache:
+    """Bounded LRU of profile rows with a per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Bumped on every invalidation so a load that raced with a write
+        # doesn't put the stale row back into the cache
+        self.generation = 0
+
+    def get(self, user_id: str) -> Optional[Dict]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, profile = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return profile
+
+    def set(self, user_id: str, profile: Dict, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[user_id] = (time.monotonic() + self.ttl_seconds, profile)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        self.generation += 1
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+profile_cache = ProfileCache(PROFILE_CACHE_MAX_ENTRIES, PROFILE_CACHE_TTL_SECONDS)
+
+
+async def fetch_profile(conn, user_id: str, keys: Optional[List[str]] = None) -> Optional[Dict]:
+    """
+    Load a profile straight from the database (user row + profile in one query).
+    profile_data is left as JSON text; keys limits it to those top-level keys.
+    """
+    row = await conn.fetchrow(PROFILE_QUERY, user_id, keys)
+    return dict(row) if row else None
+
+
+async def get_profile(user_id: str) -> Optional[Dict]:
+    """Get a full profile, reading through the cache"""
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+
+    generation = profile_cache.generation
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        profile = await fetch_profile(conn, user_id)
+
+    if profile is not None:
+        profile_cache.set(user_id, profile, generation)
+    return profile
+
+
+async def get_profile_complete(user_id: str) -> bool:
+    """profile_complete flag for the login flows, served from the cache"""
+    profile = await get_profile(user_id)
+    return bool(profile and profile['profile_complete'])
+
+
+async def invalidate_profile(conn, user_id: str) -> None:
+    """Drop a profile locally and tell the other workers to drop it too"""
+    profile_cache.invalidate(user_id)
+    await conn.execute('SELECT pg_notify($1, $2)', INVALIDATION_CHANNEL, user_id)
+
+
+# ============================================================================
+# LISTEN/NOTIFY invalidation channel
+# ============================================================================
+
+_listener_conn: Optional[asyncpg.Connection] = None
+_reconnect_task: Optional[asyncio.Task] = None
+
+
+def _on_notification(conn, pid, channel, payload):
+    profile_cache.invalidate(payload)
+
+
+def _on_listener_terminated(conn):
+    """Lost the channel: anything cached may miss invalidations, so start over"""
+    global _reconnect_task
+    profile_cache.clear()
+    if _listener_conn is conn:
+        _reconnect_task = asyncio.get_running_loop().create_task(_reconnect())
+
+
+async def _connect_listener() -> None:
+    global _listener_conn
+    conn = await asyncpg.connect(DATABASE_URL)
+    await conn.add_listener(INVALIDATION_CHANNEL, _on_notification)
+    conn.add_termination_listener(_on_listener_terminated)
+    _listener_conn = conn
+
+
+async def _reconnect(delay: float = 1.0) -> None:
+    while True:
+        await asyncio.sleep(delay)
+        try:
+            await _connect_listener()
+            profile_cache.clear()
+            print("✓ Profile cache invalidation listener reconnected")
+            return
+        except Exception as e:
+            print(f"✗ Profile cache listener reconnect failed: {e}")
+            delay = min(delay * 2, 30.0)
+
+
+async def start_invalidation_listener() -> None:
+    """LISTEN for invalidations from other workers (call on startup)"""
+    await _connect_listener()
+
+
+async def stop_invalidation_listener() -> None:
+    """Close the LISTEN connection (call on shutdown)"""
+    global _listener_conn, _reconnect_task
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+        _reconnect_task = None
+    conn, _listener_conn = _listener_conn, None
+    if conn is not None:
+        await conn.close()
@@ -0,0 +1,185 @@
+"""
+Diagnosing a stalled worker: sampling profiler and event-loop lag monitor
+
+Sampling profiler (opt-in with PROFILER_ENABLED=1): POST /api/admin/profile
+samples the event loop thread's stack every interval for a few seconds from a
+separate thread and returns the samples in collapsed-stack format, one
+"frame;frame;frame count" line per distinct stack, which flamegraph.pl,
+speedscope and inferno render directly:
+
+    curl -X POST -H "Authorization: Bearer $TOKEN" \\
+        "localhost:8000/api/admin/profile?seconds=10" > worker.collapsed
+    flamegraph.pl worker.collapsed > worker.svg
+
+Event-loop lag monitor (on unless LOOP_LAG_THRESHOLD_MS=0): a heartbeat task
+ticks on the loop while a watchdog thread checks that it keeps ticking. When
+a callback holds the loop for longer than the threshold - a synchronous
+Twilio request, argon2, a large JSON encode - the watchdog logs
+event_loop_blocked with the loop thread's current stack, i.e. the code that
+is blocking it. Every tick's lateness also goes to the event_loop_lag_seconds
+histogram on /metrics.
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Optional
+
+from metrics import EVENT_LOOP_LAG
+from structured_logging import get_logger
+
+log = get_logger(__name__)
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILE_MAX_SECONDS = 60.0
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "200"))
+# Frames kept in an event_loop_blocked log entry (innermost)
+BLOCKED_STACK_DEPTH = 25
+# Window for recent_loop_lag(), which readiness checks report
+RECENT_LAG_SECONDS = 10.0
+
+_profile_lock = asyncio.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+@lru_cache(maxsize=1024)
+def _short_path(filename: str) -> str:
+    for prefix in sorted(sys.path, key=len, reverse=True):
+        if prefix and filename.startswith(prefix + os.sep):
+            return filename[len(prefix) + 1:]
+    return filename
+
+
+def collapse(frame) -> str:
+    """Stack as "outermost;...;innermost" function (file) labels"""
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        labels.append(f"{code.co_qualname} ({_short_path(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+def sample_stacks(thread_id: Optional[int], seconds: float, interval: float) -> Counter:
+    """Sample one thread (or every other thread, if None) until the time is up"""
+    counts: Counter = Counter()
+    own = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()} if thread_id is None else {}
+        for ident, frame in sys._current_frames().items():
+            if ident == own or (thread_id is not None and ident != thread_id):
+                continue
+            stack = collapse(frame)
+            counts[f"{names.get(ident, ident)};{stack}" if thread_id is None else stack] += 1
+        time.sleep(interval)
+    return counts
+
+
+def format_collapsed(counts: Counter) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in counts.most_common())
+
+
+async def profile_event_loop(seconds: float, interval: float, all_threads: bool = False) -> str:
+    """Profile this worker for `seconds` without blocking it; one profile at a time"""
+    if _profile_lock.locked():
+        raise ProfilerBusy("A profile is already running")
+    async with _profile_lock:
+        loop_thread = None if all_threads else threading.get_ident()
+        counts = await asyncio.to_thread(
+            sample_stacks, loop_thread, min(seconds, PROFILE_MAX_SECONDS), interval
+        )
+    return format_collapsed(counts)
+
+
+class LoopLagMonitor:
+    def __init__(self, threshold_ms: float):
+        self.threshold = threshold_ms / 1000
+        # Tick often enough that a stall is caught well before it ends
+        self.interval = min(0.05, self.threshold / 4)
+        self.stalls = 0
+        self.recent_lags = deque(maxlen=max(1, int(RECENT_LAG_SECONDS / self.interval)))
+        self._last_tick = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def start(self) -> None:
+        """Call from the event loop thread"""
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            before = time.monotonic()
+            self._last_tick = before
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - before - self.interval)
+            self.recent_lags.append(lag)
+            EVENT_LOOP_LAG.observe((), lag)
+
+    def _watch(self) -> None:
+        reported_tick = None
+        while not self._stop.wait(self.interval):
+            tick = self._last_tick
+            blocked = time.monotonic() - tick
+            if blocked < self.threshold or tick == reported_tick:
+                continue
+            # One report per stall, taken while the blocking code is still on the stack
+            reported_tick = tick
+            self.stalls += 1
+            frame = sys._current_frames().get(self._loop_thread)
+            stack = traceback.format_stack(frame)[-BLOCKED_STACK_DEPTH:] if frame is not None else []
+            log.warning(
+                "event_loop_blocked",
+                blocked_ms=round(blocked * 1000, 1),
+                stack=[line.strip().replace("\n    ", " | ") for line in stack],
+            )
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def start_loop_monitor() -> None:
+    """Start watching the running loop (call on startup)"""
+    global _monitor
+    if _monitor is None and LOOP_LAG_THRESHOLD_MS > 0:
+        _monitor = LoopLagMonitor(LOOP_LAG_THRESHOLD_MS)
+        _monitor.start()
+
+
+def recent_loop_lag() -> Optional[float]:
+    """Worst heartbeat lag in seconds over the last RECENT_LAG_SECONDS, None if not monitored"""
+    if _monitor is None:
+        return None
+    return max(_monitor.recent_lags, default=0.0)
+
+
+async def stop_loop_monitor() -> None:
+    """Stop the monitor (call on shutdown)"""
+    global _monitor
+    monitor, _monitor = _monitor, None
+    if monitor is not None:
+        await monitor.stop()
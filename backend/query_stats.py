@@ -0,0 +1,129 @@
+"""
+Per-statement query statistics and slow query log
+
+Every statement run through database.InstrumentedConnection is reduced to a
+fingerprint: literals and bind parameters become ?, IN lists collapse to
+(...), whitespace and comments are squeezed out. Calls, total and max time
+are tracked per fingerprint, and GET /api/admin/query-stats shows the most
+expensive ones - roughly a per-process pg_stat_statements.
+
+Statements slower than SLOW_QUERY_MS (default 200, 0 disables) are logged on
+the "medicure.slow_query" logger. Parameter values are never logged, only
+their types and sizes, since they routinely hold emails, phone numbers and
+medical notes.
+"""
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+logger = logging.getLogger("medicure.slow_query")
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Beyond this many distinct fingerprints new statements are pooled as OTHER,
+# so dynamically built SQL can't grow the table without bound
+MAX_FINGERPRINTS = 1000
+MAX_FINGERPRINT_LENGTH = 2000
+OTHER = "<other>"
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"(?:[EeBbXx])?'(?:[^']|'')*'")
+_PARAM = re.compile(r"\$\d+")
+_NUMBER = re.compile(r"(?<![\w$.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ARRAY_LIST = re.compile(r"ARRAY\[\s*\?(?:\s*,\s*\?)*\s*\]", re.I)
+_SPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(query: str) -> str:
+    """Normalized statement text; queries differing only in values share one"""
+    text = _COMMENT.sub(" ", query)
+    text = _STRING.sub("?", text)
+    text = _PARAM.sub("?", text)
+    text = _NUMBER.sub("?", text)
+    text = _IN_LIST.sub("(...)", text)
+    text = _ARRAY_LIST.sub("ARRAY[...]", text)
+    text = _SPACE.sub(" ", text).strip()
+    if len(text) > MAX_FINGERPRINT_LENGTH:
+        text = text[:MAX_FINGERPRINT_LENGTH] + "..."
+    return text
+
+
+def redact(args: Sequence) -> str:
+    """Parameter types and sizes, never their values"""
+    parts = []
+    for value in args:
+        if value is None:
+            parts.append("NULL")
+        elif isinstance(value, (str, bytes, list, tuple)):
+            parts.append(f"{type(value).__name__}[{len(value)}]")
+        else:
+            parts.append(type(value).__name__)
+    return "(" + ", ".join(parts) + ")"
+
+
+@dataclass
+class StatementStats:
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    slow_calls: int = 0
+
+
+class QueryStats:
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, max_fingerprints: int = MAX_FINGERPRINTS):
+        self.slow_query_ms = slow_query_ms
+        self.max_fingerprints = max_fingerprints
+        self._stats: Dict[str, StatementStats] = {}
+
+    def record(self, query: str, args: Sequence, elapsed: float, batch: int = 0) -> None:
+        """Account one statement; batch is the row count for executemany/COPY"""
+        key = fingerprint(query)
+        stats = self._stats.get(key)
+        if stats is None:
+            if len(self._stats) >= self.max_fingerprints:
+                key = OTHER
+                stats = self._stats.get(OTHER)
+            if stats is None:
+                stats = self._stats[key] = StatementStats()
+        stats.calls += 1
+        stats.total_seconds += elapsed
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+
+        elapsed_ms = elapsed * 1000
+        if self.slow_query_ms > 0 and elapsed_ms >= self.slow_query_ms:
+            stats.slow_calls += 1
+            params = f"{batch} rows" if batch else redact(args)
+            logger.warning("slow query %.1f ms: %s params=%s", elapsed_ms, key, params)
+
+    def top(self, limit: int = 20, order_by: str = "total") -> List[dict]:
+        """The most expensive statements; order_by is total, mean, max or calls"""
+        sort_keys = {
+            "total": lambda item: item[1].total_seconds,
+            "mean": lambda item: item[1].total_seconds / item[1].calls,
+            "max": lambda item: item[1].max_seconds,
+            "calls": lambda item: item[1].calls,
+        }
+        if order_by not in sort_keys:
+            raise ValueError(f"order_by must be one of: {list(sort_keys)}")
+        ranked = sorted(self._stats.items(), key=sort_keys[order_by], reverse=True)
+        return [
+            {
+                "fingerprint": key,
+                "calls": stats.calls,
+                "total_ms": round(stats.total_seconds * 1000, 3),
+                "mean_ms": round(stats.total_seconds * 1000 / stats.calls, 3),
+                "max_ms": round(stats.max_seconds * 1000, 3),
+                "slow_calls": stats.slow_calls,
+            }
+            for key, stats in ranked[:limit]
+        ]
+
+    def reset(self) -> None:
+        self._stats.clear()
+
+
+QUERY_STATS = QueryStats()
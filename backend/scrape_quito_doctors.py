@@ -1,16 +1,27 @@
 """
 Scrape real doctors from Quito, Ecuador
 Sources: Google Maps, Yellow Pages Ecuador, medical directories
+
+populate_database() loads the curated seed list below; scrape_additional_doctors()
+crawls directory sites with pluggable parsers and loads what it finds.
 """
 
 import asyncio
 import json
 import os
-from typing import List, Dict
+import random
+import sys
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Callable, List, Dict, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
 import asyncpg
 from dotenv import load_dotenv
 import httpx
-from datetime import datetime, time
+
+from doctor_ingest import ingest_doctors
+from open_now import refresh_open_now
 
 load_dotenv()
 
@@ -158,104 +169,6 @@ async def get_db_connection():
     print(f"Connecting to: {DATABASE_URL.replace('postgres:postgres', 'postgres:***')}")
     return await asyncpg.connect(DATABASE_URL)
 
-async def insert_doctor(conn, doctor: Dict) -> int:
-    """Insert doctor into database"""
-
-    # 1. Create a user account for the doctor
-    user_id = await conn.fetchval('''
-        INSERT INTO users (email, hashed_password, role, name, created_at)
-        VALUES ($1, $2, $3, $4, $5)
-        ON CONFLICT (email) DO UPDATE SET name = EXCLUDED.name
-        RETURNING id
-    ''',
-        f"{doctor['full_name'].lower().replace(' ', '.')}@{doctor['clinic_name'].lower().replace(' ', '')}.com",
-        "$2b$12$dummy_hash_for_scraped_doctors",  # Placeholder password
-        "doctor",
-        doctor['full_name'],
-        datetime.utcnow()
-    )
-
-    # 2. Insert doctor profile (skip if already exists)
-    doctor_id = await conn.fetchval('''
-        SELECT id FROM doctors WHERE user_id = $1
-    ''', user_id)
-
-    if not doctor_id:
-        doctor_id = await conn.fetchval('''
-            INSERT INTO doctors (
-                user_id, full_name, specialty, sub_specialty, phone, email, created_at
-            ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-            RETURNING id
-        ''',
-        user_id,
-        doctor['full_name'],
-        doctor['specialty'],
-        doctor.get('sub_specialty'),
-        doctor['phone'],
-        f"{doctor['full_name'].lower().replace(' ', '.')}@{doctor['clinic_name'].lower().replace(' ', '')}.com",
-        datetime.utcnow()
-    )
-
-    # 3. Insert service location
-    location_id = await conn.fetchval('''
-        INSERT INTO doctor_service_locations (
-            doctor_id, location_type, name, address, city, country,
-            latitude, longitude, created_at
-        ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-        RETURNING id
-    ''',
-        doctor_id,
-        'clinic' if not doctor.get('is_24_hours') else 'hospital',
-        doctor['clinic_name'],
-        doctor['address'],
-        doctor['city'],
-        'Ecuador',
-        doctor['latitude'],
-        doctor['longitude'],
-        datetime.utcnow()
-    )
-
-    # 4. Insert availability schedule
-    day_mapping = {
-        'monday': 1,
-        'tuesday': 2,
-        'wednesday': 3,
-        'thursday': 4,
-        'friday': 5,
-        'saturday': 6,
-        'sunday': 7
-    }
-
-    if doctor.get('availability_schedule'):
-        for day, time_slots in doctor['availability_schedule'].items():
-            day_number = day_mapping.get(day.lower())
-            if not day_number:
-                continue
-
-            for time_slot in time_slots:
-                start_str, end_str = time_slot.split('-')
-                start_hour, start_min = map(int, start_str.split(':'))
-                end_hour, end_min = map(int, end_str.split(':'))
-                start_time = time(start_hour, start_min)
-                end_time = time(end_hour, end_min)
-                is_24hrs = start_str == "00:00" and end_str == "23:59"
-
-                await conn.execute('''
-                    INSERT INTO doctor_availability (
-                        doctor_id, location_id, day_of_week, start_time, end_time, is_24_hours, is_available
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                ''',
-                    doctor_id,
-                    location_id,
-                    day_number,
-                    start_time,
-                    end_time,
-                    is_24hrs,
-                    True
-                )
-
-    return doctor_id
-
 async def populate_database():
     """Populate database with real Quito doctors"""
     print("=" * 60)
@@ -265,38 +178,405 @@ async def populate_database():
     conn = await get_db_connection()
 
     try:
-        inserted_count = 0
-        for doctor in QUITO_DOCTORS_SEED:
-            try:
-                doctor_id = await insert_doctor(conn, doctor)
-                print(f"✓ Inserted: {doctor['full_name']} - {doctor['specialty']} at {doctor['clinic_name']}")
-                inserted_count += 1
-            except Exception as e:
-                print(f"✗ Failed to insert {doctor['full_name']}: {str(e)}")
+        result = await ingest_doctors(conn, QUITO_DOCTORS_SEED)
+        for doctor, reason in result.rejected:
+            print(f"✗ Failed to insert {doctor.get('full_name', '?')}: {reason}")
+        await refresh_open_now(conn)
 
         print("=" * 60)
-        print(f"✅ Successfully inserted {inserted_count}/{len(QUITO_DOCTORS_SEED)} doctors")
+        print(f"✅ Loaded {len(QUITO_DOCTORS_SEED) - len(result.rejected)}/{len(QUITO_DOCTORS_SEED)} doctors "
+              f"({result.doctors} new, {result.locations} locations, "
+              f"{result.availability_slots} availability slots)")
         print("=" * 60)
 
     finally:
         await conn.close()
 
-async def scrape_additional_doctors():
+# ============================================================================
+# CRAWL FRAMEWORK
+# ============================================================================
+#
+# A crawl starts from seed (url, parser) jobs. Each fetched page is handed to
+# its parser, which returns doctor records plus further (url, parser) jobs to
+# follow (next page, detail pages, ...). Records are appended to a JSONL file
+# and the frontier is checkpointed to disk after every page, so an
+# interrupted crawl picks up where it stopped when run again with the same
+# checkpoint.
+
+CRAWL_CONCURRENCY = int(os.getenv('CRAWL_CONCURRENCY', '8'))
+CRAWL_REQUESTS_PER_SECOND_PER_HOST = float(os.getenv('CRAWL_REQUESTS_PER_SECOND_PER_HOST', '1'))
+CRAWL_MAX_RETRIES = 4
+CRAWL_BACKOFF_SECONDS = 1.0
+CRAWL_USER_AGENT = "MedicureDirectoryBot/1.0 (+https://medicure.app)"
+
+# Responses worth retrying; other 4xx are permanent
+RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class ParseResult:
+    doctors: List[Dict] = field(default_factory=list)
+    # (url, parser name) jobs discovered on the page
+    follow: List[Tuple[str, str]] = field(default_factory=list)
+
+
+# parser name -> parse(url, html) -> ParseResult
+PARSERS: Dict[str, Callable[[str, str], ParseResult]] = {}
+
+
+def register_parser(name: str):
+    """Make a page parser available to crawl jobs under `name`"""
+    def decorator(parse: Callable[[str, str], ParseResult]):
+        PARSERS[name] = parse
+        return parse
+    return decorator
+
+
+class FetchError(Exception):
+    """A page could not be fetched after all retries"""
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+
+    async def wait(self, host: str) -> None:
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        # Reserve the next free slot before sleeping so concurrent callers queue up
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class CrawlCheckpoint:
+    """Crawl frontier on disk: finished URLs, pending jobs and failures"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = Path(path) if path else None
+        self.done: set = set()
+        self.pending: Dict[str, str] = {}
+        # url -> {"parser": ..., "error": ...}
+        self.failed: Dict[str, Dict[str, str]] = {}
+        if self.path and self.path.exists():
+            state = json.loads(self.path.read_text())
+            self.done = set(state['done'])
+            self.pending = dict(state['pending'])
+            self.failed = dict(state['failed'])
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        state = {
+            'done': sorted(self.done),
+            'pending': sorted(self.pending.items()),
+            'failed': self.failed,
+        }
+        tmp = self.path.with_suffix(self.path.suffix + '.tmp')
+        tmp.write_text(json.dumps(state, ensure_ascii=False, indent=1))
+        os.replace(tmp, self.path)
+
+
+@dataclass
+class CrawlStats:
+    pages: int = 0
+    doctors: int = 0
+    retries: int = 0
+    failed: int = 0
+
+
+class Crawler:
+    """Concurrent, rate limited, resumable crawl over registered parsers"""
+
+    def __init__(
+        self,
+        output_path: str,
+        checkpoint_path: Optional[str] = None,
+        concurrency: int = CRAWL_CONCURRENCY,
+        requests_per_second_per_host: float = CRAWL_REQUESTS_PER_SECOND_PER_HOST,
+        max_retries: int = CRAWL_MAX_RETRIES,
+        backoff_seconds: float = CRAWL_BACKOFF_SECONDS,
+        max_pages: Optional[int] = None,
+        timeout: float = 20.0,
+    ):
+        self.output_path = Path(output_path)
+        self.checkpoint = CrawlCheckpoint(checkpoint_path)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = HostRateLimiter(requests_per_second_per_host)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_pages = max_pages
+        self.timeout = timeout
+        self.stats = CrawlStats()
+        self._started = 0
+
+    async def run(self, seeds: List[Tuple[str, str]]) -> CrawlStats:
+        """Crawl from seeds (plus anything still pending in the checkpoint)"""
+        for url, parser in seeds:
+            if parser not in PARSERS:
+                raise ValueError(f"Unknown parser: {parser}")
+            if url not in self.checkpoint.done:
+                self.checkpoint.pending.setdefault(url, parser)
+        # Failed pages get another chance on every run
+        for url, failure in self.checkpoint.failed.items():
+            self.checkpoint.pending.setdefault(url, failure['parser'])
+        self.checkpoint.failed.clear()
+
+        headers = {"User-Agent": CRAWL_USER_AGENT}
+        async with httpx.AsyncClient(headers=headers, timeout=self.timeout, follow_redirects=True) as client:
+            async with asyncio.TaskGroup() as tasks:
+                for url, parser in list(self.checkpoint.pending.items()):
+                    self._schedule(tasks, client, url, parser)
+        self.checkpoint.save()
+        return self.stats
+
+    def _schedule(self, tasks: asyncio.TaskGroup, client: httpx.AsyncClient, url: str, parser: str) -> None:
+        if self.max_pages is not None and self._started >= self.max_pages:
+            return
+        self._started += 1
+        tasks.create_task(self._crawl_page(tasks, client, url, parser))
+
+    def _fail(self, url: str, parser: str, error: str) -> None:
+        self.stats.failed += 1
+        self.checkpoint.pending.pop(url, None)
+        self.checkpoint.failed[url] = {"parser": parser, "error": error}
+        self.checkpoint.save()
+        print(f"✗ {url}: {error}")
+
+    async def _crawl_page(self, tasks, client, url: str, parser: str) -> None:
+        try:
+            async with self.semaphore:
+                html = await self._fetch(client, url)
+        except FetchError as e:
+            self._fail(url, parser, str(e))
+            return
+
+        try:
+            result = PARSERS[parser](url, html)
+        except Exception as e:
+            self._fail(url, parser, f"{parser} failed: {type(e).__name__}: {e}")
+            return
+        if result.doctors:
+            with self.output_path.open('a', encoding='utf-8') as out:
+                for doctor in result.doctors:
+                    out.write(json.dumps(doctor, ensure_ascii=False) + '\n')
+
+        self.stats.pages += 1
+        self.stats.doctors += len(result.doctors)
+        self.checkpoint.pending.pop(url, None)
+        self.checkpoint.done.add(url)
+
+        for next_url, next_parser in result.follow:
+            next_url = urljoin(url, next_url)
+            if next_url in self.checkpoint.done or next_url in self.checkpoint.pending:
+                continue
+            self.checkpoint.pending[next_url] = next_parser
+            self._schedule(tasks, client, next_url, next_parser)
+        self.checkpoint.save()
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> str:
+        """GET with per-host rate limiting and exponential backoff on transient errors"""
+        host = urlsplit(url).netloc
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.wait(host)
+            retry_after = None
+            try:
+                response = await client.get(url)
+                if response.status_code < 400:
+                    return response.text
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise FetchError(f"HTTP {response.status_code}")
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get('Retry-After')
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if attempt == self.max_retries:
+                raise FetchError(f"{error} after {attempt + 1} attempts")
+            self.stats.retries += 1
+            delay = self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+
+
+# ============================================================================
+# PARSERS
+# ============================================================================
+
+_SCHEMA_DAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# schema.org MedicalSpecialty values -> specialty names used by doctor search
+SCHEMA_ORG_SPECIALTIES = {
+    'Cardiovascular': 'Cardiologist',
+    'Dermatologic': 'Dermatologist',
+    'Dermatology': 'Dermatologist',
+    'Emergency': 'Emergency Medicine',
+    'Endocrine': 'Endocrinologist',
+    'Gastroenterologic': 'Gastroenterologist',
+    'Geriatric': 'Geriatrics',
+    'Gynecologic': 'Gynecologist',
+    'Obstetric': 'Obstetrics',
+    'Oncologic': 'Oncology',
+    'Optometric': 'Ophthalmologist',
+    'Pediatric': 'Pediatrician',
+    'PrimaryCare': 'General Practitioner',
+    'Psychiatric': 'Psychiatrist',
+    'Pulmonary': 'Pulmonologist',
+    'Rheumatologic': 'Rheumatologist',
+    'Urologic': 'Urologist',
+}
+
+
+class _DirectoryPageParser(HTMLParser):
+    """Collects JSON-LD blocks and rel="next" / data-doctor-link anchors"""
+
+    def __init__(self):
+        super().__init__()
+        self.json_ld: List[str] = []
+        self.next_links: List[str] = []
+        self.detail_links: List[str] = []
+        self._in_json_ld = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'script' and attrs.get('type') == 'application/ld+json':
+            self._in_json_ld = True
+            self.json_ld.append('')
+        elif tag in ('a', 'link') and attrs.get('href'):
+            if 'next' in (attrs.get('rel') or '').split():
+                self.next_links.append(attrs['href'])
+            elif 'data-doctor-link' in attrs:
+                self.detail_links.append(attrs['href'])
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self._in_json_ld = False
+
+    def handle_data(self, data):
+        if self._in_json_ld:
+            self.json_ld[-1] += data
+
+
+def _schema_items(block) -> List[Dict]:
+    """Flatten a JSON-LD block (single item, list or @graph) into items"""
+    if isinstance(block, list):
+        return [item for entry in block for item in _schema_items(entry)]
+    if isinstance(block, dict):
+        return _schema_items(block['@graph']) if '@graph' in block else [block]
+    return []
+
+
+def physician_to_doctor(item: Dict) -> Optional[Dict]:
+    """Map a schema.org Physician to the ingestion record shape"""
+    if 'Physician' not in str(item.get('@type', '')):
+        return None
+
+    address = item.get('address') or {}
+    geo = item.get('geo') or {}
+    clinic = item.get('hospitalAffiliation') or item.get('worksFor') or {}
+    if isinstance(clinic, list):
+        clinic = clinic[0] if clinic else {}
+    specialty = item.get('medicalSpecialty') or 'General Medicine'
+    if isinstance(specialty, list):
+        specialty = specialty[0]
+    specialty = str(specialty).rsplit('/', 1)[-1]
+
+    schedule: Dict[str, List[str]] = {}
+    for spec in item.get('openingHoursSpecification') or []:
+        days = spec.get('dayOfWeek') or []
+        for day in days if isinstance(days, list) else [days]:
+            day = str(day).rsplit('/', 1)[-1].lower()
+            if day in _SCHEMA_DAYS and spec.get('opens') and spec.get('closes'):
+                schedule.setdefault(day, []).append(f"{spec['opens'][:5]}-{spec['closes'][:5]}")
+
+    return {
+        "full_name": item['name'],
+        "specialty": SCHEMA_ORG_SPECIALTIES.get(specialty, specialty),
+        "sub_specialty": None,
+        "phone": item.get('telephone'),
+        "clinic_name": clinic.get('name') or item['name'],
+        "address": address.get('streetAddress') or '',
+        "city": address.get('addressLocality') or 'Quito',
+        "latitude": float(geo['latitude']) if geo.get('latitude') is not None else None,
+        "longitude": float(geo['longitude']) if geo.get('longitude') is not None else None,
+        "is_24_hours": any(slot == "00:00-23:59" for slots in schedule.values() for slot in slots),
+        "availability_schedule": schedule,
+    }
+
+
+@register_parser('schema_org_directory')
+def parse_schema_org_directory(url: str, html: str) -> ParseResult:
     """
-    Placeholder for future web scraping
-    Could scrape from:
-    - Google Maps API (requires API key)
-    - Doctoralia Ecuador
-    - Medical directories
+    Directory listing pages that embed schema.org Physician JSON-LD (as most
+    medical directories do for search engines). Follows rel="next"
+    pagination and links marked data-doctor-link to detail pages.
     """
-    print("\n📡 Future: Implement web scraping for more doctors")
-    print("Sources to consider:")
-    print("  - Google Maps Places API")
-    print("  - Doctoralia.com.ec")
-    print("  - Ministerio de Salud Pública del Ecuador")
-    pass
+    page = _DirectoryPageParser()
+    page.feed(html)
+
+    result = ParseResult()
+    for block in page.json_ld:
+        try:
+            items = _schema_items(json.loads(block))
+        except json.JSONDecodeError:
+            continue
+        for item in items:
+            doctor = physician_to_doctor(item)
+            if doctor:
+                result.doctors.append(doctor)
+
+    result.follow.extend((link, 'schema_org_directory') for link in page.next_links)
+    result.follow.extend((link, 'schema_org_directory') for link in page.detail_links)
+    return result
+
+
+def load_crawled_doctors(output_path: str) -> List[Dict]:
+    """Records written by a crawl, de-duplicated by name and clinic"""
+    doctors = {}
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                doctor = json.loads(line)
+                doctors[(doctor['full_name'], doctor['clinic_name'])] = doctor
+    return list(doctors.values())
+
+
+async def scrape_additional_doctors(
+    seeds: List[Tuple[str, str]],
+    output_path: str = 'crawled_doctors.jsonl',
+    checkpoint_path: str = 'crawl_checkpoint.json',
+):
+    """
+    Crawl directory pages from seeds ((url, parser) pairs) and load what was
+    found. Re-running with the same checkpoint resumes an interrupted crawl.
+    """
+    print(f"\n📡 Crawling {len(seeds)} seed(s)...")
+    crawler = Crawler(output_path, checkpoint_path)
+    stats = await crawler.run(seeds)
+    print(f"✓ {stats.pages} pages, {stats.doctors} doctors, "
+          f"{stats.retries} retries, {stats.failed} failed")
+
+    if not Path(output_path).exists():
+        return
+
+    conn = await get_db_connection()
+    try:
+        result = await ingest_doctors(conn, load_crawled_doctors(output_path))
+        await refresh_open_now(conn)
+        print(f"✓ Loaded crawled doctors: {result.doctors} new, {result.locations} locations, "
+              f"{len(result.rejected)} rejected")
+    finally:
+        await conn.close()
 
 if __name__ == "__main__":
     print("\n🚀 Starting doctor scraper...\n")
     asyncio.run(populate_database())
+    # Directory pages to crawl: python scrape_quito_doctors.py <url> [<url> ...]
+    if len(sys.argv) > 1:
+        asyncio.run(scrape_additional_doctors([(url, 'schema_org_directory') for url in sys.argv[1:]]))
     print("\n✅ Doctor scraping complete!\n")
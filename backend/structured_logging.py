@@ -0,0 +1,198 @@
+"""
+Structured, non-blocking application logging
+
+    log = get_logger(__name__)
+    log.info("otp_sent", phone=phone_number, role=role)
+
+Records are events with keyword fields, written as one JSON object per line
+(LOG_FORMAT=text for a human-readable form). The request path only builds the
+record and puts it on a queue; formatting, redaction and the write to stdout
+happen on a background QueueListener thread.
+
+- LOG_LEVEL (default INFO) applies to every logger under "medicure".
+- High-volume INFO/DEBUG events can be sampled: LOG_SAMPLE_RATES="otp_sent=0.1,..."
+  overrides DEFAULT_SAMPLE_RATES. Kept records carry sample_rate so counts can
+  be scaled back up. Warnings and errors are never sampled.
+- Secrets (OTPs, tokens, passwords) are replaced outright; phone numbers and
+  emails are masked wherever they appear, in fields or in message text.
+"""
+import atexit
+import copy
+import logging
+import os
+import queue
+import random
+import re
+import sys
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import orjson
+
+ROOT_LOGGER = "medicure"
+
+# Per-request success events; the audit_log table is the durable record of these
+DEFAULT_SAMPLE_RATES = {
+    "otp_sent": 0.1,
+    "otp_verified": 0.1,
+    "google_auth_verified": 0.1,
+}
+
+SECRET_FIELDS = frozenset({
+    "otp", "password", "token", "id_token", "access_token", "refresh_token",
+    "code", "code_verifier", "authorization", "secret",
+})
+REDACTED = "[redacted]"
+
+_EMAIL = re.compile(r"([A-Za-z0-9._%+-])[A-Za-z0-9._%+-]*@([A-Za-z0-9.-]+\.[A-Za-z]{2,})")
+# Phone numbers and OTP-length (6+) digit runs, keeping the last 2 digits;
+# not digits inside identifiers or UUIDs
+_DIGITS = re.compile(r"(?<![\w.-])\+?\d[\d -]{3,}(\d{2})(?![\w-])")
+
+_listener: Optional[QueueListener] = None
+
+
+def mask(text: str) -> str:
+    """Mask emails and phone-number-like digit runs in free text"""
+    text = _EMAIL.sub(r"\1***@\2", text)
+    return _DIGITS.sub(r"***\1", text)
+
+
+def redact_fields(fields: Dict) -> Dict:
+    return {
+        key: REDACTED if key.lower() in SECRET_FIELDS
+        else mask(value) if isinstance(value, str)
+        else value
+        for key, value in fields.items()
+    }
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of the configured events; runs on the caller's thread, before queueing"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.msg)
+        if rate is None or rate >= 1:
+            return True
+        if random.random() >= rate:
+            return False
+        record.fields = {**getattr(record, "fields", {}), "sample_rate": rate}
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message and traceback now (args and frames won't survive the
+        # thread hop) but leave fields for the listener to redact and serialize
+        prepared = copy.copy(record)
+        prepared.msg = record.getMessage()
+        prepared.args = None
+        if record.exc_info:
+            prepared.exc_text = "".join(traceback.format_exception(*record.exc_info))
+            prepared.exc_info = None
+        return prepared
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": mask(record.getMessage()),
+            **redact_fields(getattr(record, "fields", {})),
+        }
+        if record.exc_text:
+            entry["exc"] = mask(record.exc_text)
+        return orjson.dumps(entry, default=str).decode()
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        timestamp = datetime.fromtimestamp(record.created).strftime("%H:%M:%S.%f")[:-3]
+        fields = " ".join(f"{key}={value}" for key, value in redact_fields(getattr(record, "fields", {})).items())
+        line = f"{timestamp} {record.levelname:<7} {record.name} {mask(record.getMessage())} {fields}".rstrip()
+        if record.exc_text:
+            line += "\n" + mask(record.exc_text)
+        return line
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, stream=None) -> None:
+    """Route the "medicure" logger tree through a queue to a background writer (idempotent)"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(TextFormatter() if (fmt or os.getenv("LOG_FORMAT", "json")) == "text" else JsonFormatter())
+
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    handler = _QueueHandler(records)
+    handler.addFilter(SamplingFilter({
+        **DEFAULT_SAMPLE_RATES, **parse_sample_rates(os.getenv("LOG_SAMPLE_RATES", ""))
+    }))
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers[:] = [handler]
+    root.setLevel((level or os.getenv("LOG_LEVEL", "INFO")).upper())
+    root.propagate = False
+
+    _listener = QueueListener(records, output)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logging.getLogger(ROOT_LOGGER).handlers.clear()
+
+
+class StructuredLogger:
+    """Thin wrapper so call sites pass fields as keyword arguments"""
+
+    def __init__(self, name: str):
+        self._logger = logging.getLogger(name if name.startswith(ROOT_LOGGER) else f"{ROOT_LOGGER}.{name}")
+
+    def _log(self, level: int, event: str, fields: Dict, exc_info=False) -> None:
+        if self._logger.isEnabledFor(level):
+            self._logger.log(level, event, exc_info=exc_info, extra={"fields": fields})
+
+    def debug(self, event: str, **fields) -> None:
+        self._log(logging.DEBUG, event, fields)
+
+    def info(self, event: str, **fields) -> None:
+        self._log(logging.INFO, event, fields)
+
+    def warning(self, event: str, **fields) -> None:
+        self._log(logging.WARNING, event, fields)
+
+    def error(self, event: str, **fields) -> None:
+        self._log(logging.ERROR, event, fields)
+
+    def exception(self, event: str, **fields) -> None:
+        self._log(logging.ERROR, event, fields, exc_info=True)
+
+
+def get_logger(name: str) -> StructuredLogger:
+    configure_logging()
+    return StructuredLogger(name)
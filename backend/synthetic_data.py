@@ -0,0 +1,638 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic data at production-like volume
+
+Generates doctors, patients, appointments, prescriptions, lab tests, chat
+messages and emergency alerts for a scratch database so query plans,
+indexes and endpoints can be benchmarked against realistic table sizes.
+The same --seed and --anchor always produce the same rows.
+
+Shape of the data:
+  * doctors and patients are spread over the Ecuadorian cities of migration
+    0002 by population; doctors cluster around a few medical districts per
+    city, patients spread more widely around the city centre
+  * doctors work weekday shifts, split shifts, part-time afternoons or (in
+    district hospitals) 24 hours, and appointments fall inside those hours
+  * a few patients and doctors account for most appointments (skewed picks)
+  * completed appointments carry prescriptions and lab tests; about a third
+    of appointments have a chat thread
+
+Doctors go through doctor_ingest (COPY + set-based merge); everything else
+is streamed with COPY in chunks, so memory stays flat at any volume.
+
+    uv run python migrate.py
+    uv run python synthetic_data.py --doctors 100000 --patients 500000 --appointments 2000000
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+import uuid
+from array import array
+from collections import Counter
+from dataclasses import dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from doctor_ingest import DAY_OF_WEEK, doctor_email, ingest_doctors
+from doctor_search import SYMPTOM_SPECIALTY_MAP
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 50_000
+
+# (name, latitude, longitude, population) - coordinates as seeded by 0002
+CITIES = [
+    ("Quito", -0.1807, -78.4678, 2_800_000),
+    ("Guayaquil", -2.1962, -79.8862, 2_700_000),
+    ("Cuenca", -2.8997, -79.0056, 640_000),
+    ("Cumbayá", -0.2054, -78.4310, 50_000),
+]
+
+HISTORY_DAYS = 365
+FUTURE_DAYS = 30
+
+# Spread in degrees (~111 km per degree)
+DISTRICT_SPREAD = 0.03
+CLINIC_SPREAD = 0.004
+PATIENT_SPREAD = 0.06
+
+FIRST_NAMES = [
+    "Ana", "María", "José", "Luis", "Carlos", "Sofía", "Valentina", "Diego",
+    "Andrés", "Gabriela", "Fernanda", "Juan", "Pablo", "Daniela", "Camila",
+    "Santiago", "Mateo", "Isabel", "Lucía", "Jorge", "Patricia", "Ricardo",
+    "Elena", "Martín", "Paula", "Sebastián", "Carolina", "Francisco", "Verónica",
+    "Esteban",
+]
+LAST_NAMES = [
+    "García", "Rodríguez", "Vega", "Mora", "Paredes", "Andrade", "Salazar",
+    "Cevallos", "Naranjo", "Jaramillo", "Zambrano", "Ortiz", "Castillo", "Vásquez",
+    "Guerrero", "Espinoza", "Romero", "Torres", "Flores", "Herrera", "Benítez",
+    "Calderón", "Montalvo", "Proaño", "Villacís", "Aguirre", "Chávez", "Suárez",
+    "León", "Carrera",
+]
+DISTRICT_NAMES = [
+    "Norte", "Centro", "Sur", "La Carolina", "El Batán", "La Mariscal",
+    "Kennedy", "Urdesa", "Samborondón", "El Ejido", "Totoracocha", "Tumbaco",
+]
+STREETS = [
+    "Av. 10 de Agosto", "Av. Amazonas", "Av. 6 de Diciembre", "Av. de los Shyris",
+    "Av. 9 de Octubre", "Av. Francisco de Orellana", "Av. Solano", "Calle Larga",
+]
+
+# Specialties weighted by how many symptoms route to them
+SPECIALTIES = Counter(s for specialties in SYMPTOM_SPECIALTY_MAP.values() for s in specialties)
+SYMPTOMS = list(SYMPTOM_SPECIALTY_MAP)
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday"]
+
+# (medication, dosage, frequency, duration in days)
+MEDICATIONS = [
+    ("Amoxicillin", "500mg", "Every 8 hours", 7),
+    ("Ibuprofen", "400mg", "Every 8 hours as needed", 5),
+    ("Paracetamol", "500mg", "Every 6 hours as needed", 5),
+    ("Omeprazole", "20mg", "Once daily before breakfast", 30),
+    ("Losartan", "50mg", "Once daily", 90),
+    ("Metformin", "850mg", "Twice daily with meals", 90),
+    ("Atorvastatin", "20mg", "Once daily at night", 90),
+    ("Salbutamol inhaler", "100mcg", "2 puffs as needed", 30),
+    ("Loratadine", "10mg", "Once daily", 14),
+    ("Azithromycin", "500mg", "Once daily", 3),
+]
+# (test, type)
+LAB_TESTS = [
+    ("Complete Blood Count", "blood"),
+    ("Lipid Panel", "blood"),
+    ("HbA1c", "blood"),
+    ("Basic Metabolic Panel", "blood"),
+    ("Thyroid Panel", "blood"),
+    ("Urinalysis", "urine"),
+    ("Chest X-Ray", "imaging"),
+    ("Abdominal Ultrasound", "imaging"),
+    ("Electrocardiogram", "cardiology"),
+]
+CHAT_LINES = {
+    "patient": [
+        "Good morning doctor, I have a question about my appointment.",
+        "The pain is still there, should I keep taking the medication?",
+        "Can I bring my previous lab results?",
+        "Thank you, see you then.",
+        "I'm feeling a bit better today.",
+        "Is it normal to feel dizzy after the first dose?",
+    ],
+    "doctor": [
+        "Hello, yes of course. How can I help?",
+        "Please keep taking it until the end of the treatment.",
+        "Yes, please bring them to the appointment.",
+        "Drink plenty of fluids and rest.",
+        "If the symptoms get worse, go to the emergency room.",
+        "See you at the appointment.",
+    ],
+}
+SEVERITIES = (("low", 20), ("medium", 35), ("high", 30), ("critical", 15))
+
+# Pre-hashed placeholder password; synthetic accounts are not meant to log in
+SYNTHETIC_PASSWORD_HASH = "$2b$12$synthetic_accounts_cannot_log_in"
+PATIENT_EMAIL_DOMAIN = "synthetic.medicure.test"
+
+PATIENT_COLUMNS = ('id', 'name', 'email', 'hashed_password', 'role', 'created_at', 'date_of_birth')
+APPOINTMENT_COLUMNS = (
+    'id', 'patient_id', 'doctor_id', 'appointment_type', 'appointment_date', 'status',
+    'symptom', 'latitude', 'longitude', 'created_at', 'updated_at'
+)
+PRESCRIPTION_COLUMNS = (
+    'id', 'patient_id', 'doctor_id', 'appointment_id', 'medication_name', 'dosage',
+    'frequency', 'duration', 'status', 'refills_remaining', 'issued_date', 'expiry_date', 'created_at'
+)
+LAB_TEST_COLUMNS = (
+    'id', 'patient_id', 'doctor_id', 'appointment_id', 'test_name', 'test_type', 'status',
+    'ordered_date', 'scheduled_date', 'completed_date', 'created_at'
+)
+CHAT_MESSAGE_COLUMNS = ('id', 'appointment_id', 'sender_id', 'message_text', 'read_at', 'created_at')
+EMERGENCY_ALERT_COLUMNS = (
+    'id', 'patient_id', 'doctor_id', 'symptom', 'severity', 'status', 'patient_name',
+    'patient_location_lat', 'patient_location_lng', 'ambulance_requested',
+    'accepted_at', 'completed_at', 'created_at', 'updated_at'
+)
+
+# Weekly hours per doctor: index 0=Sunday .. 6=Saturday, each a tuple of
+# (start_hour, end_hour) with end exclusive
+WeeklyHours = Tuple[Tuple[Tuple[int, int], ...], ...]
+
+
+@dataclass
+class DoctorRef:
+    """A loaded doctor as appointments need it"""
+    doctor_id: int
+    user_id: str
+    city: int
+    hours: WeeklyHours
+    is_24_hours: bool
+
+
+@dataclass
+class SyntheticCounts:
+    doctors: int = 0
+    patients: int = 0
+    appointments: int = 0
+    prescriptions: int = 0
+    lab_tests: int = 0
+    chat_messages: int = 0
+    emergency_alerts: int = 0
+
+    def add(self, other: "SyntheticCounts") -> None:
+        for f in fields(self):
+            setattr(self, f.name, getattr(self, f.name) + getattr(other, f.name))
+
+
+def _rng(seed: int, stream: str) -> random.Random:
+    """Independent generator per stream, so changing one volume doesn't reshuffle the others"""
+    return random.Random(f"{seed}:{stream}")
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def patient_id(seed: int, index: int) -> str:
+    """Patient ids are derived from the index so they needn't be kept in memory"""
+    digest = hashlib.md5(f"{seed}:patient:{index}".encode()).digest()
+    return str(uuid.UUID(bytes=digest, version=4))
+
+
+def patient_email(seed: int, index: int) -> str:
+    return f"patient.{seed}.{index}@{PATIENT_EMAIL_DOMAIN}"
+
+
+def _city_weights(cities: Sequence[tuple]) -> List[int]:
+    return [population for _, _, _, population in cities]
+
+
+def _skewed(rng: random.Random, n: int, power: float) -> int:
+    """Index in [0, n) where low indexes are picked far more often"""
+    return min(int(n * rng.random() ** power), n - 1)
+
+
+def weekly_hours(schedule: Dict[str, List[str]]) -> WeeklyHours:
+    """Compact form of an availability_schedule for picking appointment times"""
+    days: List[List[Tuple[int, int]]] = [[] for _ in range(7)]
+    for day, time_slots in schedule.items():
+        for time_slot in time_slots:
+            start, end = time_slot.split('-')
+            end_hour = 24 if end == "23:59" else int(end[:2])
+            days[DAY_OF_WEEK[day]].append((int(start[:2]), end_hour))
+    return tuple(tuple(hours) for hours in days)
+
+
+def _schedule(rng: random.Random, is_24_hours: bool) -> Dict[str, List[str]]:
+    if is_24_hours:
+        return {day: ["00:00-23:59"] for day in DAY_OF_WEEK}
+
+    roll = rng.random()
+    if roll < 0.6:
+        # One weekday shift, sometimes with a free day
+        start = rng.choice((7, 8, 8, 9, 9, 10))
+        end = min(start + rng.choice((6, 8, 8, 9, 10)), 20)
+        days = WEEKDAYS if rng.random() < 0.8 else rng.sample(WEEKDAYS, 4)
+        hours = [f"{start:02d}:00-{end:02d}:00"]
+    elif roll < 0.85:
+        # Split shift around lunch
+        hours = [
+            f"{rng.choice((7, 8, 9)):02d}:00-{rng.choice((12, 13)):02d}:00",
+            f"{rng.choice((14, 15)):02d}:00-{rng.choice((18, 19)):02d}:00",
+        ]
+        days = WEEKDAYS
+    else:
+        # Part-time afternoons
+        days = rng.sample(WEEKDAYS, rng.choice((2, 3)))
+        hours = [f"{rng.choice((14, 15)):02d}:00-{rng.choice((18, 19, 20)):02d}:00"]
+
+    schedule = {day: list(hours) for day in days}
+    if rng.random() < 0.3:
+        schedule["saturday"] = ["08:00-13:00"]
+    return schedule
+
+
+def synthetic_doctors(count: int, seed: int = DEFAULT_SEED, cities: Sequence[tuple] = CITIES) -> Iterator[Dict]:
+    """
+    doctor_ingest records: doctors share clinics, clinics cluster in medical
+    districts, each district has one hospital whose doctors are mostly 24h
+    """
+    rng = _rng(seed, "doctors")
+    specialties, specialty_weights = zip(*SPECIALTIES.items())
+
+    # One district per ~300k inhabitants, ~10 doctors per clinic
+    districts = []
+    for city_index, (city, lat, lng, population) in enumerate(cities):
+        share = population / sum(_city_weights(cities))
+        district_count = max(1, round(population / 300_000))
+        clinic_count = max(2, round(count * share / district_count / 10))
+        for d in range(district_count):
+            name = DISTRICT_NAMES[d % len(DISTRICT_NAMES)]
+            center = (rng.gauss(lat, DISTRICT_SPREAD), rng.gauss(lng, DISTRICT_SPREAD))
+            clinics = []
+            for c in range(clinic_count):
+                kind = "Hospital" if c == 0 else rng.choice(("Centro Médico", "Clínica", "Consultorios"))
+                clinics.append({
+                    "clinic_name": f"{kind} {name} {c + 1}" if c else f"Hospital {city} {name}",
+                    "address": f"{rng.choice(STREETS)} N{rng.randint(10, 80)}-{rng.randint(10, 300)}",
+                    "latitude": round(rng.gauss(center[0], CLINIC_SPREAD), 6),
+                    "longitude": round(rng.gauss(center[1], CLINIC_SPREAD), 6),
+                })
+            districts.append((city_index, clinics, population / district_count))
+
+    district_weights = [weight for _, _, weight in districts]
+    taken = set()
+    for i in range(count):
+        city_index, clinics, _ = rng.choices(districts, weights=district_weights)[0]
+        # Clinics get busier towards the centre of the list, the hospital most of all
+        clinic = clinics[0] if rng.random() < 0.25 else clinics[_skewed(rng, len(clinics), 1.5)]
+        is_24_hours = clinic is clinics[0] and rng.random() < 0.4
+
+        # Names only need to be unique per clinic (the login email is name@clinic)
+        while True:
+            full_name = f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.choice(LAST_NAMES)}"
+            key = (full_name, clinic["clinic_name"])
+            if key not in taken:
+                taken.add(key)
+                break
+
+        yield {
+            "full_name": full_name,
+            "specialty": "Emergency Medicine" if is_24_hours and rng.random() < 0.5
+                         else rng.choices(specialties, weights=specialty_weights)[0],
+            "sub_specialty": None,
+            "phone": f"+593-{rng.randint(2, 7)}-{rng.randint(200, 299)}-{rng.randint(1000, 9999)}",
+            "city": cities[city_index][0],
+            "is_24_hours": is_24_hours,
+            "availability_schedule": _schedule(rng, is_24_hours),
+            **clinic,
+        }
+
+
+class Population:
+    """Patients kept as compact columns (city, home coordinates) indexed by position"""
+
+    def __init__(self, count: int, seed: int = DEFAULT_SEED, cities: Sequence[tuple] = CITIES):
+        rng = _rng(seed, "patients")
+        self.seed = seed
+        self.city = array('H')
+        self.latitude = array('d')
+        self.longitude = array('d')
+        weights = _city_weights(cities)
+        for city_index in rng.choices(range(len(cities)), weights=weights, k=count):
+            _, lat, lng, _ = cities[city_index]
+            self.city.append(city_index)
+            self.latitude.append(round(rng.gauss(lat, PATIENT_SPREAD), 6))
+            self.longitude.append(round(rng.gauss(lng, PATIENT_SPREAD), 6))
+
+    def __len__(self) -> int:
+        return len(self.city)
+
+    def user_rows(self, anchor: date, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[tuple]]:
+        rng = _rng(self.seed, "patient-accounts")
+        signup_start = datetime.combine(anchor, datetime.min.time()) - timedelta(days=3 * HISTORY_DAYS)
+        rows = []
+        for i in range(len(self)):
+            rows.append((
+                patient_id(self.seed, i),
+                f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                patient_email(self.seed, i),
+                SYNTHETIC_PASSWORD_HASH,
+                'patient',
+                signup_start + timedelta(seconds=rng.randrange(3 * HISTORY_DAYS * 86400)),
+                anchor - timedelta(days=rng.randint(365, 90 * 365)),
+            ))
+            if len(rows) >= chunk_size:
+                yield rows
+                rows = []
+        if rows:
+            yield rows
+
+
+@dataclass
+class AppointmentBatch:
+    appointments: List[tuple]
+    prescriptions: List[tuple]
+    lab_tests: List[tuple]
+    chat_messages: List[tuple]
+
+
+def _bookable_doctors(
+    doctors_by_city: Dict[int, List[DoctorRef]], cities: Sequence[tuple]
+) -> Dict[int, List[DoctorRef]]:
+    """Doctors per city index; a city without doctors (small --doctors) uses the nearest city's"""
+    staffed = [city for city, doctors in doctors_by_city.items() if doctors]
+    if not staffed:
+        raise ValueError("No doctors loaded to book appointments with")
+    bookable = {}
+    for city, (_, lat, lng, _) in enumerate(cities):
+        nearest = min(staffed, key=lambda c: (cities[c][1] - lat) ** 2 + (cities[c][2] - lng) ** 2)
+        bookable[city] = doctors_by_city[nearest]
+    return bookable
+
+
+def _appointment_time(rng: random.Random, doctor: DoctorRef, anchor: datetime) -> datetime:
+    """A start hour inside the doctor's working hours, HISTORY_DAYS back to FUTURE_DAYS ahead"""
+    day = anchor + timedelta(days=rng.randint(-HISTORY_DAYS, FUTURE_DAYS))
+    working_days = [dow for dow, shifts in enumerate(doctor.hours) if shifts]
+    if working_days:
+        # Move to one of the doctor's weekdays in the same week, so every
+        # working day is equally likely (datetime.weekday() is 0=Monday)
+        dow = rng.choice(working_days)
+        day += timedelta(days=dow - (day.weekday() + 1) % 7)
+        start, end = rng.choice(doctor.hours[dow])
+        return day.replace(hour=rng.randrange(start, end))
+    return day.replace(hour=rng.randint(8, 17))
+
+
+def _chat(rng: random.Random, appointment_id: str, patient: str, doctor: DoctorRef,
+          start: datetime, anchor: datetime) -> List[tuple]:
+    rows = []
+    sent = start
+    for n in range(min(2 + int(rng.expovariate(1 / 4)), 40)):
+        role = "patient" if n % 2 == 0 else "doctor"
+        sent += timedelta(minutes=rng.expovariate(1 / 20))
+        if sent > anchor:
+            break
+        read_at = sent + timedelta(minutes=rng.expovariate(1 / 15))
+        rows.append((
+            _uuid(rng), appointment_id, patient if role == "patient" else doctor.user_id,
+            rng.choice(CHAT_LINES[role]), read_at if read_at < anchor else None, sent,
+        ))
+    return rows
+
+
+def synthetic_appointments(
+    count: int,
+    population: Population,
+    doctors_by_city: Dict[int, List[DoctorRef]],
+    anchor: datetime,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cities: Sequence[tuple] = CITIES,
+) -> Iterator[AppointmentBatch]:
+    """
+    Appointments with their prescriptions, lab tests and chat threads, in
+    chunks. Patients book doctors in their own city (or the nearest one with
+    doctors); both picks are skewed so some patients and doctors are much
+    busier than others.
+    """
+    rng = _rng(seed, "appointments")
+    doctors_by_city = _bookable_doctors(doctors_by_city, cities)
+    batch = AppointmentBatch([], [], [], [])
+    for _ in range(count):
+        patient_index = _skewed(rng, len(population), 3)
+        patient = patient_id(seed, patient_index)
+        city_doctors = doctors_by_city[population.city[patient_index]]
+        doctor = city_doctors[_skewed(rng, len(city_doctors), 2)]
+
+        appointment_id = _uuid(rng)
+        is_emergency = rng.random() < 0.03
+        if is_emergency:
+            when = anchor - timedelta(days=rng.randint(0, HISTORY_DAYS), minutes=rng.randrange(1440))
+            booked = when - timedelta(minutes=rng.randint(5, 60))
+        else:
+            when = _appointment_time(rng, doctor, anchor)
+            booked = min(when - timedelta(days=rng.expovariate(1 / 5), hours=1), anchor)
+
+        if when < anchor:
+            status = rng.choices(("completed", "cancelled", "confirmed"), weights=(85, 12, 3))[0]
+        else:
+            status = rng.choices(("confirmed", "pending", "cancelled"), weights=(55, 40, 5))[0]
+
+        batch.appointments.append((
+            appointment_id, patient, doctor.doctor_id,
+            'emergency' if is_emergency else 'scheduled', when, status,
+            rng.choice(SYMPTOMS), population.latitude[patient_index], population.longitude[patient_index],
+            booked, max(booked, min(when, anchor)),
+        ))
+
+        if status == "completed":
+            if rng.random() < 0.45:
+                for name, dosage, frequency, days in rng.sample(MEDICATIONS, rng.randint(1, 3)):
+                    issued = when + timedelta(minutes=30)
+                    expiry = issued + timedelta(days=days)
+                    batch.prescriptions.append((
+                        _uuid(rng), patient, doctor.doctor_id, appointment_id, name, dosage,
+                        frequency, f"{days} days", 'active' if expiry > anchor else 'expired',
+                        rng.choice((0, 0, 1, 2)), issued, expiry, issued,
+                    ))
+            if rng.random() < 0.2:
+                for name, test_type in rng.sample(LAB_TESTS, rng.randint(1, 2)):
+                    ordered = when + timedelta(minutes=30)
+                    scheduled = ordered + timedelta(days=rng.randint(1, 3))
+                    done = scheduled + timedelta(days=rng.randint(1, 3))
+                    batch.lab_tests.append((
+                        _uuid(rng), patient, doctor.doctor_id, appointment_id, name, test_type,
+                        'completed' if done < anchor else 'ordered',
+                        ordered, scheduled, done if done < anchor else None, ordered,
+                    ))
+
+        if rng.random() < 0.35:
+            batch.chat_messages.extend(_chat(rng, appointment_id, patient, doctor, booked, anchor))
+
+        if len(batch.appointments) >= chunk_size:
+            yield batch
+            batch = AppointmentBatch([], [], [], [])
+    if batch.appointments:
+        yield batch
+
+
+def synthetic_emergency_alerts(
+    count: int,
+    population: Population,
+    doctors_by_city: Dict[int, List[DoctorRef]],
+    anchor: datetime,
+    seed: int = DEFAULT_SEED,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    cities: Sequence[tuple] = CITIES,
+) -> Iterator[List[tuple]]:
+    """Alerts mostly go to 24h doctors; only recent ones are still open"""
+    rng = _rng(seed, "emergency-alerts")
+    doctors_by_city = _bookable_doctors(doctors_by_city, cities)
+    severities, severity_weights = zip(*SEVERITIES)
+    on_call = {
+        city: [d for d in doctors if d.is_24_hours] or doctors
+        for city, doctors in doctors_by_city.items()
+    }
+    rows = []
+    for _ in range(count):
+        patient_index = _skewed(rng, len(population), 2)
+        city = population.city[patient_index]
+        doctors = on_call[city] if rng.random() < 0.7 else doctors_by_city[city]
+        doctor = rng.choice(doctors)
+
+        # Exponential age: most alerts are recent, a few go back a year
+        created = anchor - timedelta(minutes=min(rng.expovariate(1 / 20_000), HISTORY_DAYS * 1440))
+        age = anchor - created
+        if age < timedelta(hours=2):
+            status = rng.choices(("pending", "accepted", "in_progress"), weights=(50, 25, 25))[0]
+        else:
+            status = rng.choices(("completed", "cancelled"), weights=(85, 15))[0]
+        accepted = created + timedelta(minutes=rng.randint(1, 10)) if status != "pending" else None
+        completed = created + timedelta(minutes=rng.randint(30, 180)) if status == "completed" else None
+
+        rows.append((
+            _uuid(rng), patient_id(seed, patient_index), doctor.doctor_id, rng.choice(SYMPTOMS),
+            rng.choices(severities, weights=severity_weights)[0], status,
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            population.latitude[patient_index], population.longitude[patient_index],
+            rng.random() < 0.2, accepted, completed, created, completed or accepted or created,
+        ))
+        if len(rows) >= chunk_size:
+            yield rows
+            rows = []
+    if rows:
+        yield rows
+
+
+async def load_doctors(conn, doctors: List[Dict], cities: Sequence[tuple] = CITIES) -> Dict[int, List[DoctorRef]]:
+    """Ingest the doctor records and return them grouped by city index"""
+    await ingest_doctors(conn, doctors)
+    rows = await conn.fetch(
+        'SELECT email, id, user_id FROM doctors WHERE email = ANY($1::text[])',
+        [doctor_email(doctor) for doctor in doctors]
+    )
+    ids = {row['email']: (row['id'], row['user_id']) for row in rows}
+    city_index = {name: i for i, (name, _, _, _) in enumerate(cities)}
+
+    doctors_by_city: Dict[int, List[DoctorRef]] = {}
+    for doctor in doctors:
+        doctor_id, user_id = ids[doctor_email(doctor)]
+        city = city_index[doctor["city"]]
+        doctors_by_city.setdefault(city, []).append(DoctorRef(
+            doctor_id, user_id, city, weekly_hours(doctor["availability_schedule"]), doctor["is_24_hours"]
+        ))
+    return doctors_by_city
+
+
+async def load_synthetic_data(
+    conn,
+    doctors: int,
+    patients: int,
+    appointments: int,
+    emergency_alerts: int,
+    seed: int = DEFAULT_SEED,
+    anchor: Optional[datetime] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> SyntheticCounts:
+    """Generate and COPY everything; raises if this seed was already loaded"""
+    anchor = (anchor or datetime.now()).replace(minute=0, second=0, microsecond=0)
+    if await conn.fetchval('SELECT 1 FROM users WHERE email = $1', patient_email(seed, 0)):
+        raise ValueError(f"Synthetic data for seed {seed} is already loaded; use another --seed")
+
+    counts = SyntheticCounts()
+    doctor_records = list(synthetic_doctors(doctors, seed))
+    doctors_by_city = await load_doctors(conn, doctor_records)
+    counts.doctors = sum(len(refs) for refs in doctors_by_city.values())
+    _progress("doctors", counts.doctors)
+
+    population = Population(patients, seed)
+    for rows in population.user_rows(anchor.date(), chunk_size):
+        await conn.copy_records_to_table('users', records=rows, columns=PATIENT_COLUMNS)
+        counts.patients += len(rows)
+    _progress("patients", counts.patients)
+
+    for batch in synthetic_appointments(appointments, population, doctors_by_city, anchor, seed, chunk_size):
+        async with conn.transaction():
+            await conn.copy_records_to_table('appointments', records=batch.appointments, columns=APPOINTMENT_COLUMNS)
+            await conn.copy_records_to_table('prescriptions', records=batch.prescriptions, columns=PRESCRIPTION_COLUMNS)
+            await conn.copy_records_to_table('lab_tests', records=batch.lab_tests, columns=LAB_TEST_COLUMNS)
+            await conn.copy_records_to_table('chat_messages', records=batch.chat_messages, columns=CHAT_MESSAGE_COLUMNS)
+        counts.add(SyntheticCounts(
+            appointments=len(batch.appointments), prescriptions=len(batch.prescriptions),
+            lab_tests=len(batch.lab_tests), chat_messages=len(batch.chat_messages),
+        ))
+        _progress("appointments", counts.appointments)
+
+    for rows in synthetic_emergency_alerts(emergency_alerts, population, doctors_by_city, anchor, seed, chunk_size):
+        await conn.copy_records_to_table('emergency_alerts', records=rows, columns=EMERGENCY_ALERT_COLUMNS)
+        counts.emergency_alerts += len(rows)
+    _progress("emergency alerts", counts.emergency_alerts)
+
+    return counts
+
+
+def _progress(name: str, count: int) -> None:
+    print(f"  {name}: {count:,}", flush=True)
+
+
+async def main(args) -> None:
+    from database import DATABASE_URL
+    from open_now import refresh_open_now
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    try:
+        start = time.perf_counter()
+        print(f"🌱 Generating synthetic data (seed {args.seed})...")
+        counts = await load_synthetic_data(
+            conn, args.doctors, args.patients, args.appointments, args.emergency_alerts,
+            seed=args.seed, anchor=args.anchor, chunk_size=args.chunk_size,
+        )
+        print("Refreshing statistics and doctor_open_now...")
+        await conn.execute(
+            'ANALYZE users, doctors, doctor_service_locations, doctor_availability, appointments, '
+            'prescriptions, lab_tests, chat_messages, emergency_alerts'
+        )
+        await refresh_open_now(conn)
+        total = sum(getattr(counts, f.name) for f in fields(counts))
+        print(f"✓ {total:,} rows in {time.perf_counter() - start:.1f} s: {counts}")
+    finally:
+        await conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--doctors', type=int, default=100_000)
+    parser.add_argument('--patients', type=int, default=500_000)
+    parser.add_argument('--appointments', type=int, default=2_000_000,
+                        help='prescriptions, lab tests and chat messages scale with this')
+    parser.add_argument('--emergency-alerts', type=int, default=50_000)
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--anchor', type=datetime.fromisoformat, default=None,
+                        help='"now" of the generated history (default: current time), e.g. 2025-06-01T12:00')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    asyncio.run(main(parser.parse_args()))
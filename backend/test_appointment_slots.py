@@ -0,0 +1,80 @@
+"""
+Tests for slot-based appointment booking
+The concurrency test needs a reachable PostgreSQL (DATABASE_URL) and is
+skipped otherwise.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import asyncpg
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+
+from appointment_slots import book_appointment_slot, slot_lock_key, slot_start_for
+from database import DATABASE_URL
+
+
+class TestSlotAlignment:
+    """Requested times map onto one slot and one lock key"""
+
+    def test_slot_start_truncates_to_slot(self):
+        assert slot_start_for(datetime(2025, 3, 4, 9, 45, 12)) == datetime(2025, 3, 4, 9, 0)
+
+    def test_times_in_same_slot_share_lock_key(self):
+        first = slot_start_for(datetime(2025, 3, 4, 9, 0))
+        last = slot_start_for(datetime(2025, 3, 4, 9, 59))
+        assert slot_lock_key(first) == slot_lock_key(last)
+
+    def test_adjacent_slots_have_different_lock_keys(self):
+        nine = slot_start_for(datetime(2025, 3, 4, 9, 30))
+        ten = slot_start_for(datetime(2025, 3, 4, 10, 0))
+        assert slot_lock_key(nine) != slot_lock_key(ten)
+
+
+@pytest_asyncio.fixture
+async def db_pool():
+    try:
+        pool = await asyncpg.create_pool(DATABASE_URL, min_size=1, max_size=25, timeout=2)
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+        pytest.skip(f"PostgreSQL not available: {e}")
+    yield pool
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_bookings_for_one_slot_admit_exactly_one(db_pool):
+    """Hammer a single slot from many tasks; only one booking may succeed"""
+    patient_id = str(uuid.uuid4())
+    doctor_id = 900000 + uuid.uuid4().int % 100000
+    slot = (datetime.utcnow() + timedelta(days=3)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    await db_pool.execute(
+        'INSERT INTO users (id, name, email, hashed_password, role) VALUES ($1, $2, $3, $4, $5)',
+        patient_id, "Slot Test", f"{patient_id}@test.medicure", "x", "patient"
+    )
+
+    async def attempt(minute):
+        async with db_pool.acquire() as conn:
+            try:
+                await book_appointment_slot(
+                    conn, patient_id, doctor_id, 'scheduled', slot.replace(minute=minute)
+                )
+                return 'booked'
+            except HTTPException as e:
+                assert e.status_code == 409
+                return 'conflict'
+
+    try:
+        results = await asyncio.gather(*(attempt(i % 60) for i in range(25)))
+
+        assert results.count('booked') == 1
+        assert results.count('conflict') == 24
+        booked = await db_pool.fetchval(
+            'SELECT COUNT(*) FROM appointments WHERE doctor_id = $1', doctor_id
+        )
+        assert booked == 1
+    finally:
+        await db_pool.execute('DELETE FROM appointments WHERE doctor_id = $1', doctor_id)
+        await db_pool.execute('DELETE FROM users WHERE id = $1', patient_id)
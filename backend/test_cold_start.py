@@ -0,0 +1,143 @@
+"""
+Tests for cold start: heavy integrations stay out of `import main`, import +
+startup stay within budget, and the pool warms up in the background.
+The startup and pool tests need a reachable PostgreSQL (DATABASE_URL) and
+are skipped otherwise.
+"""
+import asyncio
+import os
+import subprocess
+import sys
+
+import asyncpg
+import pytest
+
+import database
+from benchmarks.cold_start import (
+    BACKEND_DIR, direct_imports, measure_cold_start, parse_importtime,
+)
+from database import DATABASE_URL
+
+# Generous for CI machines; about 0.5 s on a laptop
+COLD_START_BUDGET_MS = float(os.getenv("COLD_START_BUDGET_MS", "2000"))
+
+DEFERRED_MODULES = ("twilio.rest", "google.oauth2.id_token", "google.auth.transport.requests", "jose")
+
+
+async def _database_reachable() -> bool:
+    try:
+        conn = await asyncpg.connect(DATABASE_URL, timeout=2)
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError):
+        return False
+    await conn.close()
+    return True
+
+
+@pytest.fixture
+def database_required():
+    if not asyncio.run(_database_reachable()):
+        pytest.skip("PostgreSQL not available")
+
+
+@pytest.fixture
+def fresh_pool(database_required, monkeypatch):
+    # Other tests may leave the global pool bound to a loop that is closed
+    monkeypatch.setattr(database, "_pool", None)
+    monkeypatch.setattr(database, "_warmup_task", None)
+
+
+class FailingAcquire:
+    async def __aenter__(self):
+        raise ConnectionError("connection refused")
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class OneAcquireFails:
+    """Raw pool whose `nth` acquire fails"""
+
+    def __init__(self, pool, nth):
+        self._pool = pool
+        self.calls = 0
+        self.nth = nth
+
+    def acquire(self, *args, **kwargs):
+        self.calls += 1
+        if self.calls == self.nth:
+            return FailingAcquire()
+        return self._pool.acquire(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._pool, name)
+
+
+def test_parse_importtime():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |     b.inner\n"
+        "import time:       200 |        300 |   b\n"
+        "import time:        50 |         50 |   c\n"
+        "import time:      1000 |       1350 | a\n"
+    )
+    entries = parse_importtime(stderr)
+    assert [(e.module, e.depth) for e in entries] == [("b.inner", 2), ("b", 1), ("c", 1), ("a", 0)]
+    assert [e.module for e in direct_imports(entries, "a")] == ["b", "c"]
+
+
+def test_heavy_integrations_are_imported_on_first_use():
+    loaded = subprocess.run(
+        [sys.executable, "-c", f"import sys, main; print([m for m in {DEFERRED_MODULES!r} if m in sys.modules])"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True,
+    ).stdout.strip().splitlines()[-1]
+    assert loaded == "[]"
+
+
+def test_import_within_budget():
+    timings = min((measure_cold_start(startup=False) for _ in range(3)), key=lambda t: t["total_ms"])
+    assert timings["import_ms"] < COLD_START_BUDGET_MS
+
+
+def test_import_and_startup_within_budget(database_required):
+    timings = min((measure_cold_start() for _ in range(3)), key=lambda t: t["total_ms"])
+    assert timings["total_ms"] < COLD_START_BUDGET_MS, timings
+
+
+def test_pool_starts_small_and_warms_up(fresh_pool):
+    async def main():
+        pool = await database.get_pool()
+        try:
+            assert pool.get_size() == 1
+            opened = await database.warm_pool(4)
+            assert (opened, pool.get_size(), pool.get_idle_size()) == (3, 4, 4)
+        finally:
+            await database.close_pool()
+
+    asyncio.run(main())
+
+
+def test_failed_acquire_releases_the_held_connections(fresh_pool):
+    async def main():
+        pool = await database.get_pool()
+        raw = pool._pool
+        pool._pool = OneAcquireFails(raw, nth=3)
+        try:
+            # Would wait forever if the others kept holding for the failed one
+            await asyncio.wait_for(database.warm_pool(5), timeout=5)
+            assert pool.get_idle_size() == pool.get_size()
+        finally:
+            pool._pool = raw
+            await asyncio.wait_for(database.close_pool(), timeout=5)
+
+    asyncio.run(main())
+
+
+def test_cancelled_warmup_leaves_nothing_checked_out(fresh_pool):
+    async def main():
+        await database.get_pool()
+        database.start_pool_warmup()
+        await asyncio.sleep(0.002)  # mid-connect
+        # Hangs if a cancelled warm-up kept a connection
+        await asyncio.wait_for(database.close_pool(), timeout=5)
+
+    asyncio.run(main())
@@ -0,0 +1,31 @@
+"""
+Tests for the doctor calendar window and day buckets
+"""
+from datetime import date
+
+from api_endpoints import bucket_appointments_by_day, calendar_window
+
+
+class TestCalendarWindow:
+    """Views resolve to inclusive [first, last] day ranges"""
+
+    def test_day_view_is_the_anchor(self):
+        assert calendar_window(date(2025, 12, 11), "day") == (date(2025, 12, 11), date(2025, 12, 11))
+
+    def test_week_view_starts_on_sunday(self):
+        assert calendar_window(date(2025, 12, 11), "week") == (date(2025, 12, 7), date(2025, 12, 13))
+        assert calendar_window(date(2025, 12, 7), "week") == (date(2025, 12, 7), date(2025, 12, 13))
+
+    def test_month_view_handles_leap_february(self):
+        assert calendar_window(date(2024, 2, 10), "month") == (date(2024, 2, 1), date(2024, 2, 29))
+
+
+def test_buckets_keep_order_within_a_day():
+    appointments = [
+        {"id": "1", "date": "2025-12-11", "time": "09:00"},
+        {"id": "2", "date": "2025-12-11", "time": "10:30"},
+        {"id": "3", "date": "2025-12-12", "time": "08:00"},
+    ]
+    days = bucket_appointments_by_day(appointments)
+    assert list(days) == ["2025-12-11", "2025-12-12"]
+    assert [a["id"] for a in days["2025-12-11"]] == ["1", "2"]
@@ -0,0 +1,149 @@
+"""
+Tests for bulk doctor ingestion
+Database tests need a reachable PostgreSQL (DATABASE_URL) and are skipped
+otherwise; they run inside a transaction that is rolled back.
+"""
+import asyncio
+from datetime import time
+
+import asyncpg
+import pytest
+import pytest_asyncio
+
+from database import DATABASE_URL
+from doctor_ingest import ingest_doctors, normalize_doctors
+
+DOCTOR = {
+    "full_name": "Dr. Test Ingest",
+    "specialty": "Cardiology",
+    "sub_specialty": None,
+    "phone": "+593-2-000-0000",
+    "clinic_name": "Ingest Clinic",
+    "address": "Av. Prueba 1",
+    "city": "Quito",
+    "latitude": -0.19,
+    "longitude": -78.48,
+    "is_24_hours": False,
+    "availability_schedule": {"monday": ["08:00-12:00", "14:00-18:00"], "sunday": ["09:00-13:00"]}
+}
+
+
+class TestNormalize:
+    """Records become stage rows; bad records are rejected, not fatal"""
+
+    def test_schedule_expands_to_slot_rows(self):
+        doctor_rows, slot_rows, rejected = normalize_doctors([DOCTOR])
+        assert rejected == []
+        assert doctor_rows[0][1] == "dr..test.ingest@ingestclinic.com"
+        assert (0, 1, time(8, 0), time(12, 0), False) in slot_rows
+        assert len(slot_rows) == 3
+
+    def test_sunday_is_day_zero(self):
+        _, slot_rows, _ = normalize_doctors([DOCTOR])
+        assert {row[1] for row in slot_rows} == {0, 1}
+
+    def test_malformed_record_is_rejected(self):
+        broken = dict(DOCTOR, availability_schedule={"monday": ["8am to noon"]})
+        doctor_rows, _, rejected = normalize_doctors([broken, DOCTOR])
+        assert len(rejected) == 1
+        assert [row[0] for row in doctor_rows] == [1]
+
+
+@pytest_asyncio.fixture
+async def conn():
+    try:
+        connection = await asyncpg.connect(DATABASE_URL, timeout=2)
+    except (OSError, asyncpg.PostgresError, asyncio.TimeoutError) as e:
+        pytest.skip(f"PostgreSQL not available: {e}")
+    transaction = connection.transaction()
+    await transaction.start()
+    yield connection
+    await transaction.rollback()
+    await connection.close()
+
+
+@pytest.mark.asyncio
+async def test_ingest_merges_batches_and_is_idempotent(conn):
+    doctors = [dict(DOCTOR, full_name=f"Dr. Test Ingest {i}") for i in range(25)]
+
+    first = await ingest_doctors(conn, doctors, batch_size=10)
+    assert (first.users, first.doctors, first.locations, first.availability_slots) == (25, 25, 25, 75)
+
+    second = await ingest_doctors(conn, doctors, batch_size=10)
+    assert (second.users, second.doctors, second.locations, second.availability_slots, second.retired_slots) == (
+        0, 0, 0, 0, 0
+    )
+
+    slots = await conn.fetchval("""
+        SELECT COUNT(*)
+        FROM doctor_availability da
+        JOIN doctor_service_locations l ON l.id = da.location_id
+        WHERE l.name = 'Ingest Clinic' AND da.doctor_id = l.doctor_id
+    """)
+    assert slots == 75
+
+
+@pytest.mark.asyncio
+async def test_incremental_load_writes_only_changed_rows(conn):
+    await ingest_doctors(conn, [DOCTOR])
+
+    changed = dict(DOCTOR, availability_schedule={
+        "monday": ["08:00-13:00", "14:00-18:00"],
+        "sunday": ["09:00-13:00"],
+        "tuesday": ["08:00-12:00"],
+    })
+    result = await ingest_doctors(conn, [changed])
+
+    assert (result.doctors, result.locations, result.availability_slots) == (0, 0, 2)
+    end_times = await conn.fetch("""
+        SELECT da.day_of_week, da.start_time, da.end_time
+        FROM doctor_availability da
+        JOIN doctor_service_locations l ON l.id = da.location_id
+        WHERE l.name = 'Ingest Clinic'
+        ORDER BY 1, 2
+    """)
+    assert [tuple(row) for row in end_times] == [
+        (0, time(9, 0), time(13, 0)),
+        (1, time(8, 0), time(13, 0)),
+        (1, time(14, 0), time(18, 0)),
+        (2, time(8, 0), time(12, 0)),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_reload_retires_removed_slots(conn):
+    await ingest_doctors(conn, [DOCTOR])
+
+    # The afternoon shift is gone from the source schedule
+    result = await ingest_doctors(conn, [dict(DOCTOR, availability_schedule={
+        "monday": ["08:00-12:00"],
+        "sunday": ["09:00-13:00"],
+    })])
+    assert (result.availability_slots, result.retired_slots) == (0, 1)
+
+    async def offered():
+        rows = await conn.fetch("""
+            SELECT da.day_of_week, da.start_time
+            FROM doctor_availability da
+            JOIN doctor_service_locations l ON l.id = da.location_id
+            WHERE l.name = 'Ingest Clinic' AND da.is_available
+            ORDER BY 1, 2
+        """)
+        return [tuple(row) for row in rows]
+
+    assert await offered() == [(0, time(9, 0)), (1, time(8, 0))]
+
+    # Coming back revives the same row
+    result = await ingest_doctors(conn, [DOCTOR])
+    assert (result.availability_slots, result.retired_slots) == (1, 0)
+    assert await offered() == [(0, time(9, 0)), (1, time(8, 0)), (1, time(14, 0))]
+
+
+@pytest.mark.asyncio
+async def test_sunday_stored_as_seven_is_rejected(conn):
+    await ingest_doctors(conn, [DOCTOR])
+    doctor_id = await conn.fetchval("SELECT doctor_id FROM doctor_service_locations WHERE name = 'Ingest Clinic'")
+    with pytest.raises(asyncpg.CheckViolationError):
+        await conn.execute(
+            "INSERT INTO doctor_availability (doctor_id, day_of_week, is_24_hours) VALUES ($1, 7, TRUE)", doctor_id
+        )
@@ -0,0 +1,127 @@
+"""
+Tests for liveness/readiness checks (the pool is faked; no database needed)
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+import health
+from health import DEGRADED, OK, UNHEALTHY, outbound_call, readiness
+
+
+class FakeConnection:
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def fetchval(self, query, timeout=None):
+        await asyncio.sleep(self.delay)
+        return 1
+
+
+class FakePool:
+    def __init__(self, size=5, idle=5, max_size=20, ping_delay=0.0, exhausted=False):
+        self.size, self.idle, self.max_size = size, idle, max_size
+        self.ping_delay = ping_delay
+        self.exhausted = exhausted
+        self.pings = 0
+
+    def get_size(self):
+        return self.size
+
+    def get_idle_size(self):
+        return self.idle
+
+    def get_max_size(self):
+        return self.max_size
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        if self.exhausted:
+            raise asyncio.TimeoutError()
+        self.pings += 1
+        yield FakeConnection(self.ping_delay)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+
+    async def get_pool():
+        return pool
+
+    monkeypatch.setattr(health, "get_pool", get_pool)
+    monkeypatch.setattr(health, "_ping_result", None)
+    monkeypatch.setattr(health, "_outbound", {})
+    monkeypatch.setattr(health, "recent_loop_lag", lambda: 0.002)
+    return pool
+
+
+@pytest.mark.asyncio
+async def test_ready_when_everything_is_fine(pool):
+    status_code, report = await readiness()
+    assert status_code == 200 and report["status"] == OK
+    checks = report["checks"]
+    assert checks["database"]["status"] == OK and checks["database"]["latency_ms"] < 100
+    assert checks["pool"] == {"status": OK, "in_use": 0, "idle": 5, "size": 5, "max_size": 20, "saturation": 0.0}
+    assert checks["event_loop"] == {"status": OK, "monitored": True, "max_lag_ms": 2.0}
+
+
+@pytest.mark.asyncio
+async def test_ping_is_cached_and_shared(pool):
+    await asyncio.gather(*(readiness() for _ in range(10)))
+    await readiness()
+    assert pool.pings == 1
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_degrades_then_fails(pool):
+    pool.size, pool.idle = 20, 3
+    status_code, report = await readiness()
+    assert (status_code, report["status"]) == (200, DEGRADED)
+
+    pool.idle = 0
+    pool.exhausted = True
+    health._ping_result = None
+    status_code, report = await readiness()
+    assert (status_code, report["status"]) == (503, UNHEALTHY)
+    assert report["checks"]["pool"]["saturation"] == 1.0
+    assert "pool exhausted" in report["checks"]["database"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_slow_ping_and_loop_lag_degrade(pool, monkeypatch):
+    pool.ping_delay = 0.15
+    status_code, report = await readiness()
+    assert report["checks"]["database"]["status"] == DEGRADED and status_code == 200
+
+    monkeypatch.setattr(health, "recent_loop_lag", lambda: 1.5)
+    status_code, report = await readiness()
+    assert report["checks"]["event_loop"]["status"] == UNHEALTHY and status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_outbound_failures_only_degrade(pool):
+    health.register_outbound("twilio", configured=False)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            with outbound_call("google"):
+                raise ConnectionError("connection reset")
+    # A rejected token means Google answered
+    with pytest.raises(ValueError):
+        with outbound_call("whatsapp", answered=(ValueError,)):
+            raise ValueError("bad token")
+
+    status_code, report = await readiness()
+    services = report["checks"]["outbound"]["services"]
+    assert (status_code, report["status"]) == (200, DEGRADED)
+    assert services["twilio"]["status"] == "unconfigured"
+    assert services["google"]["consecutive_failures"] == 3
+    assert services["google"]["last_error"] == "ConnectionError: connection reset"
+    assert services["whatsapp"]["status"] == OK
+
+    with outbound_call("google") as call:
+        call.fail("HTTP 503")
+    with outbound_call("google"):
+        pass
+    assert health._outbound["google"].consecutive_failures == 0
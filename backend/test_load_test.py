@@ -0,0 +1,56 @@
+"""
+Tests for the load test's result summary and regression comparison
+(no database or server needed)
+"""
+from benchmarks.load_test import Recorder, compare, percentile, summarize
+
+
+def result(p95_ms, errors=0):
+    return {"scenarios": {"chat_polling": {"endpoints": {
+        "GET /api/chat/messages/{appointment_id}": {"p95_ms": p95_ms, "errors": errors},
+    }}}}
+
+
+class TestSummary:
+    def test_nearest_rank_percentiles(self):
+        values = [float(v) for v in range(1, 101)]
+        assert percentile(values, 0.50) == 50.0
+        assert percentile(values, 0.95) == 95.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([7.0], 0.99) == 7.0
+        assert percentile([], 0.5) == 0.0
+
+    def test_per_endpoint_stats(self):
+        recorder = Recorder()
+        for ms in (10.0, 20.0, 30.0, 40.0):
+            recorder.record("GET /a", ms, ok=True)
+        recorder.record("GET /a", 5.0, ok=False)
+        recorder.record("POST /b", 1.0, ok=False)
+
+        summary = summarize(recorder, seconds=2.0)
+        assert summary["GET /a"]["requests"] == 4
+        assert summary["GET /a"]["errors"] == 1
+        assert summary["GET /a"]["throughput_rps"] == 2.0
+        assert summary["GET /a"]["p50_ms"] == 20.0
+        assert summary["GET /a"]["max_ms"] == 40.0
+        assert summary["POST /b"]["requests"] == 0
+
+    def test_warmup_is_not_recorded(self):
+        recorder = Recorder(enabled=False)
+        recorder.record("GET /a", 10.0, ok=True)
+        assert summarize(recorder, seconds=1.0) == {}
+
+
+class TestCompare:
+    def test_p95_growth_beyond_threshold_is_a_regression(self):
+        assert compare(result(11.0), result(10.0)) == []
+        assert len(compare(result(13.0), result(10.0))) == 1
+        assert compare(result(13.0), result(10.0), max_regression=0.5) == []
+
+    def test_new_errors_are_a_regression(self):
+        assert compare(result(10.0, errors=3), result(10.0)) == [
+            "chat_polling GET /api/chat/messages/{appointment_id}: errors 0 -> 3"
+        ]
+
+    def test_endpoints_missing_from_baseline_are_skipped(self):
+        assert compare(result(50.0), {"scenarios": {}}) == []
@@ -0,0 +1,72 @@
+"""
+Tests for request metrics (no database needed)
+"""
+import pytest
+import httpx
+from fastapi import FastAPI
+
+import metrics
+from metrics import Histogram, MetricsMiddleware, record_pool_wait, record_query, render_metrics, untracked
+
+
+def sample(text, line_prefix):
+    return [line for line in text.splitlines() if line.startswith(line_prefix)]
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('h', 'help', ('route',), buckets=(1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(('/x',), value)
+    assert list(histogram.render())[2:] == [
+        'h_bucket{route="/x",le="1"} 2',
+        'h_bucket{route="/x",le="5"} 3',
+        'h_bucket{route="/x",le="+Inf"} 4',
+        'h_sum{route="/x"} 14.5',
+        'h_count{route="/x"} 4',
+    ]
+
+
+def test_gauges_are_rendered():
+    text = render_metrics([('db_pool_size', 'Open connections', 7)])
+    assert '# TYPE db_pool_size gauge\ndb_pool_size 7\n' in text
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        record_pool_wait(0.25)
+        record_query(0.5)
+        record_query(0.5)
+        with untracked():
+            record_query(9.0)
+        return {"item_id": item_id}
+
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_by_route_template(app):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        for item_id in (1, 2, 3):
+            assert (await client.get(f"/items/{item_id}")).status_code == 200
+        assert (await client.get("/missing")).status_code == 404
+
+    text = render_metrics()
+    labels = 'method="GET",route="/items/{item_id}"'
+    assert sample(text, f'http_requests_total{{{labels},status="200"}}') == [
+        f'http_requests_total{{{labels},status="200"}} 3'
+    ]
+    assert sample(text, 'http_requests_total{method="GET",route="unmatched",status="404"}')
+    assert sample(text, f'http_request_db_queries_sum{{{labels}}}') == [f'http_request_db_queries_sum{{{labels}}} 6']
+    assert sample(text, f'http_request_db_seconds_sum{{{labels}}}') == [f'http_request_db_seconds_sum{{{labels}}} 3']
+    assert sample(text, f'http_request_pool_wait_seconds_sum{{{labels}}}') == [
+        f'http_request_pool_wait_seconds_sum{{{labels}}} 0.75'
+    ]
+    # {"item_id":N} is 13 bytes
+    assert sample(text, f'http_response_size_bytes_sum{{{labels}}}') == [f'http_response_size_bytes_sum{{{labels}}} 39']
+    # Queries outside a request still reach the global histogram
+    assert metrics.DB_QUERY_DURATION._values[()][-1] >= 12.0
@@ -0,0 +1,41 @@
+"""
+Tests for the versioned migration files
+"""
+import pytest
+
+from migrate import Migration, load_migrations
+
+
+def test_migrations_are_numbered_consecutively():
+    versions = [m.version for m in load_migrations()]
+    assert versions == list(range(1, len(versions) + 1))
+
+
+def test_concurrent_index_migration_runs_outside_transaction():
+    migrations = {m.name: m for m in load_migrations()}
+    assert not migrations['hot_query_indexes'].transactional
+    assert migrations['base_tables'].transactional
+    for statement in migrations['hot_query_indexes'].statements():
+        assert 'CONCURRENTLY' in statement
+
+
+def test_statements_split_on_terminators_and_skip_comments():
+    migration = Migration(1, 'example', (
+        "-- migrate: no-transaction\n"
+        "-- a comment; with a semicolon\n"
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS a\n"
+        "    ON t (x);\n"
+        "\n"
+        "DROP INDEX CONCURRENTLY IF EXISTS b;\n"
+    ))
+    assert migration.statements() == [
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS a\n    ON t (x)",
+        "DROP INDEX CONCURRENTLY IF EXISTS b",
+    ]
+
+
+def test_duplicate_versions_are_rejected(tmp_path):
+    (tmp_path / '0001_one.sql').write_text('SELECT 1;')
+    (tmp_path / '0001_other.sql').write_text('SELECT 2;')
+    with pytest.raises(ValueError):
+        load_migrations(tmp_path)
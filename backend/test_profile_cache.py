@@ -0,0 +1,57 @@
+"""
+Unit tests for the read-through profile cache
+"""
+import time
+
+from profile_cache import ProfileCache
+
+
+def make_profile(user_id, complete=False):
+    return {"id": user_id, "profile_complete": complete, "profile_data": "{}"}
+
+
+class TestProfileCache:
+    """Bounded LRU + TTL + invalidation behaviour"""
+
+    def test_get_returns_cached_profile(self):
+        cache = ProfileCache(max_entries=10, ttl_seconds=60)
+        cache.set("u1", make_profile("u1", True))
+
+        assert cache.get("u1")["profile_complete"] is True
+        assert cache.get("missing") is None
+
+    def test_evicts_least_recently_used(self):
+        cache = ProfileCache(max_entries=2, ttl_seconds=60)
+        cache.set("u1", make_profile("u1"))
+        cache.set("u2", make_profile("u2"))
+        cache.get("u1")  # u2 becomes least recently used
+        cache.set("u3", make_profile("u3"))
+
+        assert len(cache) == 2
+        assert cache.get("u2") is None
+        assert cache.get("u1") is not None
+
+    def test_entries_expire_after_ttl(self, monkeypatch):
+        cache = ProfileCache(max_entries=10, ttl_seconds=5)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        cache.set("u1", make_profile("u1"))
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+        assert cache.get("u1") is None
+
+    def test_invalidate_removes_entry(self):
+        cache = ProfileCache(max_entries=10, ttl_seconds=60)
+        cache.set("u1", make_profile("u1"))
+        cache.invalidate("u1")
+
+        assert cache.get("u1") is None
+
+    def test_load_racing_with_invalidation_is_not_cached(self):
+        """A row read before a write must not be stored after the write invalidates"""
+        cache = ProfileCache(max_entries=10, ttl_seconds=60)
+        generation = cache.generation  # load starts
+        cache.invalidate("u1")         # profile updated meanwhile
+        cache.set("u1", make_profile("u1"), generation)
+
+        assert cache.get("u1") is None
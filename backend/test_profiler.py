@@ -0,0 +1,112 @@
+"""
+Tests for the sampling profiler and event-loop lag monitor
+"""
+import asyncio
+import io
+import threading
+import time
+
+import httpx
+import orjson
+import pytest
+from fastapi import FastAPI
+
+import api_endpoints
+import profiler
+import structured_logging
+from metrics import EVENT_LOOP_LAG
+from profiler import LoopLagMonitor, format_collapsed, sample_stacks
+
+
+def busy_wait(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sample_stacks_collapses_the_target_thread():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_wait, args=(stop,), name="busy")
+    worker.start()
+    try:
+        counts = sample_stacks(worker.ident, seconds=0.2, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sum(counts.values()) > 10
+    for stack in counts:
+        frames = stack.split(";")
+        assert frames[0].startswith("Thread._bootstrap (threading.py)")
+        assert "busy_wait (test_profiler.py)" in frames
+    line = format_collapsed(counts).splitlines()[0]
+    assert line.rsplit(" ", 1)[1].isdigit()
+
+
+def test_all_threads_are_prefixed_with_the_thread_name():
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_wait, args=(stop,), name="busy")
+    worker.start()
+    try:
+        counts = sample_stacks(None, seconds=0.05, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+    assert any(stack.startswith("busy;") for stack in counts)
+    # The sampling thread leaves itself out
+    assert not any(stack.startswith("MainThread;") for stack in counts)
+
+
+@pytest.fixture
+def log_output():
+    structured_logging.shutdown_logging()
+    stream = io.StringIO()
+    structured_logging.configure_logging(level="INFO", fmt="json", stream=stream)
+    yield stream
+    structured_logging.shutdown_logging()
+    structured_logging.configure_logging()
+
+
+def blocking_call():
+    time.sleep(0.3)
+
+
+def test_loop_monitor_logs_the_blocking_stack(log_output):
+    async def main():
+        monitor = LoopLagMonitor(threshold_ms=100)
+        monitor.start()
+        await asyncio.sleep(0.1)
+        blocking_call()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor
+
+    lag_before = EVENT_LOOP_LAG._values.get((), [0.0])[-1]
+    monitor = asyncio.run(main())
+    structured_logging.shutdown_logging()
+
+    assert monitor.stalls == 1
+    (entry,) = [orjson.loads(line) for line in log_output.getvalue().splitlines()]
+    assert entry["event"] == "event_loop_blocked" and entry["blocked_ms"] >= 100
+    assert "in blocking_call | time.sleep(0.3)" in entry["stack"][-1]
+    assert EVENT_LOOP_LAG._values[()][-1] - lag_before >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_profile_endpoint(monkeypatch):
+    app = FastAPI()
+    app.include_router(api_endpoints.router)
+    app.dependency_overrides[api_endpoints.get_current_user] = lambda: {"id": "u1", "role": "super_admin"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.post("/api/admin/profile", params={"seconds": 0.1})).status_code == 404
+
+        monkeypatch.setattr(profiler, "PROFILER_ENABLED", True)
+        first, second = await asyncio.gather(
+            client.post("/api/admin/profile", params={"seconds": 0.2}),
+            client.post("/api/admin/profile", params={"seconds": 0.2}),
+        )
+
+    assert sorted([first.status_code, second.status_code]) == [200, 409]
+    body = (first if first.status_code == 200 else second).text
+    # The loop thread was mostly idle in the selector while the sampler ran
+    assert "run_until_complete" in body or "run_forever" in body
@@ -0,0 +1,84 @@
+"""
+Tests for query fingerprinting and the slow query log (no database needed)
+"""
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api_endpoints
+from query_stats import OTHER, QUERY_STATS, QueryStats, fingerprint, redact
+
+
+class TestFingerprint:
+    def test_literals_and_parameters_are_normalized(self):
+        assert fingerprint("""
+            SELECT * FROM users  -- look up by email
+            WHERE email = 'a@b.ec' AND id = $1 AND age > 42 AND score < -1.5e3
+        """) == "SELECT * FROM users WHERE email = ? AND id = ? AND age > ? AND score < ?"
+
+    def test_queries_differing_only_in_values_share_a_fingerprint(self):
+        assert fingerprint("SELECT a FROM t WHERE id IN (1, 2, 3)") == \
+            fingerprint("SELECT a FROM t WHERE id IN ($1,$2)") == "SELECT a FROM t WHERE id IN (...)"
+        assert fingerprint("SELECT a FROM t WHERE id = ANY(ARRAY[1, 2])") == "SELECT a FROM t WHERE id = ANY(ARRAY[...])"
+        assert fingerprint("SELECT 'it''s' || E'x\\'") == "SELECT ? || ?"
+
+    def test_identifiers_keep_their_digits(self):
+        assert fingerprint("SELECT col2 FROM t1 WHERE x::numeric(10, 2) = $12") == \
+            "SELECT col2 FROM t1 WHERE x::numeric(...) = ?"
+
+
+def test_redact_never_includes_values():
+    text = redact(("patient@example.com", 42, None, [1, 2], b"\x00"))
+    assert text == "(str[19], int, NULL, list[2], bytes[1])"
+    assert "patient" not in text
+
+
+def test_stats_rank_and_bound_cardinality():
+    stats = QueryStats(slow_query_ms=0, max_fingerprints=2)
+    stats.record("SELECT 1", (), 0.010)
+    stats.record("SELECT 2", (), 0.030)
+    stats.record("SELECT * FROM a", (), 0.001)
+    stats.record("SELECT * FROM b", (), 0.002)
+    stats.record("SELECT * FROM c", (), 0.003)
+
+    top = stats.top(order_by="total")
+    assert [row["fingerprint"] for row in top] == ["SELECT ?", OTHER, "SELECT * FROM a"]
+    assert top[0] == {
+        "fingerprint": "SELECT ?", "calls": 2, "total_ms": 40.0, "mean_ms": 20.0, "max_ms": 30.0, "slow_calls": 0
+    }
+    assert stats.top(1, order_by="calls")[0]["fingerprint"] in ("SELECT ?", OTHER)
+    with pytest.raises(ValueError):
+        stats.top(order_by="rows")
+
+
+def test_slow_queries_are_logged_redacted(caplog):
+    stats = QueryStats(slow_query_ms=50)
+    with caplog.at_level(logging.WARNING, logger="medicure.slow_query"):
+        stats.record("SELECT * FROM users WHERE email = $1", ("someone@example.com",), 0.010)
+        stats.record("SELECT * FROM users WHERE email = $1", ("someone@example.com",), 0.120)
+        stats.record("INSERT INTO t VALUES ($1)", (), 0.200, batch=500)
+
+    assert [record.getMessage() for record in caplog.records] == [
+        "slow query 120.0 ms: SELECT * FROM users WHERE email = ? params=(str[19])",
+        "slow query 200.0 ms: INSERT INTO t VALUES (?) params=500 rows",
+    ]
+    assert stats.top()[1]["slow_calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_admin_endpoint_requires_super_admin():
+    app = FastAPI()
+    app.include_router(api_endpoints.router)
+    user = {"id": "u1", "role": "doctor"}
+    app.dependency_overrides[api_endpoints.get_current_user] = lambda: user
+    QUERY_STATS.record("SELECT now()", (), 0.001)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/api/admin/query-stats")).status_code == 403
+        user["role"] = "super_admin"
+        response = await client.get("/api/admin/query-stats", params={"order_by": "calls", "limit": 500})
+        assert response.status_code == 200
+        assert "SELECT now()" in [row["fingerprint"] for row in response.json()["statements"]]
+        assert (await client.get("/api/admin/query-stats", params={"order_by": "rows"})).status_code == 400
@@ -0,0 +1,128 @@
+"""
+Tests for the directory crawler against a local HTTP server serving the
+saved pages in test_fixtures/doctor_directory
+"""
+import json
+import threading
+import time
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from scrape_quito_doctors import Crawler, HostRateLimiter, load_crawled_doctors
+
+FIXTURE_DIR = Path(__file__).parent / 'test_fixtures' / 'doctor_directory'
+
+
+class DirectoryHandler(SimpleHTTPRequestHandler):
+    """Serves the fixture pages; paths in `flaky` answer 503 the first time"""
+    hits: Counter
+    flaky: set
+
+    def do_GET(self):
+        self.hits[self.path] += 1
+        if self.path in self.flaky and self.hits[self.path] == 1:
+            self.send_response(503)
+            self.send_header('Retry-After', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def directory_server():
+    handler = type('Handler', (DirectoryHandler,), {'hits': Counter(), 'flaky': set()})
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(handler, directory=str(FIXTURE_DIR)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", handler
+    server.shutdown()
+    server.server_close()
+
+
+def make_crawler(tmp_path, **kwargs):
+    options = dict(requests_per_second_per_host=0, backoff_seconds=0.01)
+    options.update(kwargs)
+    return Crawler(str(tmp_path / 'doctors.jsonl'), str(tmp_path / 'checkpoint.json'), **options)
+
+
+@pytest.mark.asyncio
+async def test_crawl_follows_pagination_and_detail_links(directory_server, tmp_path):
+    base_url, handler = directory_server
+
+    stats = await make_crawler(tmp_path).run([(f"{base_url}/quito-page-1.html", 'schema_org_directory')])
+
+    assert (stats.pages, stats.doctors, stats.failed) == (3, 4, 0)
+    doctors = {d['full_name']: d for d in load_crawled_doctors(str(tmp_path / 'doctors.jsonl'))}
+    assert set(doctors) == {"Dra. Lucía Herrera", "Dr. Andrés Paredes", "Dr. Esteban Mora", "Dra. Sofía Naranjo"}
+    assert doctors["Dra. Lucía Herrera"]["specialty"] == "Cardiologist"
+    assert doctors["Dra. Lucía Herrera"]["availability_schedule"] == {
+        "monday": ["08:00-16:00"], "wednesday": ["08:00-16:00"]
+    }
+    assert doctors["Dr. Andrés Paredes"]["latitude"] == -0.2048
+    assert doctors["Dr. Esteban Mora"]["is_24_hours"] is True
+    assert doctors["Dra. Sofía Naranjo"]["clinic_name"] == "Dra. Sofía Naranjo"
+    # Page 2 links back to page 1, which must not be fetched again
+    assert handler.hits["/quito-page-1.html"] == 1
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried(directory_server, tmp_path):
+    base_url, handler = directory_server
+    handler.flaky.add("/quito-page-2.html")
+
+    stats = await make_crawler(tmp_path).run([(f"{base_url}/quito-page-1.html", 'schema_org_directory')])
+
+    assert stats.retries == 1
+    assert stats.failed == 0
+    assert handler.hits["/quito-page-2.html"] == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_pages_fail_without_stopping_the_crawl(directory_server, tmp_path):
+    base_url, _ = directory_server
+
+    stats = await make_crawler(tmp_path).run([
+        (f"{base_url}/missing.html", 'schema_org_directory'),
+        (f"{base_url}/quito-page-2.html", 'schema_org_directory'),
+    ])
+
+    assert (stats.pages, stats.failed) == (1, 1)
+    checkpoint = json.loads((tmp_path / 'checkpoint.json').read_text())
+    assert list(checkpoint['failed']) == [f"{base_url}/missing.html"]
+
+
+@pytest.mark.asyncio
+async def test_interrupted_crawl_resumes_from_checkpoint(directory_server, tmp_path):
+    base_url, handler = directory_server
+    seeds = [(f"{base_url}/quito-page-1.html", 'schema_org_directory')]
+
+    first = await make_crawler(tmp_path, max_pages=1).run(seeds)
+    assert first.pages == 1
+    pending = json.loads((tmp_path / 'checkpoint.json').read_text())['pending']
+    assert len(pending) == 2
+
+    second = await make_crawler(tmp_path).run(seeds)
+    assert second.pages == 2
+    assert all(hits == 1 for hits in handler.hits.values())
+    assert len(load_crawled_doctors(str(tmp_path / 'doctors.jsonl'))) == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_requests_per_host():
+    limiter = HostRateLimiter(requests_per_second=50)
+
+    start = time.monotonic()
+    for _ in range(5):
+        await limiter.wait("example.org")
+    await limiter.wait("other.example.org")
+    elapsed = time.monotonic() - start
+
+    assert elapsed >= 4 / 50 * 0.9
+    assert elapsed < 0.5
@@ -0,0 +1,85 @@
+"""
+Tests for structured logging: redaction, sampling and the queued writer
+"""
+import io
+import logging
+
+import orjson
+import pytest
+
+import structured_logging
+from structured_logging import REDACTED, SamplingFilter, get_logger, mask, parse_sample_rates, redact_fields
+
+
+def test_mask_hides_phones_otps_and_emails_but_not_ids():
+    assert mask("OTP 483920 sent to whatsapp:+593987654328") == "OTP ***20 sent to whatsapp:***28"
+    assert mask("juan.perez@gmail.com") == "j***@gmail.com"
+    user_id = "3f0e6b1c-0000-4000-8000-000000000001"
+    assert mask(f"user {user_id} at 2026-10-19T10:00 took 167.5 ms") == f"user {user_id} at 2026-10-19T10:00 took 167.5 ms"
+
+
+def test_secret_fields_are_replaced():
+    fields = redact_fields({"otp": "483920", "access_token": "eyJ...", "phone": "+593987654328", "attempts": 3})
+    assert fields == {"otp": REDACTED, "access_token": REDACTED, "phone": "***28", "attempts": 3}
+
+
+def test_sampling_only_applies_to_configured_low_level_events():
+    sampler = SamplingFilter(parse_sample_rates("noisy=0, kept=1"))
+
+    def record(event, level=logging.INFO):
+        return logging.LogRecord("medicure.test", level, __file__, 1, event, None, None)
+
+    assert not sampler.filter(record("noisy"))
+    assert sampler.filter(record("noisy", logging.WARNING))
+    assert sampler.filter(record("kept"))
+    assert sampler.filter(record("other"))
+
+    sampler.rates["half"] = 0.5
+    kept = [r for r in (record("half") for _ in range(400)) if sampler.filter(r)]
+    assert 100 < len(kept) < 300
+    assert all(r.fields["sample_rate"] == 0.5 for r in kept)
+
+
+@pytest.fixture
+def output():
+    structured_logging.shutdown_logging()
+    stream = io.StringIO()
+    structured_logging.configure_logging(level="DEBUG", fmt="json", stream=stream)
+    yield stream
+    structured_logging.shutdown_logging()
+    structured_logging.configure_logging()
+
+
+def lines(stream):
+    structured_logging.shutdown_logging()  # flushes the queue
+    return [orjson.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_written_as_redacted_json(output):
+    log = get_logger("test")
+    log.info("otp_requested", phone="+593987654328", otp="483920", role="patient")
+    try:
+        raise RuntimeError("send to +593987654328 failed")
+    except RuntimeError:
+        log.exception("otp_send_error")
+    # Plain stdlib loggers under medicure (e.g. the slow query log) go through the same writer
+    logging.getLogger("medicure.slow_query").warning("slow query %.1f ms", 250.0)
+
+    first, second, third = lines(output)
+    assert first["level"] == "info" and first["logger"] == "medicure.test"
+    assert {key: first[key] for key in ("event", "phone", "otp", "role")} == {
+        "event": "otp_requested", "phone": "***28", "otp": REDACTED, "role": "patient"
+    }
+    assert second["event"] == "otp_send_error"
+    assert "RuntimeError: send to ***28 failed" in second["exc"]
+    assert third["event"] == "slow query 250.0 ms"
+
+
+def test_level_threshold(output):
+    structured_logging.shutdown_logging()
+    structured_logging.configure_logging(level="WARNING", fmt="json", stream=output)
+    log = get_logger("test")
+    log.debug("dropped")
+    log.info("dropped")
+    log.warning("kept")
+    assert [entry["event"] for entry in lines(output)] == ["kept"]
@@ -0,0 +1,106 @@
+"""
+Tests for the synthetic data generator (no database needed)
+"""
+from datetime import datetime
+
+from doctor_ingest import doctor_email, normalize_doctors
+from synthetic_data import (
+    CITIES,
+    DEFAULT_SEED,
+    DoctorRef,
+    Population,
+    patient_id,
+    synthetic_appointments,
+    synthetic_doctors,
+    synthetic_emergency_alerts,
+    weekly_hours,
+)
+
+ANCHOR = datetime(2025, 6, 2, 12, 0)
+
+
+def doctor_refs(doctors):
+    city_index = {name: i for i, (name, _, _, _) in enumerate(CITIES)}
+    refs = {}
+    for i, doctor in enumerate(doctors):
+        city = city_index[doctor["city"]]
+        refs.setdefault(city, []).append(DoctorRef(
+            i + 1, f"doctor-user-{i}", city, weekly_hours(doctor["availability_schedule"]), doctor["is_24_hours"]
+        ))
+    return refs
+
+
+class TestDoctors:
+    def test_same_seed_same_records(self):
+        assert list(synthetic_doctors(200, seed=7)) == list(synthetic_doctors(200, seed=7))
+        assert list(synthetic_doctors(200, seed=7)) != list(synthetic_doctors(200, seed=8))
+
+    def test_records_ingest_as_distinct_doctors(self):
+        doctors = list(synthetic_doctors(2000))
+        doctor_rows, _, rejected = normalize_doctors(doctors)
+        assert rejected == []
+        assert len({doctor_email(doctor) for doctor in doctors}) == len(doctor_rows) == 2000
+
+    def test_doctors_follow_population_and_share_clinics(self):
+        doctors = list(synthetic_doctors(2000))
+        per_city = {name: sum(d["city"] == name for d in doctors) for name, _, _, _ in CITIES}
+        assert per_city["Quito"] > per_city["Cuenca"] > per_city["Cumbayá"]
+        assert len({d["clinic_name"] for d in doctors}) < len(doctors) / 3
+        assert 0.03 < sum(d["is_24_hours"] for d in doctors) / len(doctors) < 0.2
+
+
+class TestAppointments:
+    def setup_method(self):
+        self.doctors = doctor_refs(synthetic_doctors(300))
+        self.population = Population(2000)
+
+    def batches(self, count=3000, seed=42):
+        return list(synthetic_appointments(
+            count, self.population, self.doctors, ANCHOR, seed=seed, chunk_size=1000
+        ))
+
+    def test_deterministic_and_chunked(self):
+        batches = self.batches()
+        assert [len(b.appointments) for b in batches] == [1000, 1000, 1000]
+        assert batches == self.batches()
+
+    def test_scheduled_visits_fall_in_working_hours(self):
+        by_id = {ref.doctor_id: ref for refs in self.doctors.values() for ref in refs}
+        for batch in self.batches():
+            for _, _, doctor_id, kind, when, *_ in batch.appointments:
+                if kind == "scheduled":
+                    shifts = by_id[doctor_id].hours[(when.weekday() + 1) % 7]
+                    assert any(start <= when.hour < end for start, end in shifts)
+
+    def test_dependents_reference_their_appointment(self):
+        for batch in self.batches():
+            status = {row[0]: row[5] for row in batch.appointments}
+            assert all(status[row[3]] == "completed" for row in batch.prescriptions + batch.lab_tests)
+            assert all(row[1] in status and row[5] <= ANCHOR for row in batch.chat_messages)
+
+    def test_only_recent_alerts_are_open(self):
+        rows = [row for chunk in synthetic_emergency_alerts(
+            2000, self.population, self.doctors, ANCHOR
+        ) for row in chunk]
+        assert len(rows) == 2000
+        for row in rows:
+            status, created = row[5], row[12]
+            if status in ("pending", "accepted", "in_progress"):
+                assert (ANCHOR - created).total_seconds() < 2 * 3600
+
+    def test_cities_without_doctors_book_the_nearest_city(self):
+        doctors = doctor_refs(synthetic_doctors(50))
+        cumbaya = next(i for i, (name, _, _, _) in enumerate(CITIES) if name == "Cumbayá")
+        quito = next(i for i, (name, _, _, _) in enumerate(CITIES) if name == "Quito")
+        assert cumbaya not in doctors
+        quito_ids = {ref.doctor_id for ref in doctors[quito]}
+
+        population = Population(500)
+        batches = list(synthetic_appointments(500, population, doctors, ANCHOR))
+        alerts = [row for chunk in synthetic_emergency_alerts(500, population, doctors, ANCHOR) for row in chunk]
+        by_patient = {patient_id(DEFAULT_SEED, i): population.city[i] for i in range(len(population))}
+        booked = [(row[1], row[2]) for batch in batches for row in batch.appointments] + [
+            (row[1], row[2]) for row in alerts
+        ]
+        from_cumbaya = [doctor_id for patient, doctor_id in booked if by_patient[patient] == cumbaya]
+        assert from_cumbaya and set(from_cumbaya) <= quito_ids
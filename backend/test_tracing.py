@@ -0,0 +1,121 @@
+"""
+Tests for request tracing (no database needed)
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI, HTTPException
+
+import tracing
+from auth_pg import get_password_hash, verify_password
+from tracing import (
+    CLIENT, NOOP_SPAN, SERVER, InMemoryExporter, OtlpFileExporter, TracingMiddleware,
+    configure_tracing, format_traces, load_spans, start_span,
+)
+
+
+@pytest.fixture
+def spans():
+    exporter = InMemoryExporter()
+    configure_tracing(exporter)
+    yield exporter.spans
+    configure_tracing(None)
+
+
+def test_disabled_by_default_and_free():
+    assert not tracing.tracing_enabled()
+    with start_span("anything") as span:
+        span.set_attribute("ignored", 1)
+    assert span is NOOP_SPAN
+
+
+def test_nested_spans_share_the_trace(spans):
+    with start_span("outer") as outer:
+        with start_span("inner", CLIENT, {"peer.service": "twilio"}):
+            pass
+        with pytest.raises(ValueError):
+            with start_span("failing"):
+                raise ValueError("bad number +593987654328")
+
+    inner, failing, root = spans
+    assert root is outer and root.parent_id is None
+    assert {inner.trace_id, failing.trace_id} == {outer.trace_id}
+    assert inner.parent_id == failing.parent_id == outer.span_id
+    assert inner.attributes == {"peer.service": "twilio"}
+    assert failing.error == "ValueError: bad number ***28"
+    assert root.error is None and root.duration_ms >= inner.duration_ms
+
+
+def test_argon2_work_is_traced(spans):
+    with start_span("login"):
+        assert verify_password("Test123!", get_password_hash("Test123!"))
+    assert [span.name for span in spans] == ["argon2.hash", "argon2.verify", "login"]
+
+
+def test_concurrent_tasks_keep_their_own_parent(spans):
+    async def request(name):
+        with start_span(name):
+            await asyncio.sleep(0.01)
+            with start_span(f"{name}.query"):
+                await asyncio.sleep(0)
+
+    async def main():
+        await asyncio.gather(request("a"), request("b"))
+
+    asyncio.run(main())
+    by_name = {span.name: span for span in spans}
+    assert by_name["a.query"].parent_id == by_name["a"].span_id
+    assert by_name["b.query"].parent_id == by_name["b"].span_id
+    assert by_name["a"].trace_id != by_name["b"].trace_id
+
+
+@pytest.mark.asyncio
+async def test_middleware_creates_server_span_and_propagates(spans):
+    app = FastAPI()
+
+    @app.get("/users/{user_id}")
+    async def user(user_id: str):
+        with start_span("db.query", CLIENT):
+            pass
+        if user_id == "missing":
+            raise HTTPException(status_code=404)
+        return {"user_id": user_id}
+
+    app.add_middleware(TracingMiddleware)
+    incoming = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/users/42", headers={"traceparent": incoming})
+        await client.get("/users/missing")
+
+    query, server, _, missing = spans
+    assert server.kind == SERVER and server.name == "GET /users/{user_id}"
+    assert server.trace_id == "0af7651916cd43dd8448eb211c80319c"
+    assert server.parent_id == "b7ad6b7169203331"
+    assert query.parent_id == server.span_id
+    assert server.attributes["http.response.status_code"] == 200
+    assert response.headers["traceparent"] == server.traceparent
+    # 4xx is the client's problem, not a failed span
+    assert missing.attributes["http.response.status_code"] == 404 and missing.error is None
+
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    configure_tracing(OtlpFileExporter(str(path)))
+    try:
+        with start_span("POST /auth/google", SERVER):
+            with start_span("google.id_token.verify", CLIENT, {"audience": "web", "attempt": 1}):
+                pass
+    finally:
+        configure_tracing(None)  # flushes
+
+    spans = load_spans(str(path))
+    verify, root = spans
+    assert verify["parentSpanId"] == root["spanId"] and verify["kind"] == 3
+    assert verify["attributes"] == [
+        {"key": "audience", "value": {"stringValue": "web"}},
+        {"key": "attempt", "value": {"intValue": "1"}},
+    ]
+    tree = format_traces(spans).splitlines()
+    assert tree[0] == f"trace {root['traceId']}"
+    assert tree[1].startswith("  POST /auth/google ") and tree[2].startswith("    google.id_token.verify ")
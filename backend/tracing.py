@@ -0,0 +1,358 @@
+"""
+Request tracing with OpenTelemetry-compatible spans
+
+    with start_span("twilio.messages.create", CLIENT) as span:
+        span.set_attribute("peer.service", "twilio")
+        ...
+
+TracingMiddleware opens a server span per request (continuing a W3C
+traceparent header if the caller sent one, and returning one in the
+response), and every span started while handling the request - asyncpg
+queries and pool acquires, argon2 hashing, Google/Twilio/WhatsApp calls -
+is parented to it through a ContextVar.
+
+Tracing is off by default: start_span() then returns a shared no-op span and
+costs one attribute check. TRACING_EXPORTER selects where finished spans go:
+
+    none    (default) nothing is recorded
+    memory  kept in tracing.memory_exporter().spans, for tests and debugging
+    file    appended to TRACE_FILE (default traces.jsonl) in the OTLP/JSON
+            format the OpenTelemetry collector's file exporter uses, so the
+            file can be replayed into Jaeger/Tempo later; works offline
+
+Print a trace file as indented span trees with:
+
+    python tracing.py traces.jsonl [--min-ms 50]
+"""
+import argparse
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+import orjson
+
+from structured_logging import mask
+
+INTERNAL, SERVER, CLIENT = "internal", "server", "client"
+_OTLP_KIND = {INTERNAL: 1, SERVER: 2, CLIENT: 3}
+_OTLP_STATUS_OK, _OTLP_STATUS_ERROR = 1, 2
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "medicure-api")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+class Span:
+    """One timed operation; use as a context manager"""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind", "attributes",
+        "start_ns", "end_ns", "error", "events", "_exporter", "_token",
+    )
+    recording = True
+
+    def __init__(self, exporter, name: str, kind: str = INTERNAL, attributes: Optional[Dict] = None,
+                 trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        parent = _current_span.get() if trace_id is None else None
+        self.trace_id = trace_id or (parent.trace_id if parent else f"{random.getrandbits(128):032x}")
+        self.parent_id = parent_id or (parent.span_id if parent else None)
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_ns = 0
+        self.end_ns = 0
+        self.error: Optional[str] = None
+        self.events: List[Dict] = []
+        self._exporter = exporter
+        self._token = None
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: str) -> None:
+        self.error = message
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        self.start_ns = time.time_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        if exc is not None:
+            # Exception text can carry user input; mask it like log output
+            message = mask(str(exc))
+            self.error = self.error or f"{exc_type.__name__}: {message}"
+            self.events.append({
+                "name": "exception", "time_ns": self.end_ns,
+                "attributes": {"exception.type": exc_type.__name__, "exception.message": message},
+            })
+        self._exporter.export(self)
+
+
+class _NoopSpan:
+    __slots__ = ()
+    recording = False
+    traceparent = None
+
+    def set_attribute(self, key: str, value) -> None:
+        pass
+
+    def set_error(self, message: str) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+# ============================================================================
+# EXPORTERS
+# ============================================================================
+
+class InMemoryExporter:
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _otlp_value(value) -> Dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: List[Span]) -> Dict:
+    """ExportTraceServiceRequest in OTLP/JSON encoding"""
+    return {"resourceSpans": [{
+        "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+        "scopeSpans": [{
+            "scope": {"name": "medicure"},
+            "spans": [
+                {
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    **({"parentSpanId": span.parent_id} if span.parent_id else {}),
+                    "name": span.name,
+                    "kind": _OTLP_KIND[span.kind],
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": _otlp_attributes(span.attributes),
+                    "events": [
+                        {"name": event["name"], "timeUnixNano": str(event["time_ns"]),
+                         "attributes": _otlp_attributes(event["attributes"])}
+                        for event in span.events
+                    ],
+                    "status": (
+                        {"code": _OTLP_STATUS_ERROR, "message": span.error} if span.error
+                        else {"code": _OTLP_STATUS_OK}
+                    ),
+                }
+                for span in spans
+            ],
+        }],
+    }]}
+
+
+class OtlpFileExporter:
+    """Appends batches of spans as OTLP/JSON lines from a background thread"""
+
+    MAX_BATCH = 512
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        self._queue.put(span)
+
+    def _run(self) -> None:
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.MAX_BATCH:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is None:
+                batch.pop()
+                running = False
+            if batch:
+                with open(self.path, "ab") as trace_file:
+                    trace_file.write(orjson.dumps(to_otlp(batch)) + b"\n")
+
+    def shutdown(self) -> None:
+        """Write out everything queued so far and stop the thread"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+
+# ============================================================================
+# TRACER
+# ============================================================================
+
+_exporter = None
+
+
+def configure_tracing(exporter=None) -> None:
+    """Install an exporter (None turns tracing off), shutting down the previous one"""
+    global _exporter
+    if _exporter is not None:
+        _exporter.shutdown()
+    _exporter = exporter
+
+
+def memory_exporter() -> Optional[InMemoryExporter]:
+    return _exporter if isinstance(_exporter, InMemoryExporter) else None
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def start_span(name: str, kind: str = INTERNAL, attributes: Optional[Dict] = None,
+               traceparent: Optional[str] = None):
+    """A span parented to the current one (or to a W3C traceparent header value)"""
+    if _exporter is None:
+        return NOOP_SPAN
+    trace_id = parent_id = None
+    if traceparent:
+        parts = traceparent.split("-")
+        if len(parts) == 4 and len(parts[1]) == 32 and len(parts[2]) == 16:
+            trace_id, parent_id = parts[1], parts[2]
+    return Span(_exporter, name, kind, attributes, trace_id, parent_id)
+
+
+def _exporter_from_env():
+    choice = os.getenv("TRACING_EXPORTER", "none").lower()
+    if choice == "memory":
+        return InMemoryExporter()
+    if choice == "file":
+        return OtlpFileExporter(os.getenv("TRACE_FILE", "traces.jsonl"))
+    return None
+
+
+configure_tracing(_exporter_from_env())
+
+
+class TracingMiddleware:
+    """Pure ASGI middleware opening a server span per HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or ())
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1") or None
+        span = start_span(f"{scope['method']} {scope['path']}", SERVER, {
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+        }, traceparent=traceparent)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.response.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error(f"HTTP {message['status']}")
+                message["headers"] = [*message.get("headers", ()), (b"traceparent", span.traceparent.encode())]
+            await send(message)
+
+        with span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{scope['method']} {route}"
+                    span.set_attribute("http.route", route)
+
+
+# ============================================================================
+# TRACE FILE VIEWER
+# ============================================================================
+
+def load_spans(path: str) -> List[Dict]:
+    """Flatten an OTLP/JSON lines file into span dicts"""
+    spans = []
+    with open(path, "rb") as trace_file:
+        for line in trace_file:
+            for resource in orjson.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    spans.extend(scope["spans"])
+    return spans
+
+
+def format_traces(spans: List[Dict], min_ms: float = 0.0) -> str:
+    """Indented span tree per trace, roots slower than min_ms only"""
+    children = defaultdict(list)
+    by_id = {span["spanId"]: span for span in spans}
+    for span in spans:
+        children[span.get("parentSpanId") if span.get("parentSpanId") in by_id else None].append(span)
+
+    def duration(span):
+        return (int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"])) / 1e6
+
+    lines = []
+
+    def walk(span, depth):
+        error = span["status"].get("message")
+        lines.append(f"{'  ' * depth}{span['name']}  {duration(span):.1f} ms" + (f"  ! {error}" if error else ""))
+        for child in sorted(children[span["spanId"]], key=lambda s: int(s["startTimeUnixNano"])):
+            walk(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda s: int(s["startTimeUnixNano"])):
+        if duration(root) >= min_ms:
+            lines.append(f"trace {root['traceId']}")
+            walk(root, 1)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trace_file")
+    parser.add_argument("--min-ms", type=float, default=0.0, help="only show requests at least this slow")
+    args = parser.parse_args()
+    print(format_traces(load_spans(args.trace_file), args.min_ms))
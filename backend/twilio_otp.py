@@ -7,12 +7,17 @@ import os
 import secrets
 from datetime import datetime, timedelta
 from typing import Dict, Optional
-from twilio.rest import Client
 from dotenv import load_dotenv
 
+from health import record_outbound, register_outbound
+from structured_logging import get_logger
+from tracing import CLIENT, start_span
+
 # Load environment variables
 load_dotenv()
 
+log = get_logger(__name__)
+
 # Configuration
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
@@ -26,12 +31,20 @@ class TwilioWhatsAppOTP:
     """Twilio WhatsApp OTP service"""
     
     def __init__(self):
-        if not TWILIO_ACCOUNT_SID or not TWILIO_AUTH_TOKEN:
-            print("⚠️  Twilio credentials not configured")
-            self.client = None
-        else:
-            self.client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-            print("✅ Twilio client initialized")
+        self.configured = bool(TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN)
+        self._client = None
+        if not self.configured:
+            log.warning("twilio_not_configured")
+        register_outbound("twilio", configured=self.configured)
+
+    @property
+    def client(self):
+        """REST client, built on first send: importing twilio.rest alone adds ~130 ms to startup"""
+        if self._client is None and self.configured:
+            from twilio.rest import Client
+            self._client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+            log.info("twilio_client_initialized")
+        return self._client
     
     def generate_otp(self, length: int = 6) -> str:
         """Generate a secure numeric OTP"""
@@ -90,7 +103,7 @@ class TwilioWhatsAppOTP:
     def send_otp(self, phone_number: str) -> Dict:
         """Send OTP via Twilio WhatsApp"""
         
-        if not self.client:
+        if not self.configured:
             return {
                 "success": False,
                 "error": "Twilio not configured. Set TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN"
@@ -118,15 +131,16 @@ class TwilioWhatsAppOTP:
         try:
             # Send WhatsApp message using approved content template
             # Variables: {{1}} = OTP code, {{2}} = expiry time
-            message = self.client.messages.create(
-                from_=TWILIO_WHATSAPP_NUMBER,
-                content_sid=TWILIO_CONTENT_SID,
-                content_variables=f'{{"1":"{otp}","2":"5 minutes"}}',
-                to=to_number
-            )
+            with start_span("twilio.messages.create", CLIENT, {"server.address": "api.twilio.com"}):
+                message = self.client.messages.create(
+                    from_=TWILIO_WHATSAPP_NUMBER,
+                    content_sid=TWILIO_CONTENT_SID,
+                    content_variables=f'{{"1":"{otp}","2":"5 minutes"}}',
+                    to=to_number
+                )
             
-            print(f"✓ OTP sent to {phone_number}: {otp}")
-            print(f"  Message SID: {message.sid}")
+            record_outbound("twilio", True)
+            log.debug("twilio_otp_sent", phone=phone_number, message_sid=message.sid)
             
             return {
                 "success": True,
@@ -135,8 +149,13 @@ class TwilioWhatsAppOTP:
             }
             
         except Exception as e:
+            from twilio.base.exceptions import TwilioRestException
+
             error_msg = str(e)
-            print(f"✗ Failed to send OTP to {phone_number}: {error_msg}")
+            log.warning("twilio_otp_failed", phone=phone_number, error=error_msg)
+            # A 4xx (e.g. unverified sandbox number) still means Twilio is up
+            answered = isinstance(e, TwilioRestException) and (e.status or 500) < 500
+            record_outbound("twilio", answered, None if answered else error_msg[:200])
             
             # Check if it's a sandbox error
             if "same channel" in error_msg.lower() or "not a valid" in error_msg.lower():
@@ -144,9 +163,7 @@ class TwilioWhatsAppOTP:
                     "success": False,
                     "error": "WhatsApp number not verified. Send 'join industrial-taught' to +1 415 523 8886 on WhatsApp first."
                 }
-            
-            print(f"✗ Failed to send OTP to {phone_number}: {error_msg}")
-            
+
             return {
                 "success": False,
                 "error": error_msg
@@ -10,6 +10,12 @@ from typing import Optional, Dict
 import httpx
 from datetime import datetime, timedelta
 
+from health import outbound_call, register_outbound
+from structured_logging import get_logger
+from tracing import CLIENT, start_span
+
+log = get_logger(__name__)
+
 # Configuration
 WHATSAPP_API_VERSION = "v18.0"
 WHATSAPP_PHONE_ID = os.getenv("WHATSAPP_PHONE_ID")
@@ -28,6 +34,7 @@ class WhatsAppOTPService:
             "Authorization": f"Bearer {WHATSAPP_ACCESS_TOKEN}",
             "Content-Type": "application/json"
         }
+        register_outbound("whatsapp", configured=bool(WHATSAPP_PHONE_ID and WHATSAPP_ACCESS_TOKEN))
     
     def generate_otp(self, length: int = 6) -> str:
         """Generate a secure numeric OTP"""
@@ -125,11 +132,18 @@ class WhatsAppOTPService:
         }
         
         async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload
-            )
+            with (
+                start_span("whatsapp.messages.send", CLIENT, {"server.address": "graph.facebook.com"}) as span,
+                outbound_call("whatsapp") as call,
+            ):
+                response = await client.post(
+                    self.api_url,
+                    headers=self.headers,
+                    json=payload
+                )
+                span.set_attribute("http.response.status_code", response.status_code)
+                if response.status_code >= 500:
+                    call.fail(f"HTTP {response.status_code}")
             
             if response.status_code == 200:
                 return {
@@ -179,9 +193,9 @@ class WhatsAppOTPService:
             result = await self.send_otp_paid(phone_number, otp)
         
         if result.get("success"):
-            print(f"✓ OTP sent to {phone_number}: {otp} (Cost: {result.get('cost', 'PAID')})")
+            log.debug("whatsapp_otp_sent", phone=phone_number, cost=result.get('cost', 'PAID'))
         else:
-            print(f"✗ Failed to send OTP to {phone_number}: {result.get('error')}")
+            log.warning("whatsapp_otp_failed", phone=phone_number, error=result.get('error'))
         
         return result
 
@@ -206,7 +220,7 @@ async def handle_whatsapp_webhook(webhook_data: Dict) -> Dict:
         message_type = message.get("type")
         
         # User initiated contact - FEP window opens
-        print(f"✓ FEP window opened for {phone_number}")
+        log.info("whatsapp_fep_window_opened", phone=phone_number)
         
         # Respond with welcome message (FREE)
         response = {
@@ -225,7 +239,7 @@ async def handle_whatsapp_webhook(webhook_data: Dict) -> Dict:
         }
         
     except Exception as e:
-        print(f"✗ Webhook error: {str(e)}")
+        log.exception("whatsapp_webhook_error")
         return {"status": "error", "error": str(e)}
 
 
@@ -57,8 +57,7 @@ export default function EmergencyAlertsScreen() {
     try {
       const userId = await SecureStore.getItemAsync('user_id');
       console.log('🚨 [Emergency] User ID:', userId);
-      // Remove query param - backend handles filtering
-      const result = await apiClient.get(`/api/doctors/${userId}/emergency-alerts`, true);
+      const result = await apiClient.get(`/api/doctors/${userId}/emergency-alerts?status=${filter}`, true);
       console.log('🚨 [Emergency] API Result:', JSON.stringify(result, null, 2));
 
       if (result.success && result.data?.alerts) {
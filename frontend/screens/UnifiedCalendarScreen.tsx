@@ -116,7 +116,9 @@ export default function UnifiedCalendarScreen() {
   const loadData = async () => {
     try {
       const userId = await SecureStore.getItemAsync('user_id');
-      const result = await apiClient.get(`/api/doctors/${userId}/calendar`, true);
+      // The week around selectedDate covers both the day and week views
+      const from = selectedDate.toISOString().split('T')[0];
+      const result = await apiClient.get(`/api/doctors/${userId}/calendar?from=${from}&view=week`, true);
       if (result.success && result.data) {
         setAppointments(result.data.appointments || []);
       }